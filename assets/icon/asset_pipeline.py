@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+"""
+Shared encode, parallel and manifest helpers for the CoachGuru asset scripts
+Imported by the icon, logo and docs generators - not run directly
+"""
+
+try:
+    from PIL import Image
+    import fnmatch
+    import hashlib
+    import io
+    import json
+    import os
+    import re
+    import struct
+    import sys
+    from collections import deque
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+    from multiprocessing import active_children
+except ImportError:
+    print("❌ PIL/Pillow not installed. Install with: pip3 install Pillow")
+    sys.exit(1)
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Windows: no peak RSS, the budget still applies
+
+import render_cache
+
+def save_png(img, output_path):
+    """Encode image as optimized PNG, creating the parent directory (atomic)"""
+    return write_bytes(output_path, encode_png(img))
+
+def encode_png(img):
+    """Encode image as optimized PNG bytes"""
+    buffer = io.BytesIO()
+    img.save(buffer, 'PNG', optimize=True)
+    return buffer.getvalue()
+
+def encode_png_fast(img):
+    """Encode image as PNG bytes at zlib level 1, without the optimize pass"""
+    buffer = io.BytesIO()
+    img.save(buffer, 'PNG', compress_level=1)
+    return buffer.getvalue()
+
+def encode_webp(img, quality=None, method=6):
+    """Encode image as WebP bytes - lossless, or lossy at quality (0-100)"""
+    buffer = io.BytesIO()
+    if quality is None:
+        img.save(buffer, 'WEBP', lossless=True, quality=100, method=method)
+    else:
+        img.save(buffer, 'WEBP', quality=quality, method=method)
+    return buffer.getvalue()
+
+def encode_ico(frames):
+    """ICO container around already-encoded PNG frames [(size, png_bytes)]
+
+    PNG-compressed entries are what Pillow writes too (Windows Vista and
+    later); the frames are not decoded or re-encoded.
+    """
+    header = struct.pack('<HHH', 0, 1, len(frames))
+    offset = len(header) + 16 * len(frames)
+    entries = []
+    for size, data in frames:
+        # 256 is stored as 0 in the one-byte width/height fields
+        entries.append(struct.pack('<BBBBHHII', size % 256, size % 256, 0, 0, 1, 32, len(data), offset))
+        offset += len(data)
+    return header + b''.join(entries) + b''.join(data for _, data in frames)
+
+def read_ico_sizes(path):
+    """Frame sizes listed in an ICO directory, without decoding"""
+    with open(path, 'rb') as f:
+        head = f.read(6)
+        if len(head) < 6 or struct.unpack('<HH', head[:4]) != (0, 1):
+            raise ValueError(f"{path}: not an ICO file")
+        count = struct.unpack('<H', head[4:])[0]
+        entries = f.read(16 * count)
+    if len(entries) < 16 * count:
+        raise ValueError(f"{path}: truncated ICO directory")
+    return sorted((entries[i] or 256, entries[i + 1] or 256) for i in range(0, 16 * count, 16))
+
+def read_ico_frames(data):
+    """[(size, frame bytes)] of ICO data as stored (PNG or BMP) - the inverse of encode_ico"""
+    if len(data) < 6 or struct.unpack('<HH', data[:4]) != (0, 1):
+        raise ValueError("not an ICO file")
+    count = struct.unpack('<H', data[4:6])[0]
+    if len(data) < 6 + 16 * count:
+        raise ValueError("truncated ICO directory")
+    frames = []
+    for i in range(count):
+        width, _, _, _, _, _, length, offset = struct.unpack('<BBBBHHII', data[6 + 16 * i:22 + 16 * i])
+        frames.append((width or 256, data[offset:offset + length]))
+    return frames
+
+def encoder_for(image_format, quality=None, fast=False):
+    """Encoder function for an output format ('png' or 'webp')
+
+    fast trades file size for encode time (zlib level 1, WebP method 0)
+    - for drafts that are optimized, if at all, in a later pass.
+    """
+    if image_format == 'webp':
+        return lambda img: encode_webp(img, quality, method=0 if fast else 6)
+    return encode_png_fast if fast else encode_png
+
+def write_bytes(output_path, data):
+    """Write encoded bytes atomically, creating the parent directory
+
+    The bytes go to a temporary file next to the output which is then
+    renamed over it - an interrupted run leaves the old file or the new
+    one, never a truncated mix.
+    """
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    tmp_path = f'{output_path}.tmp-{os.getpid()}'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return output_path
+
+def cached_encode(params, render, encode=encode_png):
+    """Encoded bytes of render(), served from the render cache on a hit
+
+    params must identify the output completely (source digest, size, shape,
+    format, generator version...) - on a hit the source is never decoded.
+    Returns (data, hit).
+    """
+    key = render_cache.cache_key(params)
+    data = render_cache.lookup(key)
+    hit = data is not None
+    if not hit:
+        data = encode(render())
+        render_cache.store(key, data)
+    return data, hit
+
+def cached_render(output_paths, params, render, encode=encode_png):
+    """Write render() to every output path via cached_encode, returns True on a hit"""
+    data, hit = cached_encode(params, render, encode)
+    for output_path in output_paths:
+        write_bytes(output_path, data)
+    return hit
+
+# Caps default_workers() - build_assets.py sets it for each node it runs,
+# so nodes running side by side share the CPUs instead of each taking all
+WORKERS_ENV = 'COACHGURU_WORKERS'
+
+def default_workers():
+    """Number of worker processes to use for parallel encodes"""
+    workers = os.cpu_count() or 1
+    limit = os.environ.get(WORKERS_ENV)
+    return max(1, min(workers, int(limit))) if limit else workers
+
+# Resident memory of an idle pool worker (interpreter, Pillow, NumPy) -
+# charged per worker by the memory-budgeted scheduler
+WORKER_MEMORY = 64 * 1024 * 1024
+
+# Seconds between memory samples of the pool while budgeted jobs run
+MEMORY_SAMPLE_INTERVAL = 0.05
+
+def parse_memory(value):
+    """'2G', '1536M', '512MB', '1048576' → bytes"""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:i?B)?\s*', str(value), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"invalid memory size: {value} (e.g. 2G, 1536M)")
+    number, unit = match.groups()
+    return int(float(number) * 1024 ** ' KMGT'.index(unit.upper() or ' '))
+
+def format_memory(size):
+    """Bytes → '123.4 MB'"""
+    return f"{size / (1024 * 1024):.1f} MB"
+
+def peak_rss():
+    """Peak resident memory of this process in bytes (0 if unknown)"""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # Linux reports KB
+
+def current_rss():
+    """Resident memory of this process in bytes (the peak where /proc is missing)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return peak_rss()
+
+def proportional_rss(pids):
+    """Summed PSS of pids in bytes - shared pages split between the processes
+    mapping them - or None without /proc"""
+    total = 0
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/smaps_rollup') as f:
+                total += next(int(line.split()[1]) * 1024 for line in f if line.startswith('Pss:'))
+        except (OSError, StopIteration, ValueError):
+            return None
+    return total
+
+def plan_workers(job_memory, max_memory, base_memory, workers):
+    """Most workers (at most workers) whose typical jobs fit max_memory next to base_memory"""
+    typical = sorted(job_memory)[len(job_memory) // 2]
+    fit = (max_memory - base_memory) // (WORKER_MEMORY + typical)
+    return int(max(1, min(workers, len(job_memory), fit)))
+
+def _measured_call(func, job):
+    """func(*job) in a pool worker, with the worker's pid and peak RSS"""
+    return func(*job), os.getpid(), peak_rss()
+
+def record_memory(stats, workers, estimated, measured):
+    """Fold one run's worker count and peaks into a stats dict"""
+    stats['workers'] = max(stats.get('workers', 0), workers)
+    stats['estimated_peak'] = max(stats.get('estimated_peak', 0), estimated)
+    stats['measured_peak'] = max(stats.get('measured_peak', 0), measured)
+
+def run_parallel(func, jobs, workers=None, initializer=None, initargs=(),
+                 job_memory=None, max_memory=None, stats=None, on_result=None):
+    """Run func(*job) for every job across a process pool, keeping job order
+
+    initializer(*initargs) runs once in each worker (e.g. to attach shared
+    sources); serial runs skip it since the parent already has the data.
+    on_result(index, result) runs in this process as each job finishes
+    (e.g. to journal progress).
+
+    With max_memory (bytes) and job_memory (estimated peak bytes of each
+    job beyond shared data), the worker count is chosen so typical jobs
+    fit next to this process's current footprint, and a job only starts
+    while the estimates of the running jobs leave room for it - large jobs
+    run with fewer neighbours instead of being OOM-killed. stats (a dict)
+    receives the worker count, the estimated peak and the measured one:
+    the sampled PSS of this process and its workers, or where /proc is
+    missing the sum of their peak RSS (an upper bound - shared pages count
+    in each process).
+    """
+    jobs = list(jobs)
+    workers = workers or default_workers()
+    if max_memory and jobs:
+        job_memory = list(job_memory)
+        base_memory = current_rss()
+        workers = plan_workers(job_memory, max_memory, base_memory, workers)
+
+    # A pool is not worth its startup cost for a single job or a single core
+    if len(jobs) <= 1 or workers <= 1:
+        results = []
+        for index, job in enumerate(jobs):
+            results.append(func(*job))
+            if on_result:
+                on_result(index, results[-1])
+        if max_memory and jobs and stats is not None:
+            record_memory(stats, 1, base_memory + max(job_memory), peak_rss())
+        return results
+
+    if not max_memory:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)),
+                                 initializer=initializer, initargs=initargs) as pool:
+            futures = {pool.submit(func, *job): index for index, job in enumerate(jobs)}
+            results = [None] * len(jobs)
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                if on_result:
+                    on_result(futures[future], results[futures[future]])
+            return results
+
+    # Admission control: start jobs in order while their estimates fit
+    overhead = base_memory + workers * WORKER_MEMORY
+    results = [None] * len(jobs)
+    pending = deque(range(len(jobs)))
+    running = {}
+    in_flight = 0
+    estimated_peak = overhead
+    worker_peaks = {}
+    sampled_peak = proportional_rss([os.getpid()])
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        while pending or running:
+            while pending and len(running) < workers:
+                index = pending[0]
+                # A job too large for the budget still runs - alone
+                if running and overhead + in_flight + job_memory[index] > max_memory:
+                    break
+                pending.popleft()
+                running[pool.submit(_measured_call, func, jobs[index])] = index
+                in_flight += job_memory[index]
+                estimated_peak = max(estimated_peak, overhead + in_flight)
+            finished, _ = wait(running, timeout=MEMORY_SAMPLE_INTERVAL, return_when=FIRST_COMPLETED)
+            if sampled_peak is not None:
+                sample = proportional_rss([os.getpid()] + [child.pid for child in active_children()])
+                sampled_peak = None if sample is None else max(sampled_peak, sample)
+            for future in finished:
+                index = running.pop(future)
+                in_flight -= job_memory[index]
+                results[index], pid, peak = future.result()
+                worker_peaks[pid] = max(worker_peaks.get(pid, 0), peak)
+                if on_result:
+                    on_result(index, results[index])
+    if stats is not None:
+        measured = sampled_peak if sampled_peak is not None else peak_rss() + sum(worker_peaks.values())
+        record_memory(stats, workers, estimated_peak, measured)
+    return results
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# IHDR color types: 0 gray, 2 RGB, 3 palette, 4 gray+alpha, 6 RGBA
+PNG_ALPHA_COLOR_TYPES = (4, 6)
+
+def read_png_header(path):
+    """Read IHDR and the chunk list of a PNG without decoding pixel data"""
+    with open(path, 'rb') as f:
+        if f.read(8) != PNG_SIGNATURE:
+            raise ValueError(f"{path}: not a PNG file")
+
+        chunks = []
+        header = None
+        while True:
+            chunk_head = f.read(8)
+            if len(chunk_head) < 8:
+                raise ValueError(f"{path}: truncated PNG (no IEND chunk)")
+            length, chunk_type = struct.unpack('>I4s', chunk_head)
+            chunk_type = chunk_type.decode('latin-1')
+            chunks.append(chunk_type)
+
+            if chunk_type == 'IHDR':
+                width, height, bit_depth, color_type = struct.unpack('>IIBB', f.read(10))
+                header = {
+                    'width': width,
+                    'height': height,
+                    'bit_depth': bit_depth,
+                    'color_type': color_type,
+                }
+                f.seek(length - 10 + 4, os.SEEK_CUR)  # rest of IHDR + CRC
+            else:
+                f.seek(length + 4, os.SEEK_CUR)  # skip data + CRC
+
+            if chunk_type == 'IEND':
+                break
+
+    if header is None or chunks[0] != 'IHDR':
+        raise ValueError(f"{path}: PNG does not start with IHDR")
+
+    header['alpha'] = header['color_type'] in PNG_ALPHA_COLOR_TYPES or 'tRNS' in chunks
+    header['chunks'] = chunks
+    return header
+
+def read_webp_header(path):
+    """Read dimensions and alpha flag of a WebP from its RIFF header"""
+    with open(path, 'rb') as f:
+        head = f.read(30)
+    if len(head) < 30 or head[:4] != b'RIFF' or head[8:12] != b'WEBP':
+        raise ValueError(f"{path}: not a WebP file")
+
+    chunk = head[12:16]
+    if chunk == b'VP8X':
+        # Extended format: flags byte, then 24-bit (width-1) and (height-1)
+        alpha = bool(head[20] & 0x10)
+        width = int.from_bytes(head[24:27], 'little') + 1
+        height = int.from_bytes(head[27:30], 'little') + 1
+    elif chunk == b'VP8L':
+        # Lossless: signature 0x2f, then 14-bit (width-1), 14-bit (height-1), alpha bit
+        bits = int.from_bytes(head[21:25], 'little')
+        width = (bits & 0x3FFF) + 1
+        height = ((bits >> 14) & 0x3FFF) + 1
+        alpha = bool((bits >> 28) & 1)
+    elif chunk == b'VP8 ':
+        # Lossy without alpha: 14-bit dimensions after the frame tag and start code
+        width = int.from_bytes(head[26:28], 'little') & 0x3FFF
+        height = int.from_bytes(head[28:30], 'little') & 0x3FFF
+        alpha = False
+    else:
+        raise ValueError(f"{path}: unknown WebP chunk {chunk!r}")
+    return {'width': width, 'height': height, 'color_type': None, 'alpha': alpha}
+
+def read_image_header(path):
+    """Header of a PNG or WebP output, without decoding pixel data"""
+    if path.endswith('.webp'):
+        return read_webp_header(path)
+    return read_png_header(path)
+
+def file_digest(path):
+    """SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def describe_output(path):
+    """Manifest entry for one generated file"""
+    entry = {'bytes': os.path.getsize(path), 'sha256': file_digest(path)}
+    if path.endswith(('.png', '.webp')):
+        header = read_image_header(path)
+        entry.update({
+            'width': header['width'],
+            'height': header['height'],
+            'color_type': header['color_type'],
+            'alpha': header['alpha'],
+        })
+    return entry
+
+def write_manifest(paths, manifest_path):
+    """Write a JSON manifest describing every generated output"""
+    manifest = {
+        'version': 1,
+        'outputs': {path: describe_output(path) for path in sorted(set(paths))},
+    }
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+    return manifest
+
+def write_json_atomic(data, path):
+    """Write JSON to a temporary file and rename it over path"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.tmp-{os.getpid()}'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp_path, path)
+
+def load_journal(journal_path, run_key):
+    """Entries of a progress journal written for the same run_key, keeping
+    only those whose outputs are still on disk with the journaled digests
+
+    Returns {entry: result}, empty when there is no journal or it belongs
+    to a different run (other source, options or render version).
+    """
+    try:
+        with open(journal_path) as f:
+            journal = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if journal.get('run') != run_key:
+        return {}
+    intact = {}
+    for entry, result in journal.get('completed', {}).items():
+        digests = result.get('digests', {})
+        if digests and all(os.path.exists(path) and file_digest(path) == digest
+                           for path, digest in digests.items()):
+            intact[entry] = result
+    return intact
+
+def journal_result(journal_path, run_key, completed, entry, result):
+    """Record one finished entry (with its outputs' digests) in the journal
+
+    The whole journal is rewritten through a rename, so an interruption at
+    any point leaves the previous complete journal.
+    """
+    completed[entry] = dict(result, digests={path: file_digest(path) for path in result['paths']})
+    write_json_atomic({'run': run_key, 'completed': completed}, journal_path)
+
+def load_manifest(manifest_path):
+    """Load a manifest written by write_manifest, or None if missing"""
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        return json.load(f)
+
+def manifest_sizes(manifest):
+    """{path: bytes} of a manifest's outputs (empty for no manifest)"""
+    return {path: entry['bytes'] for path, entry in (manifest or {}).get('outputs', {}).items()}
+
+def _budget_entry(size, previous, budget):
+    """One row of a size report"""
+    return {
+        'bytes': size,
+        'previous': previous,
+        'delta': None if previous is None else size - previous,
+        'budget': budget,
+        'over': budget is not None and size > budget,
+    }
+
+def size_report(sizes, previous_sizes, budgets):
+    """Per-asset and per-group size report with budget checks
+
+    budgets maps a group name to {'patterns': [...], 'max_bytes': total,
+    'max_asset_bytes': cap for every file, 'assets': {path: cap}} - all
+    caps optional, patterns are fnmatch globs over the output paths.
+    """
+    assets = {}
+    groups = {}
+    for group, budget in budgets.items():
+        members = sorted(path for path in sizes
+                         if any(fnmatch.fnmatch(path, pattern) for pattern in budget['patterns']))
+        for path in members:
+            cap = budget.get('assets', {}).get(path, budget.get('max_asset_bytes'))
+            assets[path] = {'group': group, **_budget_entry(sizes[path], previous_sizes.get(path), cap)}
+        previous = [previous_sizes[path] for path in previous_sizes
+                    if any(fnmatch.fnmatch(path, pattern) for pattern in budget['patterns'])]
+        groups[group] = {
+            'files': len(members),
+            **_budget_entry(sum(sizes[path] for path in members), sum(previous) if previous else None,
+                            budget.get('max_bytes')),
+        }
+
+    over_budget = [group for group, entry in groups.items() if entry['over']]
+    over_budget += [path for path, entry in assets.items() if entry['over']]
+    return {'version': 1, 'groups': groups, 'assets': assets, 'over_budget': over_budget}
+
+def format_delta(delta):
+    """+1.2 KB / -300 B / new"""
+    if delta is None:
+        return 'new'
+    if abs(delta) < 1024:
+        return f'{delta:+d} B'
+    return f'{delta / 1024:+.1f} KB'
+
+def print_size_report(report):
+    """Group totals, changed assets and budget overruns"""
+    print("\n📏 Size report")
+    print(f"{'Group':<22} {'Files':>5} {'Size':>11} {'Delta':>11} {'Budget':>11}")
+    for group, entry in report['groups'].items():
+        budget = '-' if entry['budget'] is None else f"{entry['budget'] / 1024:.0f} KB"
+        flag = ' ❌' if entry['over'] else ''
+        print(f"{group:<22} {entry['files']:>5} {entry['bytes'] / 1024:>8.1f} KB "
+              f"{format_delta(entry['delta']):>11} {budget:>11}{flag}")
+    for path, entry in sorted(report['assets'].items()):
+        if entry['delta'] != 0 or entry['over']:
+            flag = f" ❌ over {entry['budget']} B budget" if entry['over'] else ''
+            print(f"  {format_delta(entry['delta']):>11}  {path} ({entry['bytes']} B){flag}")
+
+def write_size_report(report, report_path):
+    """Write the report as JSON for CI dashboards"""
+    os.makedirs(os.path.dirname(report_path), exist_ok=True)
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write('\n')
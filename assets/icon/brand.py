@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+CoachGuru brand colors - the single definition used by the icon generators,
+the recolor stage and colors.xml
+Imported by the asset scripts - not run directly
+"""
+
+import os
+
+# Launcher background / adaptive icon background layer
+NAVY_BLUE = (10, 29, 71)  # #0A1D47
+
+COLORS_XML_PATH = 'android/app/src/main/res/values/colors.xml'
+
+def hex_color(rgb):
+    """(10, 29, 71) → '#0A1D47'"""
+    return '#{:02X}{:02X}{:02X}'.format(*rgb[:3])
+
+def parse_hex_color(value):
+    """'#0A1D47' or '0a1d47' → (10, 29, 71)"""
+    value = value.strip().lstrip('#')
+    if len(value) != 6:
+        raise ValueError(f"expected a 6-digit hex color: {value}")
+    return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+
+def colors_xml(background=NAVY_BLUE):
+    """colors.xml content for the launcher background color"""
+    return f'''<?xml version="1.0" encoding="utf-8"?>
+<resources>
+    <color name="ic_launcher_background">{hex_color(background)}</color>
+</resources>'''
+
+def write_colors_xml(background=NAVY_BLUE, colors_file=COLORS_XML_PATH):
+    """Write colors.xml for a background color, creating the directory"""
+    os.makedirs(os.path.dirname(colors_file), exist_ok=True)
+    with open(colors_file, 'w') as f:
+        f.write(colors_xml(background))
+    return colors_file
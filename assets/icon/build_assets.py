@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Dependency-aware build of every generated asset (make / ninja style)
+Each node declares its inputs and outputs; edges follow from outputs that
+other nodes read. Independent nodes run concurrently and a node only
+reruns when the digest of its inputs, its command or its outputs changed
+Nodes running at once share one budget of pool workers (-j)
+Usage: python3 assets/icon/build_assets.py [all | node ...] [-j N] [--dry-run] [--list]
+"""
+
+import argparse
+import ast
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from asset_pipeline import WORKERS_ENV, default_workers, file_digest, load_manifest
+
+PYTHON = sys.executable
+STATE_PATH = 'assets/icon/generated/.build_state.json'
+REPO_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+# Directories the generators put on sys.path for their local imports
+MODULE_DIRS = ['assets/icon', 'assets/logo']
+
+def script_inputs(script, module_dirs=MODULE_DIRS):
+    """The script plus every repo module it imports, directly or through
+    other repo modules (imports inside functions included) - a change to
+    any of them reruns the node
+    """
+    found = set()
+    pending = [script]
+    while pending:
+        path = pending.pop()
+        if path in found:
+            continue
+        found.add(path)
+        with open(os.path.join(REPO_ROOT, path), encoding='utf-8') as f:
+            tree = ast.parse(f.read(), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                for directory in (os.path.dirname(path), *module_dirs):
+                    module = os.path.join(directory, f"{name.split('.')[0]}.py")
+                    if os.path.isfile(os.path.join(REPO_ROOT, module)):
+                        pending.append(module)
+                        break
+    return sorted(found)
+
+# Build graph nodes. Paths are relative to the repo root; inputs may be globs.
+# docs_assets rewrites its own inputs index.html / sitemap.xml in place -
+# the stamp is taken after the run, and the rewrite is idempotent.
+# 'explicit' nodes regenerate checked-in files (app_icon.png is the master
+# raster, docs/screenshots the published captures) - they only run when
+# named on the command line, otherwise their outputs are sources.
+# 'optional' nodes need tools that may not be installed (an SVG rasterizer,
+# ImageMagick) - a failure is a warning and dependents use the files on disk.
+# A node with a 'manifest' also owns every output that manifest lists,
+# each expected to match its recorded digest.
+NODES = {
+    'svg_png': {
+        'command': [PYTHON, 'assets/icon/generate_png.py'],
+        'inputs': ['assets/icon/app_icon.svg', *script_inputs('assets/icon/generate_png.py')],
+        'outputs': ['assets/icon/app_icon.png'],
+        'explicit': True,
+        'optional': True,
+    },
+    'launcher_icons': {
+        'command': [PYTHON, 'assets/icon/process_final_icon.py', 'assets/icon/app_icon.png'],
+        'inputs': ['assets/icon/app_icon.png', *script_inputs('assets/icon/process_final_icon.py')],
+        'outputs': [
+            'assets/icon/generated/manifest.json',
+            'android/app/src/main/res/mipmap-anydpi-v26/ic_launcher.xml',
+            'android/app/src/main/res/values/colors.xml',
+            'ios/Runner/Assets.xcassets/AppIcon.appiconset/Contents.json',
+            'macos/Runner/Assets.xcassets/AppIcon.appiconset/Contents.json',
+        ],
+        'manifest': 'assets/icon/generated/manifest.json',
+    },
+    'store_assets': {
+        'command': [PYTHON, 'assets/icon/store_assets.py', 'assets/icon/app_icon.png'],
+        'inputs': ['assets/icon/app_icon.png', *script_inputs('assets/icon/store_assets.py')],
+        'outputs': [
+            'assets/store/play_icon_512.png',
+            'assets/store/play_feature_graphic.png',
+            'assets/store/app_store_icon_1024.png',
+        ],
+    },
+    'flutter_variants': {
+        'command': [PYTHON, 'assets/icon/generate_flutter_variants.py'],
+        'inputs': ['assets/logo/coachguru_logo_raw.png', *script_inputs('assets/icon/generate_flutter_variants.py')],
+        'outputs': [
+            'assets/images/coachguru_logo.png',
+            'assets/images/2.0x/coachguru_logo.png',
+            'assets/images/3.0x/coachguru_logo.png',
+        ],
+    },
+    'favicons': {
+        'command': [PYTHON, 'docs/generate_favicons.py'],
+        'inputs': ['docs/assets/logo/coachguru_logo.png', *script_inputs('docs/generate_favicons.py')],
+        'outputs': ['docs/assets/logo/favicon.png', 'docs/assets/logo/favicon.ico'],
+    },
+    'screenshots': {
+        'command': ['bash', 'tools/generate_screenshots.sh'],
+        'inputs': ['screenshots/*', 'tools/generate_screenshots.sh'],
+        'outputs': ['docs/screenshots'],
+        'explicit': True,
+        'optional': True,
+    },
+    'framed_screenshots': {
+        'command': [PYTHON, 'docs/frame_screenshots.py'],
+        'inputs': ['docs/screenshots/*', 'docs/images/*', *script_inputs('docs/frame_screenshots.py')],
+        'outputs': ['docs/framed'],
+    },
+    'docs_assets': {
+        'command': [PYTHON, 'docs/fingerprint_assets.py'],
+        'inputs': [
+            'docs/images/*', 'docs/screenshots/*', 'docs/assets/logo/*', 'docs/branding/*.png',
+            'docs/index.html', 'docs/sitemap.xml', *script_inputs('docs/fingerprint_assets.py'),
+        ],
+        'outputs': ['docs/static'],
+    },
+}
+
+def expand_inputs(patterns):
+    """Input files of a node (globs expanded, sorted, literal paths kept even if missing)"""
+    paths = set()
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            paths.update(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+        else:
+            paths.add(pattern)
+    return sorted(paths)
+
+def path_digest(path):
+    """Digest of a file, or of a directory's file names and contents"""
+    if os.path.isfile(path):
+        return file_digest(path)
+    if os.path.isdir(path):
+        digest = hashlib.sha256()
+        for root, _, files in sorted(os.walk(path)):
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                digest.update(f'{os.path.relpath(file_path, path)}\0{file_digest(file_path)}\n'.encode())
+        return digest.hexdigest()
+    return None
+
+def node_stamp(node, digests):
+    """Digest of everything that determines a node's outputs"""
+    inputs = {path: digests(path) for path in expand_inputs(node['inputs'])}
+    encoded = json.dumps({'command': node['command'][1:], 'inputs': inputs}, sort_keys=True)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+def build_edges(nodes):
+    """{node: set of nodes it depends on}, from outputs that other nodes read"""
+    producers = {}
+    for name, node in nodes.items():
+        for output in node['outputs']:
+            if output in producers:
+                raise ValueError(f"{output} is produced by both {producers[output]} and {name}")
+            producers[output] = name
+
+    edges = {name: set() for name in nodes}
+    for name, node in nodes.items():
+        for pattern in node['inputs']:
+            for output, producer in producers.items():
+                reads = fnmatch.fnmatch(output, pattern) or pattern.startswith(output.rstrip('/') + '/')
+                if reads and producer != name:
+                    edges[name].add(producer)
+    return edges
+
+def select_nodes(targets, edges, nodes=NODES):
+    """Requested nodes plus everything they depend on
+
+    Explicit nodes are only selected by name - 'all' and dependencies
+    leave them out and read their checked-in outputs instead.
+    """
+    for name in targets:
+        if name != 'all' and name not in edges:
+            raise ValueError(f"unknown node: {name} (available: {', '.join(edges)})")
+    requested = set(targets) - {'all'}
+    if 'all' in targets:
+        requested |= {name for name in edges if not nodes[name].get('explicit')}
+    selected = set()
+    pending = list(requested)
+    while pending:
+        name = pending.pop()
+        if name not in selected:
+            selected.add(name)
+            pending.extend(dependency for dependency in edges[name]
+                           if not nodes[dependency].get('explicit') or dependency in requested)
+    return selected
+
+def topological_order(selected, edges):
+    """Selected nodes ordered dependencies-first (raises on cycles)"""
+    order = []
+    visiting = set()
+    def visit(name, path):
+        if name in order:
+            return
+        if name in visiting:
+            raise ValueError(f"dependency cycle: {' → '.join(path + [name])}")
+        visiting.add(name)
+        for dependency in sorted(edges[name] & selected):
+            visit(dependency, path + [name])
+        visiting.discard(name)
+        order.append(name)
+    for name in sorted(selected):
+        visit(name, [])
+    return order
+
+def load_state(path=STATE_PATH):
+    """Stamps and output digests recorded by the previous build"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_state(state, path=STATE_PATH):
+    """Write the state atomically"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def manifest_outputs(node):
+    """{path: sha256} of every output the node's manifest lists (empty without one)"""
+    manifest = load_manifest(node['manifest']) if node.get('manifest') else None
+    return {path: entry['sha256'] for path, entry in (manifest or {}).get('outputs', {}).items()}
+
+def node_outputs(node):
+    """Declared outputs plus the outputs listed in the node's manifest"""
+    return sorted(set(node['outputs']) | set(manifest_outputs(node)))
+
+def is_dirty(name, node, state, digests):
+    """Reason a node must run, or None if it is up to date"""
+    recorded = state.get(name)
+    if recorded is None:
+        return 'never built'
+    if recorded['stamp'] != node_stamp(node, digests):
+        return 'inputs changed'
+    # Declared outputs (the manifest among them) against the last build,
+    # then everything the manifest lists against its own digests
+    expected = {output: recorded['outputs'].get(output) for output in node['outputs']}
+    expected.update(manifest_outputs(node))
+    for output, digest in expected.items():
+        if digests(output) != digest:
+            return f'{output} missing or modified'
+    return None
+
+def run_node(name, node, workers):
+    """Run a node's command with a share of the pool workers,
+    return (returncode, captured output, seconds)"""
+    start = time.perf_counter()
+    env = dict(os.environ, **{WORKERS_ENV: str(workers)})
+    result = subprocess.run(node['command'], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, env=env)
+    return result.returncode, result.stdout, time.perf_counter() - start
+
+def build(targets=('all',), jobs=None, dry_run=False, nodes=NODES, state_path=STATE_PATH):
+    """Build the selected nodes, return the names of failed nodes
+
+    jobs (default: CPU count) is the worker budget shared by the nodes
+    running at once - a node starts only while workers are free, and gets
+    an even share of them for its own process pool (COACHGURU_WORKERS).
+    """
+    edges = build_edges(nodes)
+    selected = select_nodes(targets, edges, nodes)
+    order = topological_order(selected, edges)
+    state = load_state(state_path)
+
+    # Digests are memoized per pass - outputs of a finished node are re-read
+    digest_cache = {}
+    def digests(path):
+        if path not in digest_cache:
+            digest_cache[path] = path_digest(path)
+        return digest_cache[path]
+
+    budget = jobs or default_workers()
+    free_workers = budget
+    done = set()
+    failed = set()
+    warned = set()
+    running = {}
+    remaining = list(order)
+    with ThreadPoolExecutor(max_workers=budget) as pool:
+        while remaining or running:
+            # Start every node whose dependencies are done, while workers are free
+            ready = []
+            for name in list(remaining):
+                dependencies = edges[name] & selected
+                if dependencies & failed:
+                    print(f"⏭️  {name}: skipped (dependency failed)")
+                    failed.add(name)
+                    remaining.remove(name)
+                    continue
+                if not dependencies <= done:
+                    continue
+                remaining.remove(name)
+                # Outputs of dependencies just rebuilt must be re-read
+                for dependency in dependencies:
+                    for output in node_outputs(nodes[dependency]):
+                        digest_cache.pop(output, None)
+                reason = is_dirty(name, nodes[name], state, digests)
+                if reason is None:
+                    print(f"✅ {name}: up to date")
+                    done.add(name)
+                elif dry_run:
+                    print(f"🔨 {name}: would run ({reason})")
+                    done.add(name)
+                else:
+                    ready.append((name, reason))
+            for index, (name, reason) in enumerate(ready):
+                if not free_workers:
+                    # Back in line (dependencies-first order kept) until a node finishes
+                    remaining[:0] = [name for name, _ in ready[index:]]
+                    break
+                workers = max(1, free_workers // (len(ready) - index))
+                free_workers -= workers
+                print(f"🔨 {name}: running ({reason}, {workers} worker(s))")
+                running[pool.submit(run_node, name, nodes[name], workers)] = name, workers
+            if not running:
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name, workers = running.pop(future)
+                free_workers += workers
+                returncode, output, seconds = future.result()
+                if returncode != 0 and nodes[name].get('optional'):
+                    print(f"⚠️  {name}: failed ({seconds:.1f}s), continuing with the files on disk\n{output.rstrip()}")
+                    done.add(name)
+                    warned.add(name)
+                    continue
+                if returncode != 0:
+                    print(f"❌ {name}: failed ({seconds:.1f}s)\n{output.rstrip()}")
+                    failed.add(name)
+                    continue
+                for path in node_outputs(nodes[name]):
+                    digest_cache.pop(path, None)
+                state[name] = {
+                    'stamp': node_stamp(nodes[name], digests),
+                    'outputs': {path: digests(path) for path in node_outputs(nodes[name])},
+                }
+                save_state(state, state_path)
+                print(f"✅ {name}: built ({seconds:.1f}s)")
+                done.add(name)
+    if warned:
+        print(f"⚠️  Optional nodes failed, their checked-in outputs were used: {', '.join(sorted(warned))}")
+    return failed
+
+def print_graph(nodes=NODES):
+    """List nodes with their dependencies"""
+    edges = build_edges(nodes)
+    for name in topological_order(set(nodes), edges):
+        after = ', '.join(sorted(edges[name])) or '-'
+        flags = ', '.join(flag for flag in ('explicit', 'optional') if nodes[name].get(flag))
+        print(f"{name:<18} after: {after}" + (f" ({flags})" if flags else ''))
+        for output in nodes[name]['outputs']:
+            print(f"{'':<18} → {output}")
+        if nodes[name].get('manifest'):
+            print(f"{'':<18} → every output listed in {nodes[name]['manifest']}")
+
+def main():
+    """Main build function"""
+    parser = argparse.ArgumentParser(description="Build generated assets, rebuilding only what changed")
+    parser.add_argument('targets', nargs='*', default=['all'], help="nodes to build (default: all)")
+    parser.add_argument('-j', '--jobs', type=int,
+                        help="pool workers shared by the nodes running at once (default: CPU count)")
+    parser.add_argument('-n', '--dry-run', action='store_true', help="show what would run")
+    parser.add_argument('--list', action='store_true', help="show the build graph")
+    args = parser.parse_args()
+
+    if args.list:
+        print_graph()
+        return
+
+    start = time.perf_counter()
+    try:
+        failed = build(args.targets, args.jobs, args.dry_run)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+    elapsed = time.perf_counter() - start
+
+    if failed:
+        print(f"\n❌ Build failed: {', '.join(sorted(failed))} ({elapsed:.1f}s)")
+        sys.exit(1)
+    print(f"\n✅ Assets up to date ({elapsed:.1f}s)")
+
+if __name__ == "__main__":
+    main()
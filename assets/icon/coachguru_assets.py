@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Importable asset-generation API for build hooks and other tooling
+Takes a source (path, bytes or Image) and target specs, returns encoded
+outputs as in-memory bytes or streams them to a sink - no disk round trips
+
+    import sys; sys.path.insert(0, 'assets/icon')
+    import coachguru_assets
+    outputs = coachguru_assets.generate('assets/icon/app_icon.png', coachguru_assets.icon_targets())
+"""
+
+try:
+    from PIL import Image
+    import io
+    import os
+    import sys
+except ImportError:
+    print("❌ PIL/Pillow not installed. Install with: pip3 install Pillow")
+    sys.exit(1)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'logo'))
+
+from asset_pipeline import encoder_for, write_bytes
+from color_profile import normalize_to_srgb
+from generate_png import render_svg_sizes
+from process_final_icon import (
+    ANDROID_RES_DIR, ANDROID_SIZES, FOREGROUND_SIZES, IOS_ICON_DIR, IOS_SIZES,
+    extract_background_color, resize_with_padding,
+)
+from create_circular_logo import render_circular_logo
+
+# Raster size of SVG sources given by path (the largest launcher / iOS target)
+SVG_SOURCE_SIZE = 1024
+
+# Target spec keys and their defaults. 'name' is the output path relative
+# to the repo root; background 'auto' keeps the source background, None
+# makes a transparent-capable RGBA foreground.
+TARGET_DEFAULTS = {
+    'size': None,
+    'background': 'auto',
+    'shape': 'square',
+    'format': 'png',
+    'quality': None,
+    'linear_light': False,
+}
+
+def target(name, size, **spec):
+    """Build a target spec with defaults filled in"""
+    unknown = set(spec) - set(TARGET_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown target spec keys: {', '.join(sorted(unknown))}")
+    return {**TARGET_DEFAULTS, **spec, 'name': name, 'size': size}
+
+def normalize_target(spec):
+    """Fill defaults into a caller-supplied spec dict"""
+    rest = {key: value for key, value in spec.items() if key not in ('name', 'size')}
+    return target(spec['name'], spec['size'], **rest)
+
+def icon_targets(android_format='png', webp_quality=None):
+    """Target specs for the Android and iOS launcher icon sets"""
+    targets = []
+    for density, size in ANDROID_SIZES.items():
+        for name in ('ic_launcher', 'ic_launcher_round'):
+            targets.append(target(f'{ANDROID_RES_DIR}/mipmap-{density}/{name}.{android_format}', size,
+                                  format=android_format, quality=webp_quality))
+    for density, size in FOREGROUND_SIZES.items():
+        targets.append(target(f'{ANDROID_RES_DIR}/mipmap-{density}/ic_launcher_foreground.{android_format}', size,
+                              background=None, format=android_format, quality=webp_quality))
+    for filename, size in IOS_SIZES.items():
+        targets.append(target(f'{IOS_ICON_DIR}/{filename}', size))
+    return targets
+
+def load_source(source, svg_size=SVG_SOURCE_SIZE):
+    """Decode a source given as a path or encoded bytes (converted to sRGB), or take a PIL Image as is
+
+    SVG paths are rasterized at svg_size; OSError if no rasterizer is installed.
+    """
+    if isinstance(source, Image.Image):
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        img = Image.open(io.BytesIO(source))
+    elif os.fspath(source).endswith('.svg'):
+        renders, _ = render_svg_sizes(os.fspath(source), [svg_size])
+        if renders is None:
+            raise OSError("no SVG rasterizer found (install cairosvg, inkscape or rsvg-convert)")
+        img = Image.open(io.BytesIO(renders[svg_size]))
+    else:
+        img = Image.open(os.fspath(source))
+    img.load()
+    return normalize_to_srgb(img)
+
+def render_target(source_img, spec):
+    """Render one target spec from a decoded source, returns an Image"""
+    size = spec['size']
+    if spec['shape'] == 'circle':
+        return render_circular_logo(source_img, size)
+
+    background = spec['background']
+    if background == 'auto':
+        background = extract_background_color(source_img)
+    rendered = resize_with_padding(source_img.copy(), size, background, spec['linear_light'])
+    if spec['background'] is None and rendered.mode != 'RGBA':
+        rendered = rendered.convert('RGBA')
+    return rendered
+
+def render_key(spec):
+    """Identity of a render, ignoring the output name"""
+    return tuple(spec[key] for key in sorted(TARGET_DEFAULTS))
+
+def encode_target(source, spec):
+    """Render and encode one target, returns bytes"""
+    spec = normalize_target(spec)
+    rendered = render_target(load_source(source), spec)
+    return encoder_for(spec['format'], spec['quality'])(rendered)
+
+def generate(source, targets, sink=None):
+    """Render every target from one decode of source
+
+    Returns {name: bytes}, or streams each output to sink(name, data) as it
+    is encoded and returns the list of names. Targets that differ only by
+    name (e.g. ic_launcher / ic_launcher_round) are encoded once.
+    """
+    source_img = load_source(source)
+    encoded = {}
+    outputs = {}
+    names = []
+    for spec in map(normalize_target, targets):
+        key = render_key(spec)
+        if key not in encoded:
+            encoded[key] = encoder_for(spec['format'], spec['quality'])(render_target(source_img, spec))
+        if sink is None:
+            outputs[spec['name']] = encoded[key]
+        else:
+            sink(spec['name'], encoded[key])
+            names.append(spec['name'])
+    return outputs if sink is None else names
+
+def directory_sink(root):
+    """Sink that writes each output under root, for callers that want files"""
+    return lambda name, data: write_bytes(os.path.join(root, name), data)
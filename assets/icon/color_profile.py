@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Color management for decoded sources
+Sources with an embedded ICC profile (Display P3, Adobe RGB, CMYK...) are
+converted to sRGB once, when they are decoded - the decoded-source cache
+then keeps the converted pixels. Built transforms are cached by (profile
+digest, mode) for the run; whether a profile needs converting at all
+(sRGB-tagged exports do not) is cached on disk, so later runs skip it
+Imported by the generators - not run directly
+"""
+
+from PIL import Image
+import hashlib
+import io
+import json
+
+import render_cache
+
+try:
+    from PIL import ImageCms
+except ImportError:
+    ImageCms = None
+
+# Bump when the transform construction changes so cached verdicts are not reused
+TRANSFORM_VERSION = 1
+
+# Grid points per axis sampled to tell whether a profile changes any color
+# by more than PROFILE_TOLERANCE levels (i.e. is sRGB in all but name)
+PROBE_SIZE = 17
+PROFILE_TOLERANCE = 1
+
+# Transforms built in this run, by (profile digest, mode) - None for
+# profiles that leave the pixels unchanged, or that are not converted
+TRANSFORMS = {}
+
+def _open_profile(icc_profile):
+    """ImageCmsProfile of embedded profile bytes, None if unreadable"""
+    try:
+        return ImageCms.ImageCmsProfile(io.BytesIO(icc_profile))
+    except (OSError, ImageCms.PyCMSError):
+        return None
+
+def _build_transform(profile, mode):
+    """ImageCms transform from profile to sRGB (CMYK → RGB, otherwise mode → mode)"""
+    return ImageCms.buildTransform(
+        profile, ImageCms.createProfile('sRGB'), mode, 'RGB' if mode == 'CMYK' else mode,
+        renderingIntent=ImageCms.Intent.RELATIVE_COLORIMETRIC,
+    )
+
+def _is_identity(profile):
+    """True if converting from an RGB profile to sRGB moves no color by more than the tolerance"""
+    steps = [round(i * 255 / (PROBE_SIZE - 1)) for i in range(PROBE_SIZE)]
+    grid = bytes(channel for r in steps for g in steps for b in steps for channel in (r, g, b))
+    probe = Image.frombytes('RGB', (PROBE_SIZE ** 3, 1), grid)
+    converted = ImageCms.applyTransform(probe, _build_transform(profile, 'RGB')).tobytes()
+    return max(abs(a - b) for a, b in zip(grid, converted)) <= PROFILE_TOLERANCE
+
+def _profile_verdict(icc_profile, digest, profile):
+    """{'convert': bool} for a profile, from the render cache or worked out and stored"""
+    key = render_cache.cache_key({'icc_profile': TRANSFORM_VERSION, 'profile': digest})
+    cached = render_cache.lookup(key)
+    if cached is not None:
+        return json.loads(cached)
+    space = profile.profile.xcolor_space.strip()
+    verdict = {'space': space, 'convert': space == 'CMYK' or (space == 'RGB' and not _is_identity(profile))}
+    try:
+        render_cache.store(key, json.dumps(verdict).encode('utf-8'))
+    except OSError:
+        pass  # read-only or full cache directory - still used for this run
+    return verdict
+
+def srgb_transform(icc_profile, mode):
+    """Cached ImageCms transform to sRGB for images of mode with this profile,
+    None when nothing needs converting"""
+    digest = hashlib.sha256(icc_profile).hexdigest()
+    if (digest, mode) not in TRANSFORMS:
+        transform = None
+        profile = _open_profile(icc_profile)
+        if profile is not None:
+            verdict = _profile_verdict(icc_profile, digest, profile)
+            supported = {'RGB': ('RGB', 'RGBA'), 'CMYK': ('CMYK',)}.get(verdict['space'], ())
+            if verdict['convert'] and mode in supported:
+                transform = _build_transform(profile, mode)
+        TRANSFORMS[(digest, mode)] = transform
+    return TRANSFORMS[(digest, mode)]
+
+def normalize_to_srgb(img):
+    """img converted to sRGB if it carries an ICC profile (a new image), else img itself
+
+    Palette and gray-with-alpha images with an RGB profile are expanded to
+    RGB(A) first, so the profile applies to real color values; gray
+    profiles are left as they are.
+    """
+    icc_profile = img.info.get('icc_profile')
+    if not icc_profile or ImageCms is None:
+        return img
+    if img.mode in ('P', 'PA', 'LA'):
+        has_alpha = 'A' in img.getbands() or 'transparency' in img.info
+        expanded = img.convert('RGBA' if has_alpha else 'RGB')
+        if srgb_transform(icc_profile, expanded.mode) is None:
+            return img
+        expanded.info = dict(img.info)
+        img = expanded
+    transform = srgb_transform(icc_profile, img.mode)
+    if transform is None:
+        return img
+    converted = ImageCms.applyTransform(img, transform)  # alpha passes through untouched
+    converted.info = {key: value for key, value in img.info.items() if key != 'icc_profile'}
+    return converted
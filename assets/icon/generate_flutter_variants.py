@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Generate Flutter resolution-aware image variants (1.0x / 2.0x / 3.0x)
+Each asset is rendered at its logical size so low-density devices
+decode a small bitmap instead of the full-size master
+"""
+
+try:
+    from PIL import Image
+    import os
+    import sys
+except ImportError:
+    print("❌ PIL/Pillow not installed. Install with: pip3 install Pillow")
+    sys.exit(1)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'logo'))
+
+import render_cache
+from asset_pipeline import cached_render, file_digest, run_parallel
+from process_final_icon import resize_with_padding, extract_background_color
+from create_circular_logo import render_circular_logo
+from source_cache import open_decoded
+
+# Flutter image assets and the logical size (dp) they are displayed at.
+# The master is always the full-size source - never the generated 1.0x file.
+# assets/logo/coachguru_logo_circle.png is not displayed anywhere in lib/
+# (the header CircleAvatar shows coachguru_logo.png), so it has no logical
+# size - it stays the full-size file create_circular_logo.py writes.
+FLUTTER_IMAGE_ASSETS = {
+    'assets/images/coachguru_logo.png': {
+        'source': 'assets/logo/coachguru_logo_raw.png',
+        'logical_size': 58,  # Image.asset in the home header (58×58)
+        'shape': 'square',
+    },
+}
+
+# Device pixel ratios Flutter resolves variants for
+FLUTTER_SCALES = (1.0, 2.0, 3.0)
+
+# Bump when rendering changes so cached renders are not reused
+RENDER_VERSION = 2
+
+def variant_path(asset_path, scale):
+    """Path of the variant for a scale ('2.0x/' next to the main asset)"""
+    if scale == 1.0:
+        return asset_path
+    asset_dir, filename = os.path.split(asset_path)
+    return os.path.join(asset_dir, f'{scale:.1f}x', filename)
+
+def render_variant_image(source_path, size, shape, digest=None):
+    """Render one variant from the master source (mapped from the decoded-source cache)"""
+    source_img = open_decoded(source_path, digest)
+    if shape == 'circle':
+        return render_circular_logo(source_img, size)
+    return resize_with_padding(source_img.copy(), size, extract_background_color(source_img))
+
+def render_variant(source_path, output_path, size, shape):
+    """Write one variant, served from the render cache when possible"""
+    params = {
+        'generator': 'flutter_variant',
+        'version': RENDER_VERSION,
+        'source': file_digest(source_path),
+        'size': size,
+        'shape': shape,
+    }
+    cached_render([output_path], params, lambda: render_variant_image(source_path, size, shape, params['source']))
+    return output_path, size
+
+def variant_jobs(assets=None):
+    """Build one render job per (asset, scale) pair"""
+    assets = assets or FLUTTER_IMAGE_ASSETS
+    jobs = []
+    for asset_path, spec in assets.items():
+        for scale in FLUTTER_SCALES:
+            size = round(spec['logical_size'] * scale)
+            jobs.append((spec['source'], variant_path(asset_path, scale), size, spec['shape']))
+    return jobs
+
+def generate_flutter_variants(assets=None, workers=None):
+    """Render every variant of every asset in parallel"""
+    print("📱 Generating Flutter resolution variants...")
+
+    assets = assets or FLUTTER_IMAGE_ASSETS
+    for asset_path, spec in assets.items():
+        if not os.path.exists(spec['source']):
+            print(f"❌ Error: Source not found for {asset_path}: {spec['source']}")
+            sys.exit(1)
+
+    for output_path, size in run_parallel(render_variant, variant_jobs(assets), workers):
+        print(f"  → {output_path} ({size}×{size})")
+    render_cache.prune()
+
+    print("✅ Flutter variants generated")
+
+def main():
+    """Main processing function"""
+    generate_flutter_variants()
+    print("\n📋 Variants are picked up automatically for the assets listed in pubspec.yaml")
+
+if __name__ == "__main__":
+    main()
@@ -1,61 +1,137 @@
 #!/usr/bin/env python3
 """
 Generate PNG from SVG for CoachGuru app icon
-Requires: cairosvg or rsvg-convert
+Renders the SVG directly at every requested size (no downsampling)
+Requires: cairosvg (pip3 install cairosvg); inkscape or rsvg-convert are
+fallbacks when it is not installed
 """
 
 import subprocess
 import sys
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
-def generate_png_from_svg():
-    svg_path = "assets/icon/app_icon.svg"
-    png_path = "assets/icon/app_icon.png"
-    
-    # Try cairosvg first
-    try:
-        import cairosvg
-        cairosvg.svg2png(url=svg_path, write_to=png_path, output_width=1024, output_height=1024)
-        print(f"✅ Generated {png_path} using cairosvg")
-        return True
-    except ImportError:
-        pass
-    
-    # Try rsvg-convert (librsvg)
-    try:
+SVG_PATH = "assets/icon/app_icon.svg"
+PNG_PATH = "assets/icon/app_icon.png"
+SIZED_PNG_DIR = "assets/icon/generated/svg"
+
+def render_with_cairosvg(svg_path, sizes):
+    """Parse the SVG once in-process and render every size from the same tree"""
+    import io
+    from cairosvg.parser import Tree
+    from cairosvg.surface import PNGSurface
+
+    with open(svg_path, 'rb') as f:
+        tree = Tree(bytestring=f.read(), url=os.path.abspath(svg_path))
+
+    renders = {}
+    for size in sizes:
+        output = io.BytesIO()
+        PNGSurface(tree, output, 96, output_width=size, output_height=size).finish()
+        renders[size] = output.getvalue()
+    return renders
+
+def render_with_inkscape(svg_path, sizes):
+    """Render every size from one inkscape process using an action list"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        actions = []
+        for size in sizes:
+            actions += [
+                f"export-width:{size}",
+                f"export-height:{size}",
+                f"export-filename:{tmp_dir}/{size}.png",
+                "export-do",
+            ]
         result = subprocess.run(
-            ["rsvg-convert", "-w", "1024", "-h", "1024", "-o", png_path, svg_path],
+            ["inkscape", svg_path, f"--actions={';'.join(actions)}"],
             capture_output=True,
             text=True
         )
-        if result.returncode == 0:
-            print(f"✅ Generated {png_path} using rsvg-convert")
-            return True
-    except FileNotFoundError:
-        pass
-    
-    # Try inkscape
-    try:
-        result = subprocess.run(
-            ["inkscape", svg_path, "--export-filename", png_path, "--export-width=1024", "--export-height=1024"],
-            capture_output=True,
-            text=True
+        if result.returncode != 0:
+            return None
+
+        renders = {}
+        for size in sizes:
+            with open(f"{tmp_dir}/{size}.png", 'rb') as f:
+                renders[size] = f.read()
+        return renders
+
+def render_with_rsvg(svg_path, sizes):
+    """Render with rsvg-convert, one process per size (PNG on stdout), run concurrently
+
+    rsvg-convert takes a single output size per run, and downscaling one
+    large render would bring back the resampling blur at small sizes that
+    rendering per size avoids - so the processes stay, run side by side.
+    Every size still pays a process start and SVG parse; only the cairosvg
+    and inkscape paths avoid that.
+    """
+    def render(size):
+        return subprocess.run(
+            ["rsvg-convert", "-w", str(size), "-h", str(size), svg_path],
+            capture_output=True
         )
-        if result.returncode == 0:
-            print(f"✅ Generated {png_path} using inkscape")
-            return True
-    except FileNotFoundError:
-        pass
-    
-    print("❌ No SVG to PNG converter found. Please install one of:")
-    print("   - pip install cairosvg")
-    print("   - brew install librsvg (for rsvg-convert)")
-    print("   - brew install inkscape")
-    return False
+
+    with ThreadPoolExecutor(max_workers=min(len(sizes), os.cpu_count() or 1)) as pool:
+        results = list(pool.map(render, sizes))
+    if any(result.returncode != 0 for result in results):
+        return None
+    return {size: result.stdout for size, result in zip(sizes, results)}
+
+# Tried in order: in-process first, then a single batched CLI process,
+# then concurrent processes per size as the last resort (one process
+# start per size - install cairosvg to stay on the in-process path)
+SVG_RENDERERS = [
+    ('cairosvg', render_with_cairosvg, (ImportError, OSError)),  # OSError: no libcairo
+    ('inkscape', render_with_inkscape, FileNotFoundError),
+    ('rsvg-convert', render_with_rsvg, FileNotFoundError),
+]
+
+def render_svg_sizes(svg_path, sizes):
+    """Rasterize the SVG at every size, returns {size: PNG bytes} and the renderer used"""
+    sizes = sorted(set(sizes))
+    for name, renderer, missing_error in SVG_RENDERERS:
+        try:
+            renders = renderer(svg_path, sizes)
+        except missing_error:
+            continue
+        if renders is not None:
+            return renders, name
+    return None, None
+
+def sized_png_path(size):
+    """Output path for one rasterized size"""
+    if size == 1024:
+        return PNG_PATH
+    return f"{SIZED_PNG_DIR}/app_icon_{size}.png"
+
+def generate_png_from_svg(sizes=(1024,)):
+    renders, renderer = render_svg_sizes(SVG_PATH, sizes)
+    if renders is None:
+        print("❌ No SVG to PNG converter found. Please install one of:")
+        print("   - pip install cairosvg")
+        print("   - brew install inkscape")
+        print("   - brew install librsvg (for rsvg-convert)")
+        return False
+
+    for size, png_bytes in renders.items():
+        png_path = sized_png_path(size)
+        os.makedirs(os.path.dirname(png_path), exist_ok=True)
+        with open(png_path, 'wb') as f:
+            f.write(png_bytes)
+        print(f"✅ Generated {png_path} ({size}×{size}) using {renderer}")
+    if renderer == 'rsvg-convert':
+        print("💡 Rendered one rsvg-convert process per size - pip3 install cairosvg renders all sizes in-process")
+    return True
 
 if __name__ == "__main__":
-    if generate_png_from_svg():
+    sizes = (1024,)
+    if "--all-sizes" in sys.argv:
+        # Every launcher / foreground / iOS size the icon scripts produce
+        from process_final_icon import icon_target_sizes
+        sizes = icon_target_sizes()
+
+    if generate_png_from_svg(sizes):
         sys.exit(0)
     else:
         sys.exit(1)
-
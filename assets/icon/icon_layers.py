@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Appearance layers of the app icon - iOS dark and tinted, Android 13 themed
+(monochrome) - derived from the decoded source with vectorized NumPy
+The artwork is separated from its background (the corner color and the
+plate it sits on), then recolored per appearance
+Imported by process_final_icon.py - not run directly
+"""
+
+from PIL import Image
+
+try:
+    import numpy as np
+    from palette import dominant_colors, image_palette
+except ImportError:
+    np = None
+
+# Bump when layer extraction changes so cached renders are not reused
+LAYER_VERSION = 2
+
+# iOS appearances (Contents.json luminosity values) and the Android themed icon
+IOS_APPEARANCES = ('dark', 'tinted')
+MONOCHROME = 'monochrome'
+LAYERS = IOS_APPEARANCES + (MONOCHROME,)
+
+# Colors closer than this (RGB distance) to a background color are background
+BACKGROUND_TOLERANCE = 48
+
+# Width of the anti-aliased rim around the outer background, in pixels of a
+# 1024px source - removed together with it
+RIM_WIDTH = 3
+
+# The region inside the outer background is a plate (rounded square, circle)
+# when it fills at least this share of its bounding box
+PLATE_FILL = 0.75
+
+# Rec. 709 luma weights
+LUMA = np.array([0.2126, 0.7152, 0.0722]) if np is not None else None
+
+def _border_connected(mask):
+    """Pixels of mask reachable in a straight line from the image border
+    (the whole region for convex shapes such as a rounded plate)"""
+    reached = np.zeros_like(mask)
+    for axis in (0, 1):
+        reached |= np.logical_and.accumulate(mask, axis=axis)
+        reached |= np.flip(np.logical_and.accumulate(np.flip(mask, axis), axis=axis), axis)
+    return reached
+
+def _dilate(mask, radius):
+    """Grow a mask by radius pixels (4-neighbour steps)"""
+    for _ in range(radius):
+        grown = mask.copy()
+        grown[1:] |= mask[:-1]
+        grown[:-1] |= mask[1:]
+        grown[:, 1:] |= mask[:, :-1]
+        grown[:, :-1] |= mask[:, 1:]
+        mask = grown
+    return mask
+
+def _corner_color(rgba):
+    """Most common corner pixel (RGBA)"""
+    corners = [tuple(rgba[y, x]) for y in (0, -1) for x in (0, -1)]
+    return max(set(corners), key=corners.count)
+
+def separate_artwork(img):
+    """Coverage and background-free color of the artwork, per pixel
+
+    The outer background is the corner color wherever it reaches the image
+    border, plus its anti-aliased rim. The artwork sits on the plate inside
+    it (or on the corner color when there is no plate); every other color
+    is unmixed as a blend of that backdrop and one dominant artwork color,
+    so edges keep their exact coverage. Returns (alpha float32 HxW in 0..1,
+    color uint8 HxWx3, backdrop RGB).
+    """
+    rgba = np.asarray(img if img.mode == 'RGBA' else img.convert('RGBA'))
+    height, width = rgba.shape[:2]
+    palette, inverse, counts = image_palette(rgba)
+    opaque = rgba[..., 3] > 0
+
+    corner = _corner_color(rgba)
+    if corner[3] == 0:
+        outer_mask = ~opaque
+    else:
+        near_corner = np.linalg.norm(palette - np.asarray(corner[:3]), axis=1) <= BACKGROUND_TOLERANCE
+        outer_mask = near_corner[inverse].reshape(height, width) & opaque
+    rim = max(1, round(RIM_WIDTH * max(height, width) / 1024))
+    outer = _dilate(_border_connected(outer_mask), rim)
+
+    # The plate is the color just inside the outer background
+    backdrop = np.asarray(corner[:3], dtype=np.float64)
+    rows, cols = np.nonzero(~outer)
+    if len(rows):
+        box_area = (rows.max() - rows.min() + 1) * (cols.max() - cols.min() + 1)
+        band = _dilate(outer, rim) & ~outer
+        if len(rows) >= box_area * PLATE_FILL and band.any():
+            band_counts = np.bincount(inverse[band.ravel()], minlength=len(palette))
+            backdrop = palette[band_counts.argmax()].astype(np.float64)
+
+    inner_counts = np.bincount(inverse[(~outer & opaque).ravel()], minlength=len(palette))
+    offset = palette - backdrop
+    distance = np.linalg.norm(offset, axis=1)
+    dominant = dominant_colors(palette, inner_counts) if inner_counts.any() else palette[:0]
+    endpoints = dominant[np.linalg.norm(dominant - backdrop, axis=1) > BACKGROUND_TOLERANCE] - backdrop
+
+    colors = palette.astype(np.float64)
+    if len(endpoints) == 0:
+        coverage = np.zeros(len(palette))
+    else:
+        # Blend share t along backdrop → endpoint, and how far off that line p is
+        lengths = np.einsum('kc,kc->k', endpoints, endpoints)
+        t = (offset @ endpoints.T) / lengths
+        residual = np.linalg.norm(offset[:, None, :] - t[..., None] * endpoints[None], axis=2)
+        # Among the (near) best-fitting lines, the farthest endpoint spans the edge
+        fits = residual <= residual.min(axis=1, keepdims=True) + 2.0
+        best = np.where(fits, lengths, -1.0).argmax(axis=1)
+        index = np.arange(len(palette))
+        share = np.clip(t[index, best], 0.0, 1.0)
+        on_line = residual[index, best] <= BACKGROUND_TOLERANCE
+        coverage = np.where(on_line, share, np.clip(distance / BACKGROUND_TOLERANCE, 0.0, 1.0))
+        # Un-premultiply edge colors so they don't carry the backdrop along
+        blended = on_line & (share > 1 / 255) & (share < 1.0)
+        colors[blended] = backdrop + offset[blended] / share[blended, None]
+
+    alpha = (coverage[inverse].reshape(height, width) * (rgba[..., 3] / 255.0)).astype(np.float32)
+    alpha[outer] = 0.0
+    color = np.clip(np.rint(colors), 0, 255).astype(np.uint8)[inverse].reshape(height, width, 3)
+    return alpha, color, tuple(int(c) for c in backdrop)
+
+def _rgba(color, alpha):
+    """Image from uint8 color (HxWx3 or HxW gray) and float alpha 0..1"""
+    if color.ndim == 2:
+        color = np.repeat(color[..., None], 3, axis=2)
+    alpha = np.rint(alpha * 255).astype(np.uint8)
+    # Fully transparent pixels carry no color - keeps the PNGs small
+    color = np.where(alpha[..., None] > 0, color, 0).astype(np.uint8)
+    return Image.fromarray(np.dstack([color, alpha]))
+
+def appearance_layers(img):
+    """{layer: RGBA image} for every appearance, same size as img
+
+    dark: the artwork in its own colors on transparency
+    tinted: the artwork's luminance (iOS applies the tint to it)
+    monochrome: white, alpha from the artwork's luminance contrast with the
+    backdrop - so secondary colors stay visible as lighter shapes
+    """
+    alpha, color, backdrop = separate_artwork(img)
+    luma = color @ LUMA
+    contrast = np.abs(luma - float(np.asarray(backdrop) @ LUMA))
+    strong = contrast[alpha >= 0.5]
+    peak = strong.max() if strong.size else 0.0
+    mono_alpha = alpha * np.clip(contrast / peak, 0.0, 1.0) if peak > 0 else alpha
+    return {
+        'dark': _rgba(color, alpha),
+        'tinted': _rgba(np.clip(np.rint(luma), 0, 255).astype(np.uint8), alpha),
+        MONOCHROME: _rgba(np.full(alpha.shape, 255, dtype=np.uint8), mono_alpha),
+    }
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Local on-demand icon rendering service for docs previews and design reviews
+GET /render?source=assets/icon/app_icon.png&size=96&shape=circle&background=ffffff&format=webp
+Usage: python3 assets/icon/icon_server.py [--port 8765 | --socket /tmp/icons.sock] [--memory-entries 256]
+"""
+
+try:
+    from PIL import Image
+    import argparse
+    import os
+    import socketserver
+    import sys
+    import threading
+    import weakref
+    from collections import OrderedDict
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+except ImportError:
+    print("❌ PIL/Pillow not installed. Install with: pip3 install Pillow")
+    sys.exit(1)
+
+from asset_pipeline import cached_encode, encoder_for, file_digest
+from coachguru_assets import load_source, render_target, target
+
+# Bump when rendering changes so cached renders are not reused
+RENDER_VERSION = 2
+
+CONTENT_TYPES = {'png': 'image/png', 'webp': 'image/webp'}
+MAX_SIZE = 2048
+
+class LRUCache:
+    """Bounded thread-safe in-memory LRU"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+class SourceStore:
+    """Decoded sources keyed by (path, digest) - each source is decoded once
+
+    A per-key lock makes concurrent requests for the same new source wait
+    for the first decode instead of decoding it again. Locks are held
+    weakly, so one lives only while a request is using it.
+    """
+
+    def __init__(self, max_sources=8):
+        self.decoded = LRUCache(max_sources)
+        self.locks = weakref.WeakValueDictionary()
+        self.lock = threading.Lock()
+
+    def get(self, path, digest, svg_size=None):
+        key = (path, digest, svg_size)
+        img = self.decoded.get(key)
+        if img is not None:
+            return img
+        with self.lock:
+            key_lock = self.locks.get(key)
+            if key_lock is None:
+                key_lock = self.locks[key] = threading.Lock()
+        with key_lock:
+            img = self.decoded.get(key)
+            if img is None:
+                img = load_source(path, svg_size) if svg_size else load_source(path)
+                self.decoded.put(key, img)
+        return img
+
+class SourceDigests:
+    """File digests, recomputed only when the file's mtime or size changes"""
+
+    def __init__(self):
+        self.digests = {}
+        self.lock = threading.Lock()
+
+    def get(self, path):
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            cached = self.digests.get(path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        digest = file_digest(path)
+        with self.lock:
+            self.digests[path] = (stamp, digest)
+        return digest
+
+def parse_background(value):
+    """'auto', 'none' or a hex color like 0a1d47 / #0A1D47"""
+    if value in (None, '', 'auto'):
+        return 'auto'
+    if value == 'none':
+        return None
+    value = value.lstrip('#')
+    if len(value) != 6:
+        raise ValueError(f"background must be auto, none or a 6-digit hex color: {value}")
+    return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+
+def parse_request(query, root):
+    """Validate query parameters into (source path, target spec)"""
+    source = query.get('source', ['assets/icon/app_icon.png'])[0]
+    path = os.path.realpath(os.path.join(root, source))
+    if not path.startswith(root + os.sep) or not os.path.isfile(path):
+        raise ValueError(f"unknown source: {source}")
+
+    size = int(query.get('size', ['192'])[0])
+    if not 1 <= size <= MAX_SIZE:
+        raise ValueError(f"size must be between 1 and {MAX_SIZE}")
+    shape = query.get('shape', ['square'])[0]
+    if shape not in ('square', 'circle'):
+        raise ValueError("shape must be square or circle")
+    image_format = query.get('format', ['png'])[0]
+    if image_format not in CONTENT_TYPES:
+        raise ValueError("format must be png or webp")
+
+    spec = target(source, size, shape=shape, format=image_format,
+                  background=parse_background(query.get('background', [None])[0]))
+    return path, spec
+
+def make_handler(root, memory_cache, sources, digests):
+    """Request handler bound to the shared caches"""
+
+    class IconRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != '/render':
+                self.send_error(404, "Use /render?source=...&size=...")
+                return
+            try:
+                path, spec = parse_request(parse_qs(url.query), root)
+            except ValueError as e:
+                self.send_error(400, str(e))
+                return
+
+            digest = digests.get(path)
+            params = {
+                'generator': 'icon_server',
+                'version': RENDER_VERSION,
+                'source': digest,
+                'size': spec['size'],
+                'shape': spec['shape'],
+                'format': spec['format'],
+            }
+            # Circles are cut out on transparency - background does not apply
+            if spec['shape'] == 'square':
+                params['background'] = spec['background']
+            key = tuple(sorted((k, str(v)) for k, v in params.items()))
+
+            # Memory LRU first, then the shared on-disk render cache, then render
+            data = memory_cache.get(key)
+            source = 'memory'
+            if data is None:
+                # SVG sources are rasterized at the requested size, not downsampled
+                svg_size = spec['size'] if path.endswith('.svg') else None
+                render = lambda: render_target(sources.get(path, digest, svg_size), spec)
+                try:
+                    data, hit = cached_encode(params, render, encoder_for(spec['format']))
+                except (OSError, Image.DecompressionBombError) as e:
+                    # UnidentifiedImageError is an OSError: not an image, or no SVG rasterizer
+                    self.send_error(415, f"cannot decode source {os.path.relpath(path, root)}: {e}")
+                    return
+                except ValueError as e:
+                    self.send_error(400, f"cannot render source {os.path.relpath(path, root)}: {e}")
+                    return
+                source = 'disk' if hit else 'render'
+                memory_cache.put(key, data)
+
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPES[spec['format']])
+            self.send_header('Content-Length', str(len(data)))
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('X-Render-Cache', source)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def address_string(self):
+            # Unix-socket clients have no address
+            return self.client_address[0] if self.client_address else 'unix'
+
+        def log_message(self, fmt, *args):
+            print(f"  → {self.address_string()} {fmt % args}")
+
+    return IconRequestHandler
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """ThreadingHTTPServer over a Unix socket"""
+    daemon_threads = True
+
+def main():
+    """Start the rendering service"""
+    parser = argparse.ArgumentParser(description="Serve rendered icons on demand")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--socket', help="listen on a Unix socket instead of TCP")
+    parser.add_argument('--root', default='.', help="directory sources are resolved against")
+    parser.add_argument('--memory-entries', type=int, default=256,
+                        help="encoded images kept in the in-memory LRU")
+    args = parser.parse_args()
+
+    root = os.path.realpath(args.root)
+    handler = make_handler(root, LRUCache(args.memory_entries), SourceStore(), SourceDigests())
+    if args.socket:
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+        server = ThreadingUnixHTTPServer(args.socket, handler)
+        print(f"🎨 Icon render service on unix:{args.socket} /render")
+    else:
+        server = ThreadingHTTPServer((args.host, args.port), handler)
+        print(f"🎨 Icon render service on http://{args.host}:{args.port}/render")
+    print("   Example: /render?source=assets/icon/app_icon.png&size=96&shape=circle&format=webp")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n✅ Stopped")
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Vectorized palette helpers shared by the recolor stage and the appearance
+layers - every distinct color is processed once instead of every pixel
+Imported by recolor.py and icon_layers.py - not run directly
+"""
+
+import numpy as np
+
+# Colors covering at least this share of opaque pixels form an image's
+# palette (at most MAX_ENDPOINTS of them)
+DOMINANT_SHARE = 0.005
+MAX_ENDPOINTS = 16
+
+def pack_rgb(rgb):
+    """(..., 3) uint8 → (...) uint32 0xRRGGBB"""
+    rgb = rgb.astype(np.uint32)
+    return (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+def unpack_rgb(packed):
+    """(...) uint32 0xRRGGBB → (..., 3) int32"""
+    return np.stack([(packed >> 16) & 255, (packed >> 8) & 255, packed & 255], axis=-1).astype(np.int32)
+
+def image_palette(pixels):
+    """Distinct colors of an image, the index of each pixel, and the counts
+    of opaque pixels per color"""
+    packed = pack_rgb(pixels[..., :3]).ravel()
+    colors, inverse = np.unique(packed, return_inverse=True)
+    opaque = pixels[..., 3].ravel() > 0 if pixels.shape[-1] == 4 else None
+    counts = np.bincount(inverse, weights=opaque, minlength=len(colors))
+    return unpack_rgb(colors), inverse, counts
+
+def dominant_colors(palette, counts):
+    """The palette's most common colors, most common first"""
+    order = np.argsort(counts)[::-1][:MAX_ENDPOINTS]
+    return palette[order][counts[order] >= max(counts.sum() * DOMINANT_SHARE, 1)]
@@ -1,22 +1,325 @@
 #!/usr/bin/env python3
 """
 Process final uploaded app icon - EXACT image, no redesign
-Generates all Android and iOS icon sizes
+Generates all Android and iOS icon sizes, plus the macOS, Windows and web
+icons from the same decoded source
 """
 
 try:
     from PIL import Image, ImageDraw
+    import argparse
+    import io
+    import json
     import os
+    import re
     import sys
-    import shutil
 except ImportError:
     print("❌ PIL/Pillow not installed. Install with: pip3 install Pillow")
     sys.exit(1)
 
-# Background color from icon
-NAVY_BLUE = (10, 29, 71)  # #0A1D47
+import render_cache
+from brand import NAVY_BLUE, write_colors_xml
+from asset_pipeline import (
+    cached_encode, default_workers, encode_ico, encoder_for, file_digest, format_memory, journal_result,
+    load_journal, load_manifest, manifest_sizes, parse_memory, print_size_report, run_parallel, save_png,
+    size_report, write_bytes, write_json_atomic, write_manifest, write_size_report,
+)
+from resample import (
+    add_pyramid, cached_linear_pyramid, linear_pyramid, numpy_available, pyramid_key,
+    resize_batch, resize_linear_light, resize_premultiplied, thumbnail_size,
+)
+from icon_layers import IOS_APPEARANCES, LAYER_VERSION, MONOCHROME, appearance_layers
+from shared_source import attach_array, attach_image, release_shared, share_array, share_image
+from color_profile import normalize_to_srgb
+from source_cache import map_decoded, map_pyramid, store_pyramid
 
-def resize_with_padding(img, target_size, background_color=None):
+ANDROID_RES_DIR = 'android/app/src/main/res'
+IOS_ICON_DIR = 'ios/Runner/Assets.xcassets/AppIcon.appiconset'
+MACOS_ICON_DIR = 'macos/Runner/Assets.xcassets/AppIcon.appiconset'
+WINDOWS_ICO_PATH = 'windows/runner/resources/app_icon.ico'
+WEB_DIR = 'web'
+GENERATED_DIR = 'assets/icon/generated'
+MANIFEST_PATH = f'{GENERATED_DIR}/manifest.json'
+SIZE_REPORT_PATH = f'{GENERATED_DIR}/size_report.json'
+JOURNAL_PATH = f'{GENERATED_DIR}/journal.json'
+
+# Android mipmap sizes
+ANDROID_SIZES = {
+    'mdpi': 48,
+    'hdpi': 72,
+    'xhdpi': 96,
+    'xxhdpi': 144,
+    'xxxhdpi': 192,
+}
+
+# Adaptive icon foreground sizes (108dp per density)
+FOREGROUND_SIZES = {
+    'mdpi': 108,
+    'hdpi': 162,
+    'xhdpi': 216,
+    'xxhdpi': 324,
+    'xxxhdpi': 432,
+}
+
+# iOS icon sizes
+IOS_SIZES = {
+    'Icon-App-20x20@1x.png': 20,
+    'Icon-App-20x20@2x.png': 40,
+    'Icon-App-20x20@3x.png': 60,
+    'Icon-App-29x29@1x.png': 29,
+    'Icon-App-29x29@2x.png': 58,
+    'Icon-App-29x29@3x.png': 87,
+    'Icon-App-40x40@1x.png': 40,
+    'Icon-App-40x40@2x.png': 80,
+    'Icon-App-40x40@3x.png': 120,
+    'Icon-App-60x60@2x.png': 120,
+    'Icon-App-60x60@3x.png': 180,
+    'Icon-App-76x76@1x.png': 76,
+    'Icon-App-76x76@2x.png': 152,
+    'Icon-App-83.5x83.5@2x.png': 167,
+    'Icon-App-1024x1024@1x.png': 1024,
+}
+
+# Contents.json idiom per point size (all others are iphone)
+IOS_IDIOMS = {
+    '76x76': 'ipad',
+    '83.5x83.5': 'ipad',
+    '1024x1024': 'ios-marketing',
+}
+
+# App Store Connect rejects a marketing icon with an alpha channel
+IOS_MARKETING_ICON = 'Icon-App-1024x1024@1x.png'
+
+# Dark / tinted appearances are single-size: one 1024×1024 universal image
+# each, scaled by Xcode - actool warns about appearances on legacy sizes
+IOS_APPEARANCE_SIZES = {IOS_MARKETING_ICON: 1024}
+
+# macOS icon files; Contents.json uses each for a point size at 1x or 2x
+MACOS_SIZES = {f'app_icon_{size}.png': size for size in (16, 32, 64, 128, 256, 512, 1024)}
+MACOS_POINTS = (16, 32, 128, 256, 512)
+
+# Frames of the multi-resolution Windows icon
+WINDOWS_ICO_SIZES = (16, 24, 32, 48, 64, 128, 256)
+
+# Web / PWA icons (relative to WEB_DIR)
+WEB_ICONS = {
+    'favicon.png': 16,
+    'icons/Icon-192.png': 192,
+    'icons/Icon-512.png': 512,
+}
+WEB_MASKABLE_ICONS = {
+    'icons/Icon-maskable-192.png': 192,
+    'icons/Icon-maskable-512.png': 512,
+}
+
+# Maskable icons keep the whole icon inside the central 80% (the W3C safe
+# zone); the source background fills the rest, which masks may crop
+MASKABLE_SAFE_ZONE = 0.8
+
+# Byte budgets for the generated sets - a run over budget exits non-zero.
+# max_bytes caps the group total, max_asset_bytes every file in the group,
+# 'assets' overrides the cap for single files.
+SIZE_BUDGETS = {
+    'android_launcher': {
+        'patterns': [f'{ANDROID_RES_DIR}/mipmap-*/ic_launcher.*', f'{ANDROID_RES_DIR}/mipmap-*/ic_launcher_round.*'],
+        'max_bytes': 200 * 1024,
+        'max_asset_bytes': 48 * 1024,
+    },
+    'android_foreground': {
+        'patterns': [f'{ANDROID_RES_DIR}/mipmap-*/ic_launcher_foreground.*'],
+        'max_bytes': 350 * 1024,
+        'max_asset_bytes': 150 * 1024,
+    },
+    'adaptive_sources': {
+        'patterns': [f'{GENERATED_DIR}/*.png'],
+        'max_bytes': 160 * 1024,
+    },
+    'android_monochrome': {
+        'patterns': [f'{ANDROID_RES_DIR}/mipmap-*/ic_launcher_monochrome.*'],
+        'max_bytes': 200 * 1024,
+        'max_asset_bytes': 80 * 1024,
+    },
+    'ios': {
+        'patterns': [f'{IOS_ICON_DIR}/Icon-App-[0-9]*.png'],
+        'max_bytes': 700 * 1024,
+        'max_asset_bytes': 64 * 1024,
+        'assets': {f'{IOS_ICON_DIR}/Icon-App-1024x1024@1x.png': 512 * 1024},
+    },
+    'ios_appearances': {
+        'patterns': [f'{IOS_ICON_DIR}/Icon-App-Dark-*.png', f'{IOS_ICON_DIR}/Icon-App-Tinted-*.png'],
+        'max_bytes': 1024 * 1024,
+        'max_asset_bytes': 512 * 1024,
+    },
+    'macos': {
+        'patterns': [f'{MACOS_ICON_DIR}/*.png'],
+        'max_bytes': 900 * 1024,
+        'max_asset_bytes': 128 * 1024,
+        'assets': {f'{MACOS_ICON_DIR}/app_icon_1024.png': 512 * 1024, f'{MACOS_ICON_DIR}/app_icon_512.png': 192 * 1024},
+    },
+    'windows': {
+        'patterns': [WINDOWS_ICO_PATH],
+        'max_bytes': 128 * 1024,
+    },
+    'web': {
+        'patterns': [f'{WEB_DIR}/favicon.png', f'{WEB_DIR}/icons/*.png'],
+        'max_bytes': 600 * 1024,
+        'max_asset_bytes': 192 * 1024,
+    },
+}
+
+# Bump when rendering changes so cached renders are not reused
+RENDER_VERSION = 3
+
+# Command line render options, passed explicitly to every worker job
+DEFAULT_OPTIONS = {
+    'linear_light': False,    # --linear-light: resample in linear light
+    'android_format': 'png',  # --android-format: png or webp for mipmaps
+    'webp_quality': None,     # --webp-quality: lossy WebP quality, None = lossless
+    'appearances': numpy_available(),  # --no-appearances: skip dark / tinted / monochrome layers
+    'max_memory': None,       # --max-memory: memory budget in bytes, None = one worker per core
+}
+
+# Appearance layers are separated from a copy of the source capped at this
+# size - twice the largest layer target, and it bounds the per-pixel
+# working arrays of the separation for very large uploads
+LAYER_SOURCE_SIZE = 2048
+
+# Worker counts and peak memory of the budgeted runs (--max-memory)
+MEMORY_STATS = {}
+
+# Progress journal of the current run: its key and the outputs completed so
+# far ({first output path: job result}) - lets --resume skip finished jobs
+JOURNAL = {'run': None, 'completed': {}}
+
+# Options that change the rendered outputs (part of the journal's run key)
+OUTPUT_OPTIONS = ('linear_light', 'android_format', 'webp_quality', 'appearances')
+
+# Exact-size rasterizations of an SVG source, filled by prepare_svg_source()
+SVG_RENDERS = {}
+
+# Decoded sources and source digests, loaded lazily - cache hits never decode
+SOURCE_IMAGES = {}
+SOURCE_DIGESTS = {}
+
+# Raster sources mapped from the decoded-source cache - workers map the
+# same file instead of receiving a shared-memory copy
+MAPPED_SOURCES = set()
+
+# Appearance layers of decoded sources, derived lazily per (path, layer)
+LAYER_IMAGES = {}
+
+# Thumbnails of raster sources per (path, canvas size), from one batched
+# resize over every target size a run misses in the render cache
+PRESIZED = {}
+
+# Source modes resize_batch handles (others use Pillow per target)
+BATCH_MODES = ('L', 'RGB', 'RGBX', 'RGBA')
+
+# Shared-memory descriptors of decoded sources, handed to pool workers
+SHARED_SOURCES = {}
+
+def icon_target_sizes():
+    """Every distinct pixel size the icon sets are rendered at"""
+    sizes = set(ANDROID_SIZES.values()) | set(FOREGROUND_SIZES.values()) | set(IOS_SIZES.values())
+    sizes |= set(MACOS_SIZES.values()) | set(WINDOWS_ICO_SIZES) | set(WEB_ICONS.values())
+    sizes |= {round(size * MASKABLE_SAFE_ZONE) for size in WEB_MASKABLE_ICONS.values()}
+    return sorted(sizes)
+
+def prepare_svg_source(svg_path):
+    """Rasterize an SVG source once per target size instead of downsampling"""
+    from generate_png import render_svg_sizes
+    
+    renders, renderer = render_svg_sizes(svg_path, icon_target_sizes())
+    if renders is None:
+        print("❌ Error: No SVG to PNG converter found (see generate_png.py)")
+        sys.exit(1)
+    for size, png_bytes in renders.items():
+        SVG_RENDERS[size] = Image.open(io.BytesIO(png_bytes))
+        SVG_RENDERS[size].load()
+    print(f"🖼️  Rendered {len(renders)} sizes from SVG using {renderer}\n")
+
+def open_icon_source(source_icon_path):
+    """Decode the source icon once per run (largest SVG render for SVG sources)
+
+    Raster sources are mapped from the decoded-source cache when a previous
+    run (or another worker) already decoded the same file.
+    """
+    if source_icon_path not in SOURCE_IMAGES:
+        if source_icon_path.endswith('.svg'):
+            prepare_svg_source(source_icon_path)
+            source_img = SVG_RENDERS[max(SVG_RENDERS)]
+        else:
+            source_img = map_decoded(source_icon_path, source_digest(source_icon_path))
+            if source_img is None:
+                source_img = Image.open(source_icon_path)
+                source_img.load()
+                source_img = normalize_to_srgb(source_img)
+            else:
+                MAPPED_SOURCES.add(source_icon_path)
+        SOURCE_IMAGES[source_icon_path] = source_img
+    return SOURCE_IMAGES[source_icon_path]
+
+def source_digest(source_icon_path):
+    """Digest of the source file - identifies renders without decoding"""
+    if source_icon_path not in SOURCE_DIGESTS:
+        SOURCE_DIGESTS[source_icon_path] = file_digest(source_icon_path)
+    return SOURCE_DIGESTS[source_icon_path]
+
+def icon_layer(source_icon_path, layer):
+    """Appearance layer of the decoded source (all layers derived in one pass)"""
+    if (source_icon_path, layer) not in LAYER_IMAGES:
+        source_img = open_icon_source(source_icon_path)
+        if max(source_img.size) > LAYER_SOURCE_SIZE:
+            size = thumbnail_size(source_img, LAYER_SOURCE_SIZE)
+            if source_img.mode == 'RGBA':
+                source_img = resize_premultiplied(source_img, size)
+            else:
+                source_img = source_img.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+        for name, layer_img in appearance_layers(source_img).items():
+            LAYER_IMAGES.setdefault((source_icon_path, name), layer_img)
+    return LAYER_IMAGES[(source_icon_path, layer)]
+
+def ios_layer_filename(filename, layer):
+    """'Icon-App-20x20@2x.png', 'dark' → 'Icon-App-Dark-20x20@2x.png'"""
+    return filename.replace('Icon-App-', f'Icon-App-{layer.title()}-', 1)
+
+def source_for_size(source_icon_path, size):
+    """Exact-size SVG render or batch-resized thumbnail if there is one,
+    otherwise the source itself
+
+    Not copied - resize_with_padding leaves its input untouched, so workers
+    resize straight from the (possibly shared, read-only) source buffer.
+    """
+    if size in SVG_RENDERS:
+        return SVG_RENDERS[size]
+    if (source_icon_path, size) in PRESIZED:
+        return PRESIZED[(source_icon_path, size)]
+    return open_icon_source(source_icon_path)
+
+def presize_icon_source(source_icon_path, sizes):
+    """Resize the decoded source to every canvas size in one batched pass
+
+    The per-target resizes in resize_with_padding then see an image that
+    is already at its thumbnail size. Raster sources only - SVG sources
+    have exact renders, and linear-light runs resample from the pyramid.
+    resize_batch has no reducing_gap pre-pass, so presized outputs differ
+    slightly from the per-target path; quality_harness.py's 'batch'
+    thresholds bound the difference.
+    """
+    source_img = open_icon_source(source_icon_path)
+    if not numpy_available() or source_img.mode not in BATCH_MODES:
+        return
+    wanted = {}
+    for size in sizes:
+        thumbnail = thumbnail_size(source_img, size)
+        if size not in SVG_RENDERS and (source_icon_path, size) not in PRESIZED and thumbnail != source_img.size:
+            wanted[size] = thumbnail
+    if wanted:
+        resized = resize_batch(source_img, wanted.values())
+        for size, thumbnail in wanted.items():
+            PRESIZED[(source_icon_path, size)] = resized[thumbnail]
+
+def resize_with_padding(img, target_size, background_color=None, linear_light=False):
     """Resize image maintaining aspect ratio, add padding if needed"""
     # If no background specified, try to extract from image or use transparent
     if background_color is None:
@@ -34,8 +337,16 @@ def resize_with_padding(img, target_size, background_color=None):
         if len(background_color) == 4:  # RGBA
             background_color = background_color[:3]
     
-    # Resize maintaining aspect ratio
-    img.thumbnail((target_size, target_size), Image.Resampling.LANCZOS)
+    # Resize maintaining aspect ratio (optionally in linear light, so thin
+    # white strokes keep their brightness at small sizes)
+    if linear_light and img.mode in ('RGB', 'RGBX', 'RGBA') and numpy_available():
+        img = resize_linear_light(img, thumbnail_size(img, target_size))
+    elif img.mode == 'RGBA':
+        # Premultiplied so transparent pixels don't bleed color into edges
+        img = resize_premultiplied(img, thumbnail_size(img, target_size))
+    else:
+        # Same result as img.thumbnail(), without mutating a shared source
+        img = img.resize(thumbnail_size(img, target_size), Image.Resampling.LANCZOS, reducing_gap=2.0)
     
     # Create new image with target size
     if img.mode == 'RGBA':
@@ -73,129 +384,417 @@ def extract_background_color(img):
     
     return background_color
 
-def generate_android_icons(source_icon_path):
-    """Generate all Android icon sizes"""
-    print("📱 Generating Android icons...")
+def flatten(img, background):
+    """Opaque RGB copy of img, transparency composited onto background"""
+    if img.mode == 'RGB':
+        return img
+    img = img.convert('RGBA')
+    canvas = Image.new('RGB', img.size, background)
+    canvas.paste(img, (0, 0), img)
+    return canvas
+
+def render_layer_target(layer_img, size, linear_light=False):
+    """Scale an appearance layer like the icon itself, centered on transparency"""
+    if linear_light and numpy_available():
+        resized = resize_linear_light(layer_img, thumbnail_size(layer_img, size))
+    else:
+        resized = resize_premultiplied(layer_img, thumbnail_size(layer_img, size))
+    canvas = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    canvas.paste(resized, ((size - resized.width) // 2, (size - resized.height) // 2))
+    return canvas
+
+def render_icon_target(source_icon_path, size, background, linear_light=False, layer=None, safe_zone=None,
+                       opaque=False):
+    """Render one icon size; background 'auto' keeps the source background, None gives a foreground
+
+    layer renders an appearance layer ('dark', 'tinted', 'monochrome') instead;
+    safe_zone shrinks the icon to that share of the canvas (maskable icons);
+    opaque flattens transparency onto the background (App Store marketing icon).
+    """
+    if layer:
+        return render_layer_target(icon_layer(source_icon_path, layer), size, linear_light)
+    source_img = open_icon_source(source_icon_path)
+    bg_color = extract_background_color(source_img) if background == 'auto' else background
+    if safe_zone:
+        inner = round(size * safe_zone)
+        icon = resize_with_padding(source_for_size(source_icon_path, inner), inner, bg_color, linear_light)
+        resized = Image.new(icon.mode, (size, size), (*bg_color, 255) if icon.mode == 'RGBA' else bg_color)
+        resized.paste(icon, ((size - inner) // 2, (size - inner) // 2))
+    else:
+        resized = resize_with_padding(source_for_size(source_icon_path, size), size, bg_color, linear_light)
+    if background is None and resized.mode != 'RGBA':
+        resized = resized.convert('RGBA')
+    if opaque:
+        resized = flatten(resized, bg_color)
+    return resized
+
+def icon_params(source_icon_path, size, background, options, image_format, quality, layer=None, safe_zone=None,
+                opaque=False):
+    """Render cache key parameters for one icon output"""
+    params = {
+        'generator': 'process_final_icon',
+        'version': RENDER_VERSION,
+        'source': source_digest(source_icon_path),
+        'size': size,
+        'background': background,
+        'linear_light': options['linear_light'],
+        'format': image_format,
+        'quality': quality,
+    }
+    if layer:
+        params['layer'] = layer
+        params['layer_version'] = LAYER_VERSION
+    if safe_zone:
+        params['safe_zone'] = safe_zone
+    if opaque:
+        params['opaque'] = True
+    return params
+
+def write_icon_job(source_icon_path, size, background, output_paths, image_format, options,
+                   layer=None, safe_zone=None, opaque=False):
+    """Render, encode and write one icon size (runs in a worker process)
+
+    A job without output paths returns its encoded bytes instead (ICO frames).
+    """
+    rendered = []
+    def render():
+        # Rendered at most once, even when both WebP and PNG are encoded
+        if not rendered:
+            rendered.append(render_icon_target(
+                source_icon_path, size, background, options['linear_light'], layer, safe_zone, opaque))
+        return rendered[0]
+    
+    quality = options['webp_quality'] if image_format == 'webp' else None
+    params = icon_params(source_icon_path, size, background, options, image_format, quality, layer, safe_zone, opaque)
+    data, _ = cached_encode(params, render, encoder_for(image_format, quality))
+    for output_path in output_paths:
+        write_bytes(output_path, data)
+    if not output_paths:
+        return {'paths': [], 'data': data}
     
-    source_img = Image.open(source_icon_path)
-    bg_color = extract_background_color(source_img)
+    # PNG size of the same render, for the APK size report
+    png_size = len(data)
+    if image_format != 'png':
+        png_params = icon_params(source_icon_path, size, background, options, 'png', None, layer, safe_zone, opaque)
+        png_size = len(cached_encode(png_params, render)[0])
     
-    # Android mipmap sizes
-    android_sizes = {
-        'mdpi': 48,
-        'hdpi': 72,
-        'xhdpi': 96,
-        'xxhdpi': 144,
-        'xxxhdpi': 192,
+    return {
+        'paths': output_paths,
+        'bytes': len(data) * len(output_paths),
+        'png_bytes': png_size * len(output_paths),
     }
+
+def icon_job_cached(source_icon_path, size, background, output_paths, image_format, options,
+                    layer=None, safe_zone=None, opaque=False):
+    """True if a write_icon_job's output is already in the render cache"""
+    quality = options['webp_quality'] if image_format == 'webp' else None
+    params = icon_params(source_icon_path, size, background, options, image_format, quality, layer, safe_zone, opaque)
+    return render_cache.contains(render_cache.cache_key(params))
+
+def icon_job_memory(source_icon_path, size, background, output_paths, image_format, options,
+                    layer=None, safe_zone=None, opaque=False):
+    """Estimated peak bytes of one write_icon_job beyond the shared source"""
+    canvas = round(size * safe_zone) if safe_zone else size
+    # Canvas, resized copy, mode conversion and the encoder's buffers
+    estimate = 4 * size * size * 4
+    if layer or (size not in SVG_RENDERS and (source_icon_path, canvas) not in PRESIZED):
+        # Resampled here from the full-size source, pyramid level or layer:
+        # reduced copy, per-channel planes and resize intermediates
+        estimate += 3 * 4 * (2 * canvas) ** 2
+    return estimate
+
+def source_pyramid(source_icon_path, img):
+    """Register the linear-light pyramid of img, the decoded raster source,
+    return its PYRAMID_CACHE key
+
+    The levels are mapped from the decoded-source cache, computed and
+    stored there on a miss.
+    """
+    digest = source_digest(source_icon_path)
+    levels = map_pyramid(digest)
+    if levels is None:
+        levels = store_pyramid(digest, linear_pyramid(img))
+    key = pyramid_key(img)
+    add_pyramid(key, levels)
+    return key
+
+def share_icon_source(source_icon_path, options, layers=()):
+    """Decode the source once into shared memory (plus SVG renders / pyramid / layers)
+
+    A source mapped from the decoded-source cache is not copied - workers
+    map the cache entry themselves, and its pyramid levels likewise.
+    """
+    if source_icon_path not in SHARED_SOURCES:
+        source_img = open_icon_source(source_icon_path)
+        mapped = source_icon_path in MAPPED_SOURCES
+        shared = {
+            'path': source_icon_path,
+            'digest': source_digest(source_icon_path),
+            'source': None if mapped else share_image(source_img),
+            'svg': {size: share_image(render) for size, render in SVG_RENDERS.items()},
+            'pyramid': None,
+            'layers': {},
+            'presized': {},
+        }
+        if options['linear_light']:
+            # Workers see the shared (RGBX / RGBA) pixels, so key the pyramid on those
+            shared_img = source_img if mapped else attach_image(shared['source'])
+            if source_icon_path.endswith('.svg'):
+                levels = cached_linear_pyramid(shared_img)
+                shared['pyramid'] = (pyramid_key(shared_img), [share_array(level) for level in levels])
+            elif mapped and map_pyramid(shared['digest']) is not None:
+                shared['pyramid'] = (source_pyramid(source_icon_path, shared_img), None)
+            else:
+                key = source_pyramid(source_icon_path, shared_img)
+                shared['pyramid'] = (key, [share_array(level) for level in cached_linear_pyramid(shared_img)])
+        SHARED_SOURCES[source_icon_path] = shared
+        if shared['source'] and not source_icon_path.endswith('.svg'):
+            # The parent renders from the shared pixels too - drops its private decode
+            SOURCE_IMAGES[source_icon_path] = attach_image(shared['source'])
+    shared = SHARED_SOURCES[source_icon_path]
+    for layer in layers:
+        # Derived once in the parent, not once per worker
+        if layer not in shared['layers']:
+            shared['layers'][layer] = share_image(icon_layer(source_icon_path, layer))
+    for (path, size), presized in PRESIZED.items():
+        if path == source_icon_path and size not in shared['presized']:
+            shared['presized'][size] = share_image(presized)
+    return shared
+
+def attach_icon_source(shared):
+    """Pool worker initializer: use the parent's decoded source, zero-copy"""
+    SOURCE_DIGESTS[shared['path']] = shared['digest']
+    if shared['source']:
+        SOURCE_IMAGES[shared['path']] = attach_image(shared['source'])
+    else:
+        open_icon_source(shared['path'])  # mapped from the decoded-source cache
+    for size, descriptor in shared['svg'].items():
+        SVG_RENDERS[size] = attach_image(descriptor)
+    if shared['pyramid']:
+        key, levels = shared['pyramid']
+        if levels is None:
+            add_pyramid(key, map_pyramid(shared['digest']))
+        else:
+            add_pyramid(key, [attach_array(level) for level in levels])
+    for layer, descriptor in shared['layers'].items():
+        LAYER_IMAGES[(shared['path'], layer)] = attach_image(descriptor)
+    for size, descriptor in shared['presized'].items():
+        PRESIZED[(shared['path'], size)] = attach_image(descriptor)
+
+def release_icon_sources():
+    """Drop the parent's views of shared sources, then free the shared blocks"""
+    for source_icon_path in SHARED_SOURCES:
+        SOURCE_IMAGES.pop(source_icon_path, None)
+    SHARED_SOURCES.clear()
+    release_shared()
+
+def start_journal(source_icon_path, options, resume=False):
+    """Begin the run's progress journal, return how many outputs are already done
+
+    With resume, outputs an interrupted run with the same source and options
+    completed (and that are still intact on disk) are kept and not redone.
+    """
+    params = {option: options[option] for option in OUTPUT_OPTIONS}
+    params.update(source=source_digest(source_icon_path), version=RENDER_VERSION, layer_version=LAYER_VERSION)
+    JOURNAL['run'] = render_cache.cache_key(params)
+    JOURNAL['completed'] = load_journal(JOURNAL_PATH, JOURNAL['run']) if resume else {}
+    write_json_atomic({'run': JOURNAL['run'], 'completed': JOURNAL['completed']}, JOURNAL_PATH)
+    return len(JOURNAL['completed'])
+
+def journal_job(result):
+    """Record a finished job's outputs (called in the parent as each job completes)"""
+    if JOURNAL['run'] and result['paths']:
+        journal_result(JOURNAL_PATH, JOURNAL['run'], JOURNAL['completed'], result['paths'][0], result)
+
+def finish_journal():
+    """The run completed - nothing is left to resume"""
+    JOURNAL['run'] = None
+    JOURNAL['completed'] = {}
+    if os.path.exists(JOURNAL_PATH):
+        os.remove(JOURNAL_PATH)
+
+def run_icon_jobs(jobs):
+    """Run write_icon_job for every job; workers share one decode of the source
+
+    With a memory budget, concurrency follows the estimated peak of each job.
+    Jobs the journal already has are skipped; the rest are journaled as
+    they finish.
+    """
+    journaled = {index: JOURNAL['completed'][job[3][0]] for index, job in enumerate(jobs)
+                 if job[3] and job[3][0] in JOURNAL['completed']}
+    if journaled:
+        fresh = iter(run_icon_jobs([job for index, job in enumerate(jobs) if index not in journaled]))
+        return [journaled[index] if index in journaled else next(fresh) for index in range(len(jobs))]
     
-    base_dir = 'android/app/src/main/res'
+    misses = [job for job in jobs if not icon_job_cached(*job)]
+    options = jobs[0][5] if jobs else DEFAULT_OPTIONS
+    budget = {'on_result': lambda index, result: journal_job(result)}
+    if options.get('max_memory'):
+        budget.update(max_memory=options['max_memory'], stats=MEMORY_STATS)
+    if not misses:
+        # All hits never decode
+        return run_parallel(write_icon_job, jobs, job_memory=[0] * len(jobs), **budget)
+    source_icon_path = misses[0][0]
+    if not options['linear_light']:
+        # One pass over the source for every size of the run, not per generator
+        presize_icon_source(source_icon_path, icon_target_sizes())
+    elif not source_icon_path.endswith('.svg'):
+        # Pyramid from the decoded-source cache rather than rebuilt per run
+        source_pyramid(source_icon_path, open_icon_source(source_icon_path))
+    if len(jobs) <= 1 or default_workers() <= 1:
+        # Serial runs use the parent's images directly
+        return run_parallel(write_icon_job, jobs, job_memory=[0] * len(jobs), **budget)
+    layers = sorted({job[6] for job in misses if len(job) > 6 and job[6]})
+    shared = share_icon_source(source_icon_path, options, layers)
+    # Hits only read the cache
+    job_memory = [icon_job_memory(*job) if job in misses else 0 for job in jobs]
+    return run_parallel(write_icon_job, jobs, initializer=attach_icon_source, initargs=(shared,),
+                        job_memory=job_memory, **budget)
+
+def generate_android_icons(source_icon_path, options=DEFAULT_OPTIONS):
+    """Generate all Android icon sizes"""
+    print("📱 Generating Android icons...")
     
-    for density, size in android_sizes.items():
-        print(f"  → mipmap-{density}/ic_launcher.png ({size}×{size})...")
-        
-        # Resize icon with original background
-        resized = resize_with_padding(source_img.copy(), size, bg_color)
-        
-        # Create mipmap directory
-        mipmap_dir = f'{base_dir}/mipmap-{density}'
-        os.makedirs(mipmap_dir, exist_ok=True)
-        
-        # Save launcher icon
-        resized.save(f'{mipmap_dir}/ic_launcher.png', 'PNG', optimize=True)
+    ext = options['android_format']
+    jobs = []
+    
+    for density, size in ANDROID_SIZES.items():
+        print(f"  → mipmap-{density}/ic_launcher.{ext} ({size}×{size})...")
         
-        # Save round version (same image)
-        resized.save(f'{mipmap_dir}/ic_launcher_round.png', 'PNG', optimize=True)
+        # Launcher icon with original background, round version is the same image
+        mipmap_dir = f'{ANDROID_RES_DIR}/mipmap-{density}'
+        paths = [f'{mipmap_dir}/ic_launcher.{ext}', f'{mipmap_dir}/ic_launcher_round.{ext}']
+        jobs.append((source_icon_path, size, 'auto', paths, ext, options))
     
+    results = run_icon_jobs(jobs)
     print("✅ Android icons generated")
+    return results
 
-def generate_android_adaptive_icons(source_icon_path):
+def generate_android_adaptive_icons(source_icon_path, options=DEFAULT_OPTIONS):
     """Generate Android adaptive icon components"""
     print("📱 Generating Android adaptive icon components...")
     
-    source_img = Image.open(source_icon_path)
-    bg_color = extract_background_color(source_img)
+    ext = options['android_format']
     
-    # Foreground: 432×432 (scaled from uploaded icon)
+    # Foreground: 432×432 (scaled from uploaded icon), kept as PNG source asset
     print("  → Creating foreground.png (432×432)...")
-    foreground = resize_with_padding(source_img.copy(), 432, None)  # Use transparent/auto background
-    if foreground.mode != 'RGBA':
-        foreground = foreground.convert('RGBA')
-    os.makedirs('assets/icon/generated', exist_ok=True)
-    foreground.save('assets/icon/generated/foreground.png', 'PNG', optimize=True)
+    jobs = [(source_icon_path, 432, None, [f'{GENERATED_DIR}/foreground.png'], 'png', options)]
     
     # Background: 1080×1080 solid navy
     print("  → Creating background.png (1080×1080)...")
     background = Image.new('RGB', (1080, 1080), NAVY_BLUE)
-    background.save('assets/icon/generated/background.png', 'PNG', optimize=True)
+    save_png(background, f'{GENERATED_DIR}/background.png')
     
     # Copy foreground to all mipmap densities for adaptive icons
-    foreground_sizes = {
-        'mdpi': 108,
-        'hdpi': 162,
-        'xhdpi': 216,
-        'xxhdpi': 324,
-        'xxxhdpi': 432,
-    }
+    for density, size in FOREGROUND_SIZES.items():
+        path = f'{ANDROID_RES_DIR}/mipmap-{density}/ic_launcher_foreground.{ext}'
+        jobs.append((source_icon_path, size, None, [path], ext, options))
+    
+    # Android 13 themed icon layer, same placement as the foreground
+    if options['appearances']:
+        print(f"  → ic_launcher_monochrome.{ext} (themed icon, 108dp)...")
+        for density, size in FOREGROUND_SIZES.items():
+            path = f'{ANDROID_RES_DIR}/mipmap-{density}/ic_launcher_monochrome.{ext}'
+            jobs.append((source_icon_path, size, None, [path], ext, options, MONOCHROME))
     
-    base_dir = 'android/app/src/main/res'
-    for density, size in foreground_sizes.items():
-        resized_foreground = resize_with_padding(source_img.copy(), size, None)
-        if resized_foreground.mode != 'RGBA':
-            resized_foreground = resized_foreground.convert('RGBA')
-        mipmap_dir = f'{base_dir}/mipmap-{density}'
-        os.makedirs(mipmap_dir, exist_ok=True)
-        resized_foreground.save(f'{mipmap_dir}/ic_launcher_foreground.png', 'PNG', optimize=True)
+    results = run_icon_jobs(jobs)
+    background_size = os.path.getsize(f'{GENERATED_DIR}/background.png')
+    results.append({'paths': [f'{GENERATED_DIR}/background.png'], 'bytes': background_size, 'png_bytes': background_size})
     
     print("✅ Adaptive icon components generated")
+    return results
 
-def generate_ios_icons(source_icon_path):
+def generate_ios_icons(source_icon_path, options=DEFAULT_OPTIONS):
     """Generate all iOS icon sizes"""
     print("🍎 Generating iOS icons...")
     
-    source_img = Image.open(source_icon_path)
-    bg_color = extract_background_color(source_img)
-    
-    # iOS icon sizes
-    ios_sizes = {
-        'Icon-App-20x20@1x.png': 20,
-        'Icon-App-20x20@2x.png': 40,
-        'Icon-App-20x20@3x.png': 60,
-        'Icon-App-29x29@1x.png': 29,
-        'Icon-App-29x29@2x.png': 58,
-        'Icon-App-29x29@3x.png': 87,
-        'Icon-App-40x40@1x.png': 40,
-        'Icon-App-40x40@2x.png': 80,
-        'Icon-App-40x40@3x.png': 120,
-        'Icon-App-60x60@2x.png': 120,
-        'Icon-App-60x60@3x.png': 180,
-        'Icon-App-76x76@1x.png': 76,
-        'Icon-App-76x76@2x.png': 152,
-        'Icon-App-83.5x83.5@2x.png': 167,
-        'Icon-App-1024x1024@1x.png': 1024,
-    }
-    
-    ios_dir = 'ios/Runner/Assets.xcassets/AppIcon.appiconset'
-    os.makedirs(ios_dir, exist_ok=True)
+    jobs = []
     
-    for filename, size in ios_sizes.items():
+    for filename, size in IOS_SIZES.items():
         print(f"  → {filename} ({size}×{size})...")
-        resized = resize_with_padding(source_img.copy(), size, bg_color)
-        resized.save(f'{ios_dir}/{filename}', 'PNG', optimize=True)
+        # App icons must be PNG on iOS; the marketing icon must be opaque
+        jobs.append((source_icon_path, size, 'auto', [f'{IOS_ICON_DIR}/{filename}'], 'png', options,
+                     None, None, filename == IOS_MARKETING_ICON))
     
+    # Dark and tinted appearances (1024 only), in the same pass
+    for layer in IOS_APPEARANCES if options['appearances'] else ():
+        for filename, size in IOS_APPEARANCE_SIZES.items():
+            print(f"  → {ios_layer_filename(filename, layer)} ({layer} appearance)...")
+            path = f'{IOS_ICON_DIR}/{ios_layer_filename(filename, layer)}'
+            jobs.append((source_icon_path, size, None, [path], 'png', options, layer))
+    
+    results = run_icon_jobs(jobs)
     print("✅ iOS icons generated")
+    return results
 
-def create_android_adaptive_xml():
-    """Create Android adaptive icon XML files"""
+def generate_desktop_web_icons(source_icon_path, options=DEFAULT_OPTIONS):
+    """Generate the macOS set, the Windows ICO and the web / PWA icons in one pass"""
+    print("🖥️  Generating macOS, Windows and web icons...")
+    
+    jobs = []
+    for filename, size in MACOS_SIZES.items():
+        jobs.append((source_icon_path, size, 'auto', [f'{MACOS_ICON_DIR}/{filename}'], 'png', options))
+    print(f"  → macOS AppIcon.appiconset ({len(MACOS_SIZES)} sizes)...")
+    
+    # ICO frames come back as PNG bytes and are packed into one file below
+    ico_result = JOURNAL['completed'].get(WINDOWS_ICO_PATH)
+    frame_jobs = [] if ico_result else [
+        (source_icon_path, size, 'auto', [], 'png', options) for size in WINDOWS_ICO_SIZES]
+    print(f"  → {WINDOWS_ICO_PATH} ({', '.join(map(str, WINDOWS_ICO_SIZES))})...")
+    
+    for filename, size in WEB_ICONS.items():
+        jobs.append((source_icon_path, size, 'auto', [f'{WEB_DIR}/{filename}'], 'png', options))
+    for filename, size in WEB_MASKABLE_ICONS.items():
+        jobs.append((source_icon_path, size, 'auto', [f'{WEB_DIR}/{filename}'], 'png', options,
+                     None, MASKABLE_SAFE_ZONE))
+    print(f"  → {WEB_DIR}/ favicon and PWA icons (maskable: {MASKABLE_SAFE_ZONE:.0%} safe zone)...")
+    
+    all_results = run_icon_jobs(jobs + frame_jobs)
+    results, frames = all_results[:len(jobs)], all_results[len(jobs):]
+    if not ico_result:
+        ico_data = encode_ico([(size, frame['data']) for size, frame in zip(WINDOWS_ICO_SIZES, frames)])
+        write_bytes(WINDOWS_ICO_PATH, ico_data)
+        ico_result = {'paths': [WINDOWS_ICO_PATH], 'bytes': len(ico_data), 'png_bytes': len(ico_data)}
+        journal_job(ico_result)
+    results.append(ico_result)
+    
+    print("✅ macOS, Windows and web icons generated")
+    return results
+
+def print_android_size_report(results):
+    """Report the mipmap resource size compared with PNG"""
+    mipmap_results = [r for r in results if r['paths'][0].startswith(ANDROID_RES_DIR)]
+    total = sum(r['bytes'] for r in mipmap_results)
+    png_total = sum(r['png_bytes'] for r in mipmap_results)
+    if total == png_total or png_total == 0:
+        return
+    saved = png_total - total
+    print(f"\n📦 Android mipmap resources: {png_total / 1024:.1f} KB as PNG → "
+          f"{total / 1024:.1f} KB as WebP (saved {saved / 1024:.1f} KB, {saved * 100 / png_total:.0f}%)")
+
+def print_memory_report(max_memory):
+    """Worker count and peak memory of the run against --max-memory"""
+    if not MEMORY_STATS:
+        return
+    print(f"\n🧠 Memory budget {format_memory(max_memory)}: up to {MEMORY_STATS['workers']} worker(s)")
+    print(f"   Estimated peak: {format_memory(MEMORY_STATS['estimated_peak'])}")
+    print(f"   Measured peak:  {format_memory(MEMORY_STATS['measured_peak'])}")
+    if MEMORY_STATS['estimated_peak'] > max_memory:
+        print("   ⚠️  Some work needs more than the budget on its own - it ran without neighbours")
+
+def create_android_adaptive_xml(monochrome=False):
+    """Create Android adaptive icon XML files (with the themed icon layer if generated)"""
     print("📱 Creating Android adaptive icon XML files...")
     
     anydpi_dir = 'android/app/src/main/res/mipmap-anydpi-v26'
     os.makedirs(anydpi_dir, exist_ok=True)
     
-    xml_content = '''<?xml version="1.0" encoding="utf-8"?>
+    monochrome_layer = '''
+    <monochrome android:drawable="@mipmap/ic_launcher_monochrome"/>''' if monochrome else ''
+    xml_content = f'''<?xml version="1.0" encoding="utf-8"?>
 <adaptive-icon xmlns:android="http://schemas.android.com/apk/res/android">
     <background android:drawable="@color/ic_launcher_background"/>
-    <foreground android:drawable="@mipmap/ic_launcher_foreground"/>
+    <foreground android:drawable="@mipmap/ic_launcher_foreground"/>{monochrome_layer}
 </adaptive-icon>'''
     
     with open(f'{anydpi_dir}/ic_launcher.xml', 'w') as f:
@@ -210,165 +809,126 @@ def update_colors_xml():
     """Update or create colors.xml with background color"""
     print("📱 Updating colors.xml...")
     
-    colors_file = 'android/app/src/main/res/values/colors.xml'
-    os.makedirs(os.path.dirname(colors_file), exist_ok=True)
-    
-    colors_xml = '''<?xml version="1.0" encoding="utf-8"?>
-<resources>
-    <color name="ic_launcher_background">#0A1D47</color>
-</resources>'''
-    
-    with open(colors_file, 'w') as f:
-        f.write(colors_xml)
+    write_colors_xml(NAVY_BLUE)
     
     print("✅ colors.xml updated")
 
-def create_ios_contents_json():
+def ios_contents_images(appearances=()):
+    """Contents.json image entries: the default set, then for appearances a
+    universal 1024 any-appearance entry and one entry per appearance
+
+    Xcode pairs dark / tinted entries with the universal entry of the same
+    size that has no appearance - without it they are ignored.
+    """
+    images = []
+    for filename in IOS_SIZES:
+        points, scale = re.match(r'Icon-App-([\d.]+)x[\d.]+@(\dx)\.png$', filename).groups()
+        size = f'{points}x{points}'
+        images.append({'filename': filename, 'idiom': IOS_IDIOMS.get(size, 'iphone'), 'scale': scale, 'size': size})
+    if not appearances:
+        return images
+    for filename, size in IOS_APPEARANCE_SIZES.items():
+        images.append({'filename': filename, 'idiom': 'universal', 'platform': 'ios', 'size': f'{size}x{size}'})
+    for layer in appearances:
+        for filename, size in IOS_APPEARANCE_SIZES.items():
+            images.append({
+                'appearances': [{'appearance': 'luminosity', 'value': layer}],
+                'filename': ios_layer_filename(filename, layer),
+                'idiom': 'universal',
+                'platform': 'ios',
+                'size': f'{size}x{size}',
+            })
+    return images
+
+def create_ios_contents_json(appearances=()):
     """Create iOS Contents.json file"""
     print("🍎 Creating iOS Contents.json...")
     
-    contents_json = '''{
-  "images" : [
-    {
-      "filename" : "Icon-App-20x20@1x.png",
-      "idiom" : "iphone",
-      "scale" : "1x",
-      "size" : "20x20"
-    },
-    {
-      "filename" : "Icon-App-20x20@2x.png",
-      "idiom" : "iphone",
-      "scale" : "2x",
-      "size" : "20x20"
-    },
-    {
-      "filename" : "Icon-App-20x20@3x.png",
-      "idiom" : "iphone",
-      "scale" : "3x",
-      "size" : "20x20"
-    },
-    {
-      "filename" : "Icon-App-29x29@1x.png",
-      "idiom" : "iphone",
-      "scale" : "1x",
-      "size" : "29x29"
-    },
-    {
-      "filename" : "Icon-App-29x29@2x.png",
-      "idiom" : "iphone",
-      "scale" : "2x",
-      "size" : "29x29"
-    },
-    {
-      "filename" : "Icon-App-29x29@3x.png",
-      "idiom" : "iphone",
-      "scale" : "3x",
-      "size" : "29x29"
-    },
-    {
-      "filename" : "Icon-App-40x40@1x.png",
-      "idiom" : "iphone",
-      "scale" : "1x",
-      "size" : "40x40"
-    },
-    {
-      "filename" : "Icon-App-40x40@2x.png",
-      "idiom" : "iphone",
-      "scale" : "2x",
-      "size" : "40x40"
-    },
-    {
-      "filename" : "Icon-App-40x40@3x.png",
-      "idiom" : "iphone",
-      "scale" : "3x",
-      "size" : "40x40"
-    },
-    {
-      "filename" : "Icon-App-60x60@2x.png",
-      "idiom" : "iphone",
-      "scale" : "2x",
-      "size" : "60x60"
-    },
-    {
-      "filename" : "Icon-App-60x60@3x.png",
-      "idiom" : "iphone",
-      "scale" : "3x",
-      "size" : "60x60"
-    },
-    {
-      "filename" : "Icon-App-76x76@1x.png",
-      "idiom" : "ipad",
-      "scale" : "1x",
-      "size" : "76x76"
-    },
-    {
-      "filename" : "Icon-App-76x76@2x.png",
-      "idiom" : "ipad",
-      "scale" : "2x",
-      "size" : "76x76"
-    },
-    {
-      "filename" : "Icon-App-83.5x83.5@2x.png",
-      "idiom" : "ipad",
-      "scale" : "2x",
-      "size" : "83.5x83.5"
-    },
-    {
-      "filename" : "Icon-App-1024x1024@1x.png",
-      "idiom" : "ios-marketing",
-      "scale" : "1x",
-      "size" : "1024x1024"
-    }
-  ],
-  "info" : {
-    "author" : "xcode",
-    "version" : 1
-  }
-}'''
+    contents = {'images': ios_contents_images(appearances), 'info': {'author': 'xcode', 'version': 1}}
+    # Xcode's own formatting, so regenerating leaves no diff
+    contents_json = json.dumps(contents, indent=2, separators=(',', ' : '), sort_keys=True)
     
-    ios_dir = 'ios/Runner/Assets.xcassets/AppIcon.appiconset'
-    os.makedirs(ios_dir, exist_ok=True)
+    os.makedirs(IOS_ICON_DIR, exist_ok=True)
     
-    with open(f'{ios_dir}/Contents.json', 'w') as f:
+    with open(f'{IOS_ICON_DIR}/Contents.json', 'w') as f:
         f.write(contents_json)
     
     print("✅ Contents.json created")
 
-def delete_existing_icons():
-    """Delete existing icons before generating new ones"""
-    print("🗑️  Cleaning existing icons...")
-    
-    # Delete Android mipmap folders
-    android_res = 'android/app/src/main/res'
-    if os.path.exists(android_res):
-        for item in os.listdir(android_res):
-            if item.startswith('mipmap-'):
-                path = os.path.join(android_res, item)
-                if os.path.isdir(path):
-                    shutil.rmtree(path)
-                    print(f"  → Deleted {path}")
-    
-    # Delete iOS AppIcon.appiconset contents (keep folder, delete PNGs)
-    ios_dir = 'ios/Runner/Assets.xcassets/AppIcon.appiconset'
-    if os.path.exists(ios_dir):
-        for item in os.listdir(ios_dir):
-            if item.endswith('.png'):
-                path = os.path.join(ios_dir, item)
-                os.remove(path)
+def create_macos_contents_json():
+    """Create macOS Contents.json file"""
+    print("🖥️  Creating macOS Contents.json...")
+    
+    images = []
+    for points in MACOS_POINTS:
+        for scale in (1, 2):
+            images.append({
+                'filename': f'app_icon_{points * scale}.png',
+                'idiom': 'mac',
+                'scale': f'{scale}x',
+                'size': f'{points}x{points}',
+            })
+    contents = {'images': images, 'info': {'author': 'xcode', 'version': 1}}
+    contents_json = json.dumps(contents, indent=2, separators=(',', ' : '), sort_keys=True)
+    
+    os.makedirs(MACOS_ICON_DIR, exist_ok=True)
+    with open(f'{MACOS_ICON_DIR}/Contents.json', 'w') as f:
+        f.write(contents_json + '\n')
+    
+    print("✅ macOS Contents.json created")
+
+def delete_stale_icons(written):
+    """Delete icons a previous run left behind that this run did not write
+    (another mipmap format, sizes no longer generated)
+
+    Runs after the new set is complete - existing icons are replaced in
+    place, so an interrupted run never leaves the app without icons.
+    """
+    print("🗑️  Cleaning stale icons...")
+    written = set(written)
+    
+    # Android mipmap images (the adaptive icon XML is rewritten every run)
+    icon_files = []
+    if os.path.exists(ANDROID_RES_DIR):
+        for item in os.listdir(ANDROID_RES_DIR):
+            path = os.path.join(ANDROID_RES_DIR, item)
+            if item.startswith('mipmap-') and os.path.isdir(path):
+                icon_files += [os.path.join(path, name) for name in os.listdir(path)
+                               if name.endswith(('.png', '.webp'))]
+    
+    # iOS AppIcon.appiconset PNGs (keep folder and Contents.json)
+    if os.path.exists(IOS_ICON_DIR):
+        icon_files += [os.path.join(IOS_ICON_DIR, name) for name in os.listdir(IOS_ICON_DIR)
+                       if name.endswith('.png')]
+    
+    for path in sorted(icon_files):
+        if path not in written:
+            os.remove(path)
+            print(f"  → Deleted {path}")
+    
+    # Mipmap folders left empty (e.g. a density no longer generated)
+    if os.path.exists(ANDROID_RES_DIR):
+        for item in os.listdir(ANDROID_RES_DIR):
+            path = os.path.join(ANDROID_RES_DIR, item)
+            if item.startswith('mipmap-') and os.path.isdir(path) and not os.listdir(path):
+                os.rmdir(path)
                 print(f"  → Deleted {path}")
     
-    print("✅ Existing icons cleaned")
+    print("✅ Stale icons cleaned")
 
 def show_preview_table(source_icon_path):
     """Show preview table of all generated icons"""
-    source_img = Image.open(source_icon_path)
-    
     print("\n" + "="*70)
     print("📊 ICON GENERATION PREVIEW TABLE")
     print("="*70)
     print(f"\n📁 Source Icon: {source_icon_path}")
-    print(f"   Size: {source_img.size[0]}×{source_img.size[1]} pixels")
-    print(f"   Mode: {source_img.mode}")
+    if source_icon_path.endswith('.svg'):
+        print("   Size: vector (SVG, rendered at every target size)")
+    else:
+        # Header only - the pixels are decoded on the first cache miss
+        source_img = Image.open(source_icon_path)
+        print(f"   Size: {source_img.size[0]}×{source_img.size[1]} pixels")
+        print(f"   Mode: {source_img.mode}")
     
     print("\n📱 ANDROID ICONS")
     print("-" * 70)
@@ -392,6 +952,7 @@ def show_preview_table(source_icon_path):
     print("background.png     1080×1080   assets/icon/generated/")
     print("ic_launcher.xml     -          mipmap-anydpi-v26/")
     print("ic_launcher_round.xml -        mipmap-anydpi-v26/")
+    print("ic_launcher_monochrome 108dp   mipmap-*/ (themed icon)")
     
     print("\n🍎 iOS ICONS")
     print("-" * 70)
@@ -416,6 +977,17 @@ def show_preview_table(source_icon_path):
     ]
     for filename, size, scale in ios_sizes:
         print(f"{filename:<30} {size}×{size:<6} {scale}")
+    print(f"{'Icon-App-Dark-*, -Tinted-*':<30} {'1024×1024':<12} dark / tinted appearances")
+    
+    print("\n🖥️  DESKTOP AND WEB ICONS")
+    print("-" * 70)
+    print(f"{'Target':<30} {'Sizes'}")
+    print("-" * 70)
+    print(f"{'macOS AppIcon.appiconset':<30} {', '.join(str(size) for size in MACOS_SIZES.values())}")
+    print(f"{'Windows app_icon.ico':<30} {', '.join(map(str, WINDOWS_ICO_SIZES))} (one file)")
+    print(f"{'web favicon / Icon-*':<30} {', '.join(str(size) for size in WEB_ICONS.values())}")
+    print(f"{'web Icon-maskable-*':<30} {', '.join(str(size) for size in WEB_MASKABLE_ICONS.values())} "
+          f"(icon in {MASKABLE_SAFE_ZONE:.0%} safe zone)")
     
     print("\n" + "="*70)
     print("✅ All icons will be generated with EXACT uploaded image")
@@ -427,12 +999,44 @@ def show_preview_table(source_icon_path):
 
 def main():
     """Main processing function"""
-    if len(sys.argv) < 2:
-        print("Usage: python3 process_final_icon.py <icon_path>")
-        print("Example: python3 process_final_icon.py uploaded_icon.png")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description="Generate all Android, iOS, macOS, Windows and web icon sizes",
+        epilog="Example: python3 process_final_icon.py uploaded_icon.png",
+    )
+    parser.add_argument('icon_path', help="source icon (PNG/JPEG, or SVG to render every size directly)")
+    parser.add_argument('--linear-light', action='store_true',
+                        help="downscale in linear light (needs NumPy)")
+    parser.add_argument('--android-format', choices=('png', 'webp'), default='png',
+                        help="image format for the Android mipmaps (default: png)")
+    parser.add_argument('--webp-quality', type=int,
+                        help="lossy WebP quality 0-100 (default: lossless)")
+    parser.add_argument('--no-appearances', action='store_true',
+                        help="skip the iOS dark / tinted and Android themed icon layers")
+    parser.add_argument('--max-memory',
+                        help="memory budget, e.g. 2G or 1536M - worker count adapts to it "
+                             "(default: one worker per core)")
+    parser.add_argument('--resume', action='store_true',
+                        help=f"continue an interrupted run from its journal ({JOURNAL_PATH})")
+    args = parser.parse_args()
+    
+    source_icon_path = args.icon_path
     
-    source_icon_path = sys.argv[1]
+    if args.linear_light and not numpy_available():
+        print("⚠️  --linear-light needs NumPy (pip3 install numpy), using sRGB resampling")
+    if not args.no_appearances and not numpy_available():
+        print("⚠️  Dark / tinted / monochrome layers need NumPy (pip3 install numpy), skipping them")
+    try:
+        max_memory = parse_memory(args.max_memory) if args.max_memory else None
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+    options = {
+        'linear_light': args.linear_light and numpy_available(),
+        'android_format': args.android_format,
+        'webp_quality': args.webp_quality,
+        'appearances': not args.no_appearances and numpy_available(),
+        'max_memory': max_memory,
+    }
     
     if not os.path.exists(source_icon_path):
         print(f"❌ Error: Icon file not found: {source_icon_path}")
@@ -441,22 +1045,63 @@ def main():
     print("🎨 Processing FINAL app icon...")
     print(f"📁 Source: {source_icon_path}\n")
     
+    
     # Show preview table
     show_preview_table(source_icon_path)
     
-    # Delete existing icons
-    delete_existing_icons()
-    
     # Create generated directory
-    os.makedirs('assets/icon/generated', exist_ok=True)
+    os.makedirs(GENERATED_DIR, exist_ok=True)
+    
+    # Journal of completed outputs - an interrupted run continues with --resume
+    done = start_journal(source_icon_path, options, resume=args.resume)
+    if args.resume:
+        if done:
+            print(f"⏩ Resuming: {done} outputs already completed\n")
+        else:
+            print("⚠️  Nothing to resume for this source and options - starting over\n")
+    
+    # SVG sources are rasterized up front so every worker shares the renders
+    if source_icon_path.endswith('.svg'):
+        open_icon_source(source_icon_path)
     
     # Generate all icons
-    generate_android_icons(source_icon_path)
-    generate_android_adaptive_icons(source_icon_path)
-    generate_ios_icons(source_icon_path)
-    create_android_adaptive_xml()
+    results = []
+    try:
+        results += generate_android_icons(source_icon_path, options)
+        results += generate_android_adaptive_icons(source_icon_path, options)
+        results += generate_ios_icons(source_icon_path, options)
+        results += generate_desktop_web_icons(source_icon_path, options)
+    finally:
+        release_icon_sources()
+    written = [path for result in results for path in result['paths']]
+    create_android_adaptive_xml(monochrome=options['appearances'])
     update_colors_xml()
-    create_ios_contents_json()
+    create_ios_contents_json(IOS_APPEARANCES if options['appearances'] else ())
+    create_macos_contents_json()
+    
+    # Every output is in place - now drop icons the new set no longer has
+    delete_stale_icons(written)
+    finish_journal()
+    
+    # Keep the shared render cache under its size cap
+    render_cache.prune()
+    
+    # Record what was written so verify_icons.py can check the outputs
+    previous_sizes = manifest_sizes(load_manifest(MANIFEST_PATH))
+    manifest = write_manifest(written, MANIFEST_PATH)
+    print(f"📝 Manifest written: {MANIFEST_PATH}")
+    print_android_size_report(results)
+    if options['max_memory']:
+        print_memory_report(options['max_memory'])
+    
+    # Size deltas against the previous run, checked against the budgets
+    report = size_report(manifest_sizes(manifest), previous_sizes, SIZE_BUDGETS)
+    print_size_report(report)
+    write_size_report(report, SIZE_REPORT_PATH)
+    print(f"📝 Size report written: {SIZE_REPORT_PATH}")
+    if report['over_budget']:
+        print(f"\n❌ Over size budget: {', '.join(report['over_budget'])}")
+        sys.exit(1)
     
     print("\n✅ All icons generated and installed!")
     print("\n📋 Next steps - Run these commands:")
@@ -12,8 +12,7 @@ except ImportError:
     print("❌ PIL/Pillow not installed. Install with: pip3 install Pillow")
     sys.exit(1)
 
-# Colors
-NAVY_BLUE = (10, 29, 71)  # #0A1D47
+from brand import NAVY_BLUE, write_colors_xml
 
 def resize_with_padding(img, target_size, background_color=(255, 255, 255)):
     """Resize image maintaining aspect ratio, add padding if needed"""
@@ -177,16 +176,7 @@ def update_colors_xml():
     """Update or create colors.xml with background color"""
     print("📱 Updating colors.xml...")
     
-    colors_file = 'android/app/src/main/res/values/colors.xml'
-    os.makedirs(os.path.dirname(colors_file), exist_ok=True)
-    
-    colors_xml = '''<?xml version="1.0" encoding="utf-8"?>
-<resources>
-    <color name="ic_launcher_background">#0A3D91</color>
-</resources>'''
-    
-    with open(colors_file, 'w') as f:
-        f.write(colors_xml)
+    write_colors_xml(NAVY_BLUE)
     
     print("✅ colors.xml updated")
 
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Quality-vs-speed harness for icon resize paths
+Renders every target size through the reference resize_with_padding and
+through each candidate path, reports SSIM / PSNR / max error and timing
+Usage: python3 assets/icon/quality_harness.py [source] [--min-ssim 0.98] [--json]
+Exits 1 when a candidate falls below its threshold (per-candidate defaults
+below, or the --min-ssim / --min-psnr / --max-error overrides)
+"""
+
+try:
+    from PIL import Image
+    import numpy as np
+    import argparse
+    import json
+    import sys
+    import time
+except ImportError:
+    print("❌ Pillow and NumPy are required. Install with: pip3 install Pillow numpy")
+    sys.exit(1)
+
+from process_final_icon import BATCH_MODES, extract_background_color, icon_target_sizes, resize_with_padding
+from resample import resize_batch, thumbnail_size
+
+DEFAULT_SOURCE = 'assets/icon/app_icon.png'
+
+# SSIM constants for 8-bit data (Wang et al. 2004)
+SSIM_WINDOW = 7
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+
+def pad_to_square(resized, target_size, background_color):
+    """Center an already-resized image the way resize_with_padding does"""
+    if resized.mode == 'RGBA':
+        canvas = Image.new('RGBA', (target_size, target_size), (*background_color, 255))
+        canvas.paste(resized, ((target_size - resized.width) // 2, (target_size - resized.height) // 2), resized)
+    else:
+        canvas = Image.new(resized.mode, (target_size, target_size), background_color)
+        canvas.paste(resized, ((target_size - resized.width) // 2, (target_size - resized.height) // 2))
+    return canvas
+
+def fit_size(img, target_size):
+    """Size a thumbnail of img would have for a square target"""
+    scale = min(target_size / img.width, target_size / img.height, 1.0)
+    return max(1, round(img.width * scale)), max(1, round(img.height * scale))
+
+def resize_filter(resample):
+    """Candidate: single resize with a different filter"""
+    def candidate(img, target_size, background_color):
+        resized = img.resize(fit_size(img, target_size), resample)
+        return pad_to_square(resized, target_size, background_color)
+    return candidate
+
+def resize_pyramid(img, target_size, background_color):
+    """Candidate: cascaded 2× box reductions, then one LANCZOS step"""
+    while img.width >= target_size * 4 and img.height >= target_size * 4:
+        img = img.reduce(2)
+    resized = img.resize(fit_size(img, target_size), Image.Resampling.LANCZOS)
+    return pad_to_square(resized, target_size, background_color)
+
+def resize_draft_reduce(img, target_size, background_color):
+    """Candidate: integer reduce() close to the target (draft-style), then LANCZOS"""
+    factor = max(1, min(img.width, img.height) // (target_size * 2))
+    if factor > 1:
+        img = img.reduce(factor)
+    resized = img.resize(fit_size(img, target_size), Image.Resampling.LANCZOS)
+    return pad_to_square(resized, target_size, background_color)
+
+def resize_linear(img, target_size, background_color):
+    """Candidate: resize_with_padding in linear light"""
+    return resize_with_padding(img.copy(), target_size, background_color, linear_light=True)
+
+def resize_batched(img, target_size, background_color):
+    """Candidate: the presize path - resize_batch to the thumbnail, then resize_with_padding"""
+    if img.mode in BATCH_MODES:
+        thumbnail = thumbnail_size(img, target_size)
+        if thumbnail != img.size:
+            img = resize_batch(img, [thumbnail])[thumbnail]
+    return resize_with_padding(img.copy(), target_size, background_color)
+
+def resize_reference(img, target_size, background_color):
+    """Reference: the production resize_with_padding path"""
+    return resize_with_padding(img.copy(), target_size, background_color)
+
+# Candidate resize paths compared against the reference
+CANDIDATES = {
+    'bicubic': resize_filter(Image.Resampling.BICUBIC),
+    'bilinear': resize_filter(Image.Resampling.BILINEAR),
+    'pyramid': resize_pyramid,
+    'draft-reduce': resize_draft_reduce,
+    'linear-light': resize_linear,
+    'batch': resize_batched,
+}
+
+# Default thresholds per candidate: the worst SSIM / PSNR / max error
+# measured on app_icon.png over every icon target size, with a little
+# headroom - a default run fails only when a path gets worse than it was.
+# draft-reduce and linear-light differ from the reference by design;
+# batch skips the reference's reducing_gap pre-pass (see resize_batch).
+CANDIDATE_THRESHOLDS = {
+    'bicubic': {'min_ssim': 0.995, 'min_psnr': 35.0, 'max_error': 24},
+    'bilinear': {'min_ssim': 0.978, 'min_psnr': 27.0, 'max_error': 56},
+    'pyramid': {'min_ssim': 0.997, 'min_psnr': 37.0, 'max_error': 18},
+    'draft-reduce': {'min_ssim': 0.925, 'min_psnr': 20.0, 'max_error': 125},
+    'linear-light': {'min_ssim': 0.920, 'min_psnr': 17.5, 'max_error': 85},
+    'batch': {'min_ssim': 0.998, 'min_psnr': 37.0, 'max_error': 16},
+}
+
+def box_mean(a, window):
+    """Mean over every window×window block (valid region), via summed-area tables"""
+    padded = np.pad(a, ((1, 0), (1, 0)) + ((0, 0),) * (a.ndim - 2))
+    table = padded.cumsum(axis=0).cumsum(axis=1)
+    sums = (table[window:, window:] - table[:-window, window:]
+            - table[window:, :-window] + table[:-window, :-window])
+    return sums / (window * window)
+
+def ssim(reference, candidate):
+    """Mean SSIM over all channels with a uniform window"""
+    x = reference.astype(np.float64)
+    y = candidate.astype(np.float64)
+    window = min(SSIM_WINDOW, x.shape[0], x.shape[1])
+
+    mu_x = box_mean(x, window)
+    mu_y = box_mean(y, window)
+    var_x = box_mean(x * x, window) - mu_x * mu_x
+    var_y = box_mean(y * y, window) - mu_y * mu_y
+    cov_xy = box_mean(x * y, window) - mu_x * mu_y
+
+    numerator = (2 * mu_x * mu_y + SSIM_C1) * (2 * cov_xy + SSIM_C2)
+    denominator = (mu_x * mu_x + mu_y * mu_y + SSIM_C1) * (var_x + var_y + SSIM_C2)
+    return float((numerator / denominator).mean())
+
+def psnr(reference, candidate):
+    """Peak signal-to-noise ratio in dB (None for identical images)"""
+    mse = np.mean((reference.astype(np.float64) - candidate.astype(np.float64)) ** 2)
+    if mse == 0:
+        return None
+    return float(10 * np.log10(255.0 ** 2 / mse))
+
+def max_error(reference, candidate):
+    """Largest absolute per-channel difference"""
+    return int(np.abs(reference.astype(np.int16) - candidate.astype(np.int16)).max())
+
+def timed(func, *args):
+    """Run func and return (result, milliseconds)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+def as_array(img, mode):
+    """Pixel array in a common mode so reference and candidate compare"""
+    return np.asarray(img.convert(mode))
+
+def evaluate(source_img, sizes, candidates):
+    """Render each size through reference and candidates, return result rows"""
+    background_color = extract_background_color(source_img)
+    mode = 'RGBA' if source_img.mode == 'RGBA' else 'RGB'
+    rows = []
+    for size in sizes:
+        reference, reference_ms = timed(resize_reference, source_img, size, background_color)
+        reference_pixels = as_array(reference, mode)
+        rows.append({'size': size, 'path': 'reference', 'ms': reference_ms,
+                     'ssim': 1.0, 'psnr': None, 'max_error': 0})
+        for name in candidates:
+            result, ms = timed(CANDIDATES[name], source_img, size, background_color)
+            pixels = as_array(result, mode)
+            rows.append({
+                'size': size,
+                'path': name,
+                'ms': ms,
+                'ssim': ssim(reference_pixels, pixels),
+                'psnr': psnr(reference_pixels, pixels),
+                'max_error': max_error(reference_pixels, pixels),
+            })
+    return rows
+
+def candidate_thresholds(name, min_ssim=None, min_psnr=None, max_err=None):
+    """A candidate's default thresholds, with any command-line overrides applied"""
+    thresholds = dict(CANDIDATE_THRESHOLDS[name])
+    overrides = {'min_ssim': min_ssim, 'min_psnr': min_psnr, 'max_error': max_err}
+    thresholds.update((key, value) for key, value in overrides.items() if value is not None)
+    return thresholds
+
+def check_thresholds(rows, min_ssim=None, min_psnr=None, max_err=None):
+    """Rows that regress past any threshold"""
+    failures = []
+    for row in rows:
+        if row['path'] == 'reference':
+            continue
+        thresholds = candidate_thresholds(row['path'], min_ssim, min_psnr, max_err)
+        low_psnr = row['psnr'] is not None and row['psnr'] < thresholds['min_psnr']
+        if row['ssim'] < thresholds['min_ssim'] or low_psnr or row['max_error'] > thresholds['max_error']:
+            failures.append(row)
+    return failures
+
+def format_psnr(psnr_db):
+    """PSNR for display - None means the images are identical"""
+    return '∞' if psnr_db is None else f"{psnr_db:.2f}"
+
+def print_table(rows):
+    """Speed / quality table grouped by target size"""
+    print(f"{'Size':<8} {'Path':<14} {'Time':>9} {'SSIM':>8} {'PSNR':>9} {'MaxErr':>7}")
+    print("-" * 60)
+    for row in rows:
+        print(f"{row['size']:<8} {row['path']:<14} {row['ms']:>7.2f}ms "
+              f"{row['ssim']:>8.4f} {format_psnr(row['psnr']):>9} {row['max_error']:>7}")
+
+def main():
+    """Main harness function"""
+    parser = argparse.ArgumentParser(description="Compare icon resize paths against the reference")
+    parser.add_argument('source', nargs='?', default=DEFAULT_SOURCE)
+    parser.add_argument('--candidates', default=','.join(CANDIDATES),
+                        help="comma separated candidate paths")
+    parser.add_argument('--sizes', help="comma separated sizes (default: every icon target size)")
+    parser.add_argument('--min-ssim', type=float, help="override every candidate's minimum SSIM")
+    parser.add_argument('--min-psnr', type=float, help="override every candidate's minimum PSNR (dB)")
+    parser.add_argument('--max-error', type=int, help="override every candidate's maximum per-channel error")
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args()
+
+    candidates = [name for name in args.candidates.split(',') if name]
+    unknown = [name for name in candidates if name not in CANDIDATES]
+    if unknown:
+        print(f"❌ Unknown candidate(s): {', '.join(unknown)} (available: {', '.join(CANDIDATES)})")
+        sys.exit(2)
+    sizes = [int(size) for size in args.sizes.split(',')] if args.sizes else icon_target_sizes()
+
+    source_img = Image.open(args.source)
+    source_img.load()
+
+    rows = evaluate(source_img, sizes, candidates)
+    failures = check_thresholds(rows, args.min_ssim, args.min_psnr, args.max_error)
+
+    if args.json:
+        print(json.dumps({'source': args.source, 'results': rows,
+                          'failures': len(failures)}, indent=2))
+    else:
+        print(f"🔬 Resize quality harness: {args.source} ({source_img.width}×{source_img.height})\n")
+        print_table(rows)
+        for row in failures:
+            print(f"❌ {row['path']} at {row['size']}px: SSIM {row['ssim']:.4f}, "
+                  f"PSNR {format_psnr(row['psnr'])} dB, max error {row['max_error']}")
+        if not failures:
+            print("\n✅ All candidates within thresholds")
+
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Recolor already-rendered icon outputs to another brand color
+Maps each output's palette (and each frame of the Windows ICO) through a
+vectorized color LUT instead of re-rendering from the source, and writes
+a matching colors.xml. Variants are encoded fast (zlib level 1); --optimize
+(implied by --in-place) re-encodes them at full compression afterwards
+Usage: python3 assets/icon/recolor.py 1B5E20 [--from 0A1D47] [--name green | --in-place] [--optimize]
+"""
+
+try:
+    from PIL import Image
+    import numpy as np
+    import argparse
+    import io
+    import os
+    import sys
+    import time
+except ImportError:
+    print("❌ Pillow and NumPy are required. Install with: pip3 install Pillow numpy")
+    sys.exit(1)
+
+from asset_pipeline import (
+    PNG_SIGNATURE, cached_encode, describe_output, encode_ico, encoder_for, file_digest, load_manifest,
+    read_ico_frames, run_parallel, write_bytes, write_json_atomic, write_manifest,
+)
+from brand import COLORS_XML_PATH, NAVY_BLUE, hex_color, parse_hex_color, write_colors_xml
+from palette import dominant_colors, image_palette
+from process_final_icon import MANIFEST_PATH
+
+VARIANTS_DIR = 'assets/icon/generated/variants'
+
+# Bump when recoloring changes so cached variants are not reused
+RENDER_VERSION = 3
+
+# Output formats recolored, by extension
+RECOLOR_FORMATS = {'.png': 'png', '.webp': 'webp', '.ico': 'ico'}
+
+# Palette colors closer than this (RGB distance) to the brand color count as
+# the brand color (encoder noise, the icon's own shade of navy)
+MATCH_TOLERANCE = 48
+
+def recolor_lut(palette, counts, from_rgb, to_rgb, tolerance=MATCH_TOLERANCE):
+    """New color for every palette entry, or None if from_rgb is not in the image
+
+    The image's brand shade is the dominant color nearest from_rgb. Every
+    color is treated as a blend of the brand shade and one other dominant
+    color (the one whose line through the brand shade passes closest), and
+    moves by (to - brand) times its brand share - so anti-aliased edges
+    keep their exact coverage in the new color.
+    """
+    dominant = dominant_colors(palette, counts)
+    if len(dominant) == 0:
+        return None
+    distance_to_from = np.linalg.norm(dominant - np.asarray(from_rgb), axis=1)
+    if distance_to_from.min() > tolerance:
+        return None
+    brand = dominant[distance_to_from.argmin()].astype(np.float64)
+
+    offset = palette - brand
+    distance = np.linalg.norm(offset, axis=1)
+    endpoints = dominant[np.linalg.norm(dominant - brand, axis=1) > tolerance] - brand
+    if len(endpoints) == 0:
+        # Single-color image (e.g. the background layer): everything is brand
+        weight = np.ones(len(palette))
+    else:
+        # Blend share t along brand → endpoint, and how far off that line p is
+        lengths = np.einsum('kc,kc->k', endpoints, endpoints)
+        t = (offset @ endpoints.T) / lengths
+        residual = np.linalg.norm(offset[:, None, :] - t[..., None] * endpoints[None], axis=2)
+        # Among the (near) best-fitting lines, the farthest endpoint spans the edge
+        fits = residual <= residual.min(axis=1, keepdims=True) + 2.0
+        best = np.where(fits, lengths, -1.0).argmax(axis=1)
+        rows = np.arange(len(palette))
+        share = 1.0 - np.clip(t[rows, best], 0.0, 1.0)
+        # Colors that are no blend of the brand shade fade out with distance
+        falloff = np.clip(1.0 - distance / np.sqrt(lengths.min()), 0.0, 1.0)
+        weight = np.where(residual[rows, best] <= tolerance, share, falloff)
+
+    shift = np.asarray(to_rgb, dtype=np.float64) - brand
+    return np.clip(np.rint(palette + shift * weight[:, None]), 0, 255).astype(np.uint8)
+
+def recolor_image(img, from_rgb, to_rgb, tolerance=MATCH_TOLERANCE):
+    """Recolored copy of img (alpha untouched), or None if the brand color is absent"""
+    if img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA' if 'A' in img.getbands() or 'transparency' in img.info else 'RGB')
+    pixels = np.asarray(img)
+    palette, inverse, counts = image_palette(pixels)
+    lut = recolor_lut(palette, counts, from_rgb, to_rgb, tolerance)
+    if lut is None:
+        return None
+    recolored = np.array(pixels)
+    recolored[..., :3] = lut[inverse].reshape(pixels.shape[:2] + (3,))
+    return Image.fromarray(recolored)
+
+def recolor_encoded(data, from_rgb, to_rgb):
+    """Recolored image decoded from data, or None if the brand color is absent"""
+    with Image.open(io.BytesIO(data)) as img:
+        img.load()
+        return recolor_image(img, from_rgb, to_rgb)
+
+def recolor_ico(data, from_rgb, to_rgb):
+    """ICO data with its PNG frames recolored (fast-encoded), or None if no
+    frame has the brand color"""
+    encode = encoder_for('png', fast=True)
+    frames = []
+    changed = False
+    for size, frame in read_ico_frames(data):
+        recolored = recolor_encoded(frame, from_rgb, to_rgb)
+        changed = changed or recolored is not None
+        frames.append((size, frame if recolored is None else encode(recolored)))
+    return encode_ico(frames) if changed else None
+
+def optimize_ico(data):
+    """ICO data with every PNG frame re-encoded at full compression"""
+    return encode_ico([(size, encoder_for('png')(Image.open(io.BytesIO(frame))))
+                       for size, frame in read_ico_frames(data)])
+
+def recolor_output(input_path, output_path, from_rgb, to_rgb):
+    """Recolor one file and encode it in its own format (runs in a worker)
+
+    Encoded fast - optimize_output() is the separate full-compression pass.
+    Served from the render cache when the same file was already recolored
+    to the same color. Returns (output_path, changed) - changed compares
+    the written bytes with the input file, so cache hits report it too.
+    Outputs without the brand color are written byte for byte.
+    """
+    with open(input_path, 'rb') as f:
+        original = f.read()
+    image_format = RECOLOR_FORMATS[os.path.splitext(input_path)[1]]
+    params = {
+        'generator': 'recolor',
+        'version': RENDER_VERSION,
+        'source': file_digest(input_path),
+        'from': hex_color(from_rgb),
+        'to': hex_color(to_rgb),
+        'format': image_format,
+    }
+    if image_format == 'ico':
+        recolor, encode = recolor_ico, lambda data: data
+    else:
+        recolor, encode = recolor_encoded, encoder_for(image_format, fast=True)
+    # No brand color in this output - the variant keeps the input's bytes
+    data, _ = cached_encode(params, lambda: recolor(original, from_rgb, to_rgb),
+                            lambda recolored: original if recolored is None else encode(recolored))
+    write_bytes(output_path, data)
+    return output_path, data != original
+
+def optimize_output(path):
+    """Re-encode a fast-encoded variant at full compression (runs in a worker)
+
+    Lossless - the pixels stay the same. Cached by the fast file's digest.
+    """
+    image_format = RECOLOR_FORMATS[os.path.splitext(path)[1]]
+    params = {'generator': 'recolor_optimize', 'version': RENDER_VERSION, 'source': file_digest(path),
+              'format': image_format}
+    with open(path, 'rb') as f:
+        fast = f.read()
+    if image_format == 'ico':
+        render, encode = lambda: fast, optimize_ico
+    else:
+        render, encode = lambda: Image.open(io.BytesIO(fast)), encoder_for(image_format)
+    data, _ = cached_encode(params, render, encode)
+    write_bytes(path, data)
+    return path
+
+def recolorable(path):
+    """True unless path is an ICO with BMP frames (written by another tool)"""
+    if not path.endswith('.ico'):
+        return True
+    with open(path, 'rb') as f:
+        return all(frame.startswith(PNG_SIGNATURE) for _, frame in read_ico_frames(f.read()))
+
+def recolor_outputs(paths, output_root, from_rgb, to_rgb):
+    """Recolor every path into output_root ('' = in place), return the new paths"""
+    jobs = [(path, os.path.join(output_root, path) if output_root else path, from_rgb, to_rgb)
+            for path in paths]
+    return run_parallel(recolor_output, jobs)
+
+def optimize_outputs(paths):
+    """Second pass: full compression for every recolored output"""
+    return run_parallel(optimize_output, [(path,) for path in paths])
+
+def main():
+    """Main recolor function"""
+    parser = argparse.ArgumentParser(description="Recolor rendered icons to another brand color")
+    parser.add_argument('color', help="new brand color, e.g. 1B5E20")
+    parser.add_argument('--from', dest='from_color', default=hex_color(NAVY_BLUE),
+                        help=f"brand color to replace (default: {hex_color(NAVY_BLUE)})")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--name', help=f"variant name, written under {VARIANTS_DIR}/<name>/")
+    group.add_argument('--in-place', action='store_true', help="recolor the generated outputs themselves")
+    parser.add_argument('--optimize', action='store_true',
+                        help="re-encode the recolored files at full compression (always on with --in-place)")
+    parser.add_argument('--manifest', default=MANIFEST_PATH)
+    args = parser.parse_args()
+
+    try:
+        from_rgb = parse_hex_color(args.from_color)
+        to_rgb = parse_hex_color(args.color)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+
+    manifest = load_manifest(args.manifest)
+    if manifest is None:
+        print(f"❌ Error: {args.manifest} not found - run process_final_icon.py first")
+        sys.exit(1)
+    paths = sorted(path for path in manifest['outputs'] if path.endswith(tuple(RECOLOR_FORMATS)))
+    skipped = [path for path in paths if not recolorable(path)]
+    paths = [path for path in paths if path not in skipped]
+
+    name = args.name or args.color.lstrip('#').lower()
+    output_root = '' if args.in_place else os.path.join(VARIANTS_DIR, name)
+    print(f"🎨 Recoloring {len(paths)} outputs: {hex_color(from_rgb)} → {hex_color(to_rgb)}")
+
+    start = time.perf_counter()
+    results = recolor_outputs(paths, output_root, from_rgb, to_rgb)
+    written = [path for path, _ in results]
+    recolored = [path for path, changed in results if changed]
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    optimize_ms = None
+    if args.optimize or args.in_place:
+        optimize_start = time.perf_counter()
+        optimize_outputs(recolored)
+        optimize_ms = (time.perf_counter() - optimize_start) * 1000
+
+    colors_file = write_colors_xml(to_rgb, os.path.join(output_root, COLORS_XML_PATH))
+    if args.in_place:
+        # Only the recolored entries change - the rest of the manifest stays
+        manifest['outputs'].update((path, describe_output(path)) for path in written)
+        write_json_atomic(manifest, args.manifest)
+    else:
+        write_manifest(written, os.path.join(output_root, 'manifest.json'))
+
+    for path in sorted(set(written) - set(recolored)):
+        print(f"  ⚠️  {path}: no {hex_color(from_rgb)}-like color, copied unchanged")
+    for path in skipped:
+        print(f"  ⚠️  {path}: BMP frames, skipped (re-run process_final_icon.py to write PNG frames)")
+    print(f"✅ {len(written)} outputs recolored in {elapsed_ms:.0f} ms")
+    if optimize_ms is not None:
+        print(f"   Optimized {len(recolored)} files in {optimize_ms:.0f} ms")
+    print(f"   colors.xml: {colors_file}")
+    if not args.in_place:
+        print(f"   Variant: {output_root}/")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Shared on-disk content-addressed cache for rendered assets
+Keyed by source digest + render parameters, LRU-evicted to a size cap
+Decoded sources live in their own namespace with their own cap, so a few
+large raw entries never evict the small encoded renders (or vice versa)
+Usage: python3 assets/icon/render_cache.py stats|prune [max_bytes [decoded_max_bytes]]|clear
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+CACHE_DIR = os.environ.get(
+    'COACHGURU_ASSET_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'coachguru-assets'),
+)
+CACHE_MAX_BYTES = int(os.environ.get('COACHGURU_ASSET_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+DECODED_MAX_BYTES = int(os.environ.get('COACHGURU_DECODED_CACHE_MAX_BYTES', 1024 * 1024 * 1024))
+
+# Cache namespaces (subdirectories of CACHE_DIR), each LRU-evicted to its own cap:
+# encoded renders, and raw decoded sources / pyramids (source_cache.py)
+OBJECTS = 'objects'
+DECODED = 'decoded'
+
+def cache_enabled():
+    """The cache can be switched off with COACHGURU_NO_CACHE=1"""
+    return os.environ.get('COACHGURU_NO_CACHE') != '1'
+
+def cache_key(params):
+    """Stable key for a dict of render parameters (including the source digest)"""
+    encoded = json.dumps(params, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+def object_path(key, namespace=OBJECTS):
+    """Location of a cache entry (two-level fan-out like git objects)"""
+    return os.path.join(CACHE_DIR, namespace, key[:2], key[2:])
+
+def lookup(key, namespace=OBJECTS):
+    """Return the cached bytes for key, or None on a miss"""
+    if not cache_enabled():
+        return None
+    path = object_path(key, namespace)
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    # Bump mtime so eviction sees this entry as recently used
+    os.utime(path)
+    return data
+
+def contains(key, namespace=OBJECTS):
+    """True if key is cached (without reading or bumping the entry)"""
+    return cache_enabled() and os.path.exists(object_path(key, namespace))
+
+def store(key, data, namespace=OBJECTS):
+    """Store bytes under key (atomic rename, safe with parallel writers)"""
+    store_chunks(key, [data], namespace)
+
+def store_chunks(key, chunks, namespace=OBJECTS):
+    """Store the concatenated chunks under key without joining them in memory"""
+    if not cache_enabled():
+        return
+    path = object_path(key, namespace)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def entries(namespace=OBJECTS):
+    """All entries of a namespace as (mtime, bytes, path), oldest first"""
+    objects_dir = os.path.join(CACHE_DIR, namespace)
+    found = []
+    for root, _, files in os.walk(objects_dir):
+        for name in files:
+            if name.startswith('.tmp-'):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue  # evicted by a concurrent prune
+            found.append((stat.st_mtime, stat.st_size, path))
+    return sorted(found)
+
+def stats():
+    """Entry count and total size of the renders and of the decoded sources"""
+    found = entries()
+    decoded = entries(DECODED)
+    return {
+        'dir': CACHE_DIR,
+        'entries': len(found),
+        'bytes': sum(size for _, size, _ in found),
+        'max_bytes': CACHE_MAX_BYTES,
+        'decoded_entries': len(decoded),
+        'decoded_bytes': sum(size for _, size, _ in decoded),
+        'decoded_max_bytes': DECODED_MAX_BYTES,
+    }
+
+def prune(max_bytes=CACHE_MAX_BYTES, decoded_max_bytes=DECODED_MAX_BYTES):
+    """Evict least recently used entries until each namespace fits its cap
+
+    Returns the entries removed and the bytes left, over both namespaces.
+    """
+    removed, total = prune_namespace(OBJECTS, max_bytes)
+    decoded_removed, decoded_total = prune_namespace(DECODED, decoded_max_bytes)
+    return removed + decoded_removed, total + decoded_total
+
+def prune_namespace(namespace, max_bytes):
+    """Evict a namespace's least recently used entries until it fits in max_bytes"""
+    found = entries(namespace)
+    total = sum(size for _, size, _ in found)
+    removed = 0
+    for _, size, path in found:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except PermissionError:
+            continue  # mapped by a running process (Windows) - evicted next time
+        total -= size
+        removed += 1
+    return removed, total
+
+def format_bytes(count):
+    """Human readable byte count"""
+    if count < 1024:
+        return f"{count} B"
+    for unit in ('KB', 'MB', 'GB'):
+        count /= 1024
+        if count < 1024 or unit == 'GB':
+            return f"{count:.1f} {unit}"
+
+def main():
+    """Cache maintenance command"""
+    command = sys.argv[1] if len(sys.argv) > 1 else 'stats'
+
+    if command == 'stats':
+        info = stats()
+        print(f"📦 Render cache: {info['dir']}")
+        print(f"   Entries: {info['entries']}")
+        print(f"   Size:    {format_bytes(info['bytes'])} / {format_bytes(info['max_bytes'])}")
+        print(f"   Decoded sources: {info['decoded_entries']} entries, "
+              f"{format_bytes(info['decoded_bytes'])} / {format_bytes(info['decoded_max_bytes'])}")
+    elif command == 'prune':
+        max_bytes = int(sys.argv[2]) if len(sys.argv) > 2 else CACHE_MAX_BYTES
+        decoded_max_bytes = int(sys.argv[3]) if len(sys.argv) > 3 else DECODED_MAX_BYTES
+        removed, total = prune(max_bytes, decoded_max_bytes)
+        print(f"✅ Pruned {removed} entries, cache is now {format_bytes(total)}")
+    elif command == 'clear':
+        removed, _ = prune(0, 0)
+        print(f"✅ Cleared {removed} entries")
+    else:
+        print("Usage: python3 assets/icon/render_cache.py stats|prune [max_bytes [decoded_max_bytes]]|clear")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
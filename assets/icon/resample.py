@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+NumPy resampling helpers for the icon pipeline
+Linear-light (gamma-correct) downscaling through precomputed LUTs
+Imported by process_final_icon.py - not run directly
+"""
+
+from PIL import Image
+import functools
+import hashlib
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def numpy_available():
+    """The NumPy paths are optional - callers fall back to plain Pillow"""
+    return np is not None
+
+def _srgb_to_linear(values):
+    """sRGB transfer function, inverse (0..1 → 0..1)"""
+    return np.where(values <= 0.04045, values / 12.92, ((values + 0.055) / 1.055) ** 2.4)
+
+def _linear_to_srgb(values):
+    """sRGB transfer function (0..1 → 0..1)"""
+    return np.where(values <= 0.0031308, values * 12.92, 1.055 * values ** (1 / 2.4) - 0.055)
+
+if np is not None:
+    # 8-bit sRGB → 16-bit linear light (256 entries)
+    SRGB_TO_LINEAR16 = np.round(_srgb_to_linear(np.arange(256) / 255.0) * 65535).astype(np.uint16)
+    # 16-bit linear light → 8-bit sRGB (65536 entries, 64 KB)
+    LINEAR16_TO_SRGB = np.round(_linear_to_srgb(np.arange(65536) / 65535.0) * 255).astype(np.uint8)
+
+def thumbnail_size(img, target_size):
+    """Size Image.thumbnail() would give for a square target (never upscales)"""
+    if img.width <= target_size and img.height <= target_size:
+        return img.size
+    if img.width >= img.height:
+        return target_size, max(1, round(img.height * target_size / img.width))
+    return max(1, round(img.width * target_size / img.height)), target_size
+
+# Rows processed per step by the strip-wise passes - bounds the integer
+# temporaries to a strip instead of a full-size copy of large uploads
+STRIP_ROWS = 256
+
+def _halve(level):
+    """2×2 box reduction of a uint16 level (edges replicated for odd sizes)"""
+    if level.shape[0] % 2 or level.shape[1] % 2:
+        level = np.pad(level, ((0, level.shape[0] % 2), (0, level.shape[1] % 2), (0, 0)), mode='edge')
+    total = level[0::2, 0::2].astype(np.uint32)
+    total += level[1::2, 0::2]
+    total += level[0::2, 1::2]
+    total += level[1::2, 1::2]
+    return ((total + 2) >> 2).astype(np.uint16)
+
+def _linear_premultiplied(pixels):
+    """RGBA uint8 → premultiplied linear RGB + alpha, all uint16, strip by strip"""
+    height, width = pixels.shape[:2]
+    level = np.empty((height, width, 4), dtype=np.uint16)
+    for top in range(0, height, STRIP_ROWS):
+        strip = pixels[top:top + STRIP_ROWS]
+        alpha = strip[..., 3:4].astype(np.uint32)
+        linear = np.take(SRGB_TO_LINEAR16, strip[..., :3]).astype(np.uint32)
+        level[top:top + STRIP_ROWS, :, :3] = (linear * alpha + 127) // 255
+        level[top:top + STRIP_ROWS, :, 3:] = alpha * 257  # 8-bit → 16-bit
+    return level
+
+def linear_pyramid(img):
+    """16-bit linear-light levels of img (premultiplied for RGBA), halving down to 16px"""
+    pixels = np.asarray(img)
+    if img.mode == 'RGBA':
+        levels = [_linear_premultiplied(pixels)]
+    else:
+        levels = [np.take(SRGB_TO_LINEAR16, pixels[..., :3])]
+    while min(levels[-1].shape[:2]) >= 32:
+        levels.append(_halve(levels[-1]))
+    return levels
+
+# Pyramids of recently resized sources, keyed by a digest of their pixels -
+# every target size of one source shares the LUT conversion and reductions
+PYRAMID_CACHE = {}
+PYRAMID_CACHE_SIZE = 4
+
+def pyramid_key(img):
+    """PYRAMID_CACHE key of img's pixel data"""
+    return (img.size, img.mode, hashlib.blake2b(img.tobytes(), digest_size=16).digest())
+
+def add_pyramid(key, levels):
+    """Register precomputed levels (e.g. attached from shared memory)"""
+    if key not in PYRAMID_CACHE and len(PYRAMID_CACHE) >= PYRAMID_CACHE_SIZE:
+        PYRAMID_CACHE.pop(next(iter(PYRAMID_CACHE)))
+    PYRAMID_CACHE[key] = levels
+
+def cached_linear_pyramid(img):
+    """linear_pyramid(img), reused across calls with the same pixel data"""
+    key = pyramid_key(img)
+    if key not in PYRAMID_CACHE:
+        add_pyramid(key, linear_pyramid(img))
+    return PYRAMID_CACHE[key]
+
+def resize_linear_light(img, size, resample=Image.Resampling.LANCZOS):
+    """Resize RGB(A) in linear light: LUT to 16-bit linear, resample, inverse LUT"""
+    size = tuple(size)
+    if img.size == size:
+        return img.copy()
+    if img.mode not in ('RGB', 'RGBX', 'RGBA'):
+        img = img.convert('RGBA' if 'A' in img.getbands() else 'RGB')
+
+    # Start from the smallest pyramid level still at least 2× the target
+    # (the same reducing gap Image.thumbnail uses)
+    levels = cached_linear_pyramid(img)
+    level = levels[0]
+    for candidate in levels[1:]:
+        if candidate.shape[1] < size[0] * 2 or candidate.shape[0] < size[1] * 2:
+            break
+        level = candidate
+
+    # Pillow has no multi-band 16-bit resampling: each channel goes through
+    # a 32-bit 'I' plane (faster than 'I;16' in Pillow's resampler)
+    channels = []
+    for channel in range(level.shape[2]):
+        plane = Image.fromarray(level[..., channel].astype(np.int32))
+        channels.append(np.asarray(plane.resize(size, resample)))
+    resized = np.clip(np.stack(channels, axis=-1), 0, 65535).astype(np.int64)
+
+    if img.mode != 'RGBA':
+        return Image.fromarray(np.take(LINEAR16_TO_SRGB, resized))
+
+    # Un-premultiply (integer, target size only) - fully transparent pixels stay black
+    alpha = resized[..., 3:]
+    linear = np.where(alpha > 0, (resized[..., :3] * 65535 + alpha // 2) // np.maximum(alpha, 1), 0)
+    rgb = np.take(LINEAR16_TO_SRGB, np.minimum(linear, 65535))
+    alpha8 = ((alpha + 128) // 257).astype(np.uint8)
+    return Image.fromarray(np.dstack([rgb, alpha8]))
+
+def _box_reduce_premultiplied(img, factor):
+    """Premultiplied factor×factor box reduction of an RGBA image, strip by strip"""
+    width, height = img.size
+    out_width = -(-width // factor)
+    out_height = -(-height // factor)
+    reduced = np.empty((out_height, out_width, 4), dtype=np.uint8)
+    rows_per_strip = max(1, STRIP_ROWS // factor) * factor
+
+    for top in range(0, height, rows_per_strip):
+        strip = np.asarray(img.crop((0, top, width, min(top + rows_per_strip, height))))
+        # Replicate edges so partial blocks at the right / bottom average correctly sized
+        pad_rows = -strip.shape[0] % factor
+        pad_cols = -width % factor
+        if pad_rows or pad_cols:
+            strip = np.pad(strip, ((0, pad_rows), (0, pad_cols), (0, 0)), mode='edge')
+
+        alpha = strip[..., 3:4].astype(np.uint16)
+        premultiplied = np.empty(strip.shape, dtype=np.uint16)
+        premultiplied[..., :3] = (strip[..., :3] * alpha + 127) // 255
+        premultiplied[..., 3:] = alpha
+
+        blocks = premultiplied.reshape(strip.shape[0] // factor, factor, out_width, factor, 4)
+        sums = blocks.sum(axis=(1, 3), dtype=np.uint32)
+        area = factor * factor
+        out_top = top // factor
+        reduced[out_top:out_top + sums.shape[0]] = (sums + area // 2) // area
+    return Image.frombuffer('RGBa', (out_width, out_height), reduced.tobytes(), 'raw', 'RGBa', 0, 1)
+
+def resize_premultiplied(img, size, resample=Image.Resampling.LANCZOS, reducing_gap=2.0):
+    """Resize RGBA in premultiplied alpha with bounded memory
+
+    Large sources are first box-reduced strip by strip (integer math) to
+    within reducing_gap of the target, so no full-size premultiplied copy
+    is ever made; the final filter runs on Pillow's 'RGBa' mode.
+    """
+    size = tuple(size)
+    if img.size == size:
+        return img.copy()
+    if np is None or img.mode != 'RGBA':
+        # Pillow's own resize premultiplies RGBA too, via a full-size copy
+        return img.resize(size, resample, reducing_gap=reducing_gap)
+
+    factor = int(min(img.width / (size[0] * reducing_gap), img.height / (size[1] * reducing_gap)))
+    if factor > 1:
+        premultiplied = _box_reduce_premultiplied(img, factor)
+        box = (0, 0, img.width / factor, img.height / factor)  # ignore edge padding
+    else:
+        premultiplied = img.convert('RGBa')
+        box = None
+    return premultiplied.resize(size, resample, box).convert('RGBA')
+
+# Output pixels per block of the banded filter matrices - each block only
+# touches the source columns (rows) its taps cover
+WEIGHT_BLOCK = 32
+
+@functools.lru_cache(maxsize=256)
+def lanczos_blocks(in_size, out_size):
+    """Pillow's LANCZOS weights for in_size → out_size as banded blocks
+
+    Same taps and normalization as Pillow's precompute_coeffs (support 3,
+    widened by the scale factor when downscaling). Returns a list of
+    (out_start, out_end, in_start, in_end, weights) with weights an
+    (in_end - in_start, out_end - out_start) float32 matrix.
+    """
+    scale = in_size / out_size
+    filterscale = max(scale, 1.0)
+    support = 3.0 * filterscale
+    centers = (np.arange(out_size) + 0.5) * scale
+    # astype truncates toward zero, like the C int cast
+    starts = np.maximum((centers - support + 0.5).astype(np.int64), 0)
+    ends = np.minimum((centers + support + 0.5).astype(np.int64), in_size)
+
+    blocks = []
+    for out_start in range(0, out_size, WEIGHT_BLOCK):
+        out_end = min(out_start + WEIGHT_BLOCK, out_size)
+        in_start = int(starts[out_start:out_end].min())
+        in_end = int(ends[out_start:out_end].max())
+        taps = np.arange(in_start, in_end)
+        x = (taps[None, :] - centers[out_start:out_end, None] + 0.5) / filterscale
+        weights = np.sinc(x) * np.sinc(x / 3) * ((x >= -3) & (x < 3))
+        inside = (taps[None, :] >= starts[out_start:out_end, None]) & (taps[None, :] < ends[out_start:out_end, None])
+        weights = np.where(inside, weights, 0.0)
+        weights /= weights.sum(axis=1, keepdims=True)
+        blocks.append((out_start, out_end, in_start, in_end, weights.T.astype(np.float32)))
+    return blocks
+
+def resize_batch(img, sizes):
+    """LANCZOS-resize img to every size in one pass over the source rows
+
+    Both separable passes are fused per strip of STRIP_ROWS source rows:
+    the strip is filtered horizontally for every target width while it is
+    hot, and its rows are accumulated straight into each target's vertical
+    pass - so the source is read once and no full-height intermediate is
+    kept. RGBA is filtered premultiplied and un-premultiplied from 8-bit
+    values as Pillow does. Matches Pillow's resize within ±2 levels (float
+    weights instead of Pillow's fixed point); in faint RGBA pixels the
+    un-premultiply scales that by up to 255 / alpha.
+    Unlike resize(..., reducing_gap=2.0) there is no box pre-reduction: every
+    target is filtered from the full source, which is sharper at small sizes
+    (up to 15 levels off the reducing_gap path at 16px, 10 at 256px).
+    Returns {size: image}; supports L, RGB, RGBX and RGBA.
+    """
+    requested = {tuple(size) for size in sizes}
+    resized = {img.size: img.copy()} if img.size in requested else {}
+    sizes = sorted(requested - {img.size})
+    if img.mode not in ('L', 'RGB', 'RGBX', 'RGBA'):
+        raise ValueError(f"resize_batch: unsupported mode {img.mode}")
+    pixels = np.asarray(img)
+    if pixels.ndim == 2:
+        pixels = pixels[..., None]
+    channels = 3 if img.mode == 'RGBX' else pixels.shape[2]
+    height, width = pixels.shape[:2]
+
+    # Vertical accumulators, (out_height, channels, out_width) per target
+    outputs = {size: np.zeros((size[1], channels, size[0]), dtype=np.float32) for size in sizes}
+    horizontal = {size[0]: lanczos_blocks(width, size[0]) for size in sizes}
+    vertical = {size: lanczos_blocks(height, size[1]) for size in sizes}
+
+    for top in range(0, height, STRIP_ROWS):
+        strip = pixels[top:top + STRIP_ROWS, :, :channels].astype(np.float32)
+        if img.mode == 'RGBA':
+            # Premultiplied to 8 bits, as Pillow's RGBa conversion does
+            strip[..., :3] = np.rint(strip[..., :3] * strip[..., 3:] / 255.0)
+        rows = strip.shape[0]
+        # (rows × channels, width): one matrix product per horizontal block
+        flat = np.ascontiguousarray(strip.transpose(0, 2, 1)).reshape(rows * channels, width)
+
+        filtered = {}
+        for out_width, blocks in horizontal.items():
+            row_pass = np.empty((rows * channels, out_width), dtype=np.float32)
+            for out_start, out_end, in_start, in_end, weights in blocks:
+                row_pass[:, out_start:out_end] = flat[:, in_start:in_end] @ weights
+            # Pillow stores the horizontal pass as 8-bit, clipping the ringing
+            np.clip(np.rint(row_pass, out=row_pass), 0.0, 255.0, out=row_pass)
+            filtered[out_width] = row_pass.reshape(rows, channels * out_width)
+
+        for size, blocks in vertical.items():
+            output = outputs[size].reshape(size[1], channels * size[0])
+            for out_start, out_end, in_start, in_end, weights in blocks:
+                first, last = max(in_start, top), min(in_end, top + rows)
+                if first < last:
+                    output[out_start:out_end] += (
+                        weights[first - in_start:last - in_start].T @ filtered[size[0]][first - top:last - top])
+
+    for size, output in outputs.items():
+        result = np.clip(np.rint(output.transpose(0, 2, 1)), 0, 255).astype(np.uint8)
+        if img.mode == 'RGBA':
+            # Un-premultiply the 8-bit values like Pillow's RGBa → RGBA: integer
+            # division, and no color where the rounded alpha is 0
+            alpha = result[..., 3:].astype(np.uint16)
+            color = result[..., :3].astype(np.uint16)
+            unpremultiplied = np.minimum(color * 255 // np.maximum(alpha, 1), 255)
+            result[..., :3] = np.where(alpha == 255, color, np.where(alpha == 0, 0, unpremultiplied))
+        mode = {1: 'L', 3: 'RGB', 4: 'RGBA'}[channels]
+        resized[size] = Image.fromarray(result[..., 0] if mode == 'L' else result, mode)
+    return resized
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Shared-memory transport for decoded sources
+The parent decodes once into a multiprocessing.shared_memory block and pool
+workers attach zero-copy via Image.frombuffer / NumPy views, instead of
+unpickling or re-decoding the full-resolution image
+Imported by the icon generators - not run directly
+"""
+
+from PIL import Image
+from multiprocessing import resource_tracker, shared_memory
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Modes Image.frombuffer maps without copying. Pillow stores RGB as 4 bytes
+# per pixel, so RGB is shared as RGBX (same pixels, same resampling result)
+MAPPED_MODES = ('L', 'RGBX', 'RGBA', 'CMYK', 'I;16', 'I;16L', 'I;16B')
+
+# Rows copied per step when filling a block - no full-size tobytes() copy
+STRIP_ROWS = 256
+
+# Blocks this process created (to unlink) or attached (kept open while used)
+CREATED_BLOCKS = {}
+ATTACHED_BLOCKS = {}
+
+def shareable_image(img):
+    """img in a mode frombuffer can map (RGB → RGBX, others → RGBA / RGBX)"""
+    if img.mode in MAPPED_MODES:
+        return img
+    if img.mode == 'RGB':
+        return img.convert('RGBX')
+    has_alpha = 'A' in img.getbands() or 'transparency' in img.info
+    return img.convert('RGBA' if has_alpha else 'RGBX')
+
+def _create_block(size):
+    """New shared-memory block owned (and later unlinked) by this process"""
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    CREATED_BLOCKS[block.name] = block
+    return block
+
+def _attach_block(name):
+    """Attach to a block another process created, without tracking it here"""
+    if name in CREATED_BLOCKS:
+        return CREATED_BLOCKS[name]  # serial run in the parent
+    if name not in ATTACHED_BLOCKS:
+        try:
+            block = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13 always registers with the resource tracker, which
+            # would unlink the creator's block when this worker exits
+            block = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(block._name, 'shared_memory')
+        ATTACHED_BLOCKS[name] = block
+    return ATTACHED_BLOCKS[name]
+
+def share_image(img):
+    """Copy img's pixels into a shared block strip by strip, return a descriptor"""
+    img = shareable_image(img)
+    width, height = img.size
+    row_bytes = len(img.crop((0, 0, width, 1)).tobytes()) if height else 0
+    block = _create_block(row_bytes * height)
+    for top in range(0, height, STRIP_ROWS):
+        strip = img.crop((0, top, width, min(top + STRIP_ROWS, height))).tobytes()
+        block.buf[top * row_bytes:top * row_bytes + len(strip)] = strip
+    return {'name': block.name, 'mode': img.mode, 'size': img.size}
+
+def attach_image(descriptor):
+    """Read-only Image over a shared block - no copy, no decode"""
+    block = _attach_block(descriptor['name'])
+    mode = descriptor['mode']
+    size = tuple(descriptor['size'])
+    return Image.frombuffer(mode, size, block.buf, 'raw', mode, 0, 1)
+
+def share_array(array):
+    """Copy a NumPy array into a shared block, return a descriptor"""
+    block = _create_block(array.nbytes)
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    view[...] = array
+    return {'name': block.name, 'shape': array.shape, 'dtype': array.dtype.str}
+
+def attach_array(descriptor):
+    """Read-only NumPy view of a shared block"""
+    block = _attach_block(descriptor['name'])
+    view = np.ndarray(tuple(descriptor['shape']), dtype=np.dtype(descriptor['dtype']), buffer=block.buf)
+    view.flags.writeable = False
+    return view
+
+def release_shared():
+    """Unlink every block this process created (call once the pool is done)"""
+    for block in CREATED_BLOCKS.values():
+        try:
+            block.close()
+        except BufferError:
+            pass  # still viewed by a live image - the mapping goes with the process
+        block.unlink()
+    CREATED_BLOCKS.clear()
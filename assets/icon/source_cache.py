@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Memory-mappable cache of decoded sources
+The decoded pixels of a source (and its linear-light pyramid levels) are
+stored raw in the render cache's decoded namespace (its own size cap),
+keyed by the source file digest. Later
+runs and pool workers map them with mmap + Image.frombuffer instead of
+decoding the PNG / JPEG again - no decode, no copy. Sources with an ICC
+profile are stored already converted to sRGB (color_profile.py)
+Imported by the generators - not run directly
+"""
+
+import json
+import mmap
+import os
+import struct
+
+from PIL import Image
+
+import render_cache
+from asset_pipeline import file_digest
+from color_profile import normalize_to_srgb
+from shared_source import MAPPED_MODES, STRIP_ROWS, shareable_image
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Bump when the entry layout or the decode changes so old entries are not mapped
+DECODED_VERSION = 2
+
+# Entry layout: magic, header length (uint32 LE), JSON header, then the raw
+# buffers, each starting on an ALIGNMENT boundary
+MAGIC = b'CGRAW\x00\x00\x01'
+ALIGNMENT = 64
+
+def _entry_key(kind, digest):
+    """Render cache key of a decoded entry ('pixels' or 'pyramid')"""
+    return render_cache.cache_key({'decoded': kind, 'version': DECODED_VERSION, 'source': digest})
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+def store_raw(key, meta, parts):
+    """Store meta plus raw buffers as one mappable cache entry
+
+    parts is a list of (length, chunks) - chunks yields the buffer's bytes
+    piece by piece, so large images are never joined in memory.
+    """
+    lengths = [length for length, _ in parts]
+    header = json.dumps(dict(meta, lengths=lengths), sort_keys=True).encode('utf-8')
+
+    def chunks():
+        yield MAGIC + struct.pack('<I', len(header)) + header
+        position = len(MAGIC) + 4 + len(header)
+        for length, part in parts:
+            yield bytes(_aligned(position) - position)
+            position = _aligned(position)
+            for chunk in part:
+                yield chunk
+            position += length
+
+    render_cache.store_chunks(key, chunks(), render_cache.DECODED)
+
+def map_raw(key):
+    """(meta, [read-only memoryview per buffer]) mapped from the cache, or None on a miss"""
+    if not render_cache.cache_enabled():
+        return None
+    path = render_cache.object_path(key, render_cache.DECODED)
+    try:
+        with open(path, 'rb') as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):
+        return None  # missing, or empty (ValueError: cannot mmap an empty file)
+    view = memoryview(mapping)
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+        return None
+    header_length, = struct.unpack('<I', view[len(MAGIC):len(MAGIC) + 4])
+    meta = json.loads(bytes(view[len(MAGIC) + 4:len(MAGIC) + 4 + header_length]))
+    buffers = []
+    position = len(MAGIC) + 4 + header_length
+    for length in meta['lengths']:
+        position = _aligned(position)
+        buffers.append(view[position:position + length])
+        position += length
+    if position > len(view):
+        return None  # truncated entry
+    # Bump mtime so eviction sees this entry as recently used
+    os.utime(path)
+    return meta, buffers
+
+def _image_strips(img):
+    """img's raw bytes, STRIP_ROWS rows at a time"""
+    for top in range(0, img.height, STRIP_ROWS):
+        yield img.crop((0, top, img.width, min(top + STRIP_ROWS, img.height))).tobytes()
+
+def map_decoded(source_path, digest=None):
+    """Read-only decoded source mapped from the cache (decoded and stored on a
+    miss), or None when the cache is off or cannot hold it
+
+    RGB sources come back as RGBX (the layout Pillow keeps in memory), like
+    the shared-memory transport - same pixels, same resampling result.
+    """
+    if not render_cache.cache_enabled():
+        return None
+    key = _entry_key('pixels', digest or file_digest(source_path))
+    mapped = map_raw(key)
+    if mapped is None:
+        with Image.open(source_path) as img:
+            img.load()
+            img = shareable_image(normalize_to_srgb(img))
+        if img.mode not in MAPPED_MODES:
+            return None
+        length = len(img.crop((0, 0, img.width, 1)).tobytes()) * img.height
+        try:
+            store_raw(key, {'mode': img.mode, 'size': img.size}, [(length, _image_strips(img))])
+        except OSError:
+            return None  # read-only or full cache directory
+        mapped = map_raw(key)
+        if mapped is None:
+            return None
+    meta, (pixels,) = mapped
+    return Image.frombuffer(meta['mode'], tuple(meta['size']), pixels, 'raw', meta['mode'], 0, 1)
+
+def open_decoded(source_path, digest=None):
+    """Decoded sRGB source: mapped from the cache when possible, decoded otherwise"""
+    img = map_decoded(source_path, digest)
+    if img is None:
+        img = Image.open(source_path)
+        img.load()
+        img = normalize_to_srgb(img)
+    return img
+
+def map_pyramid(digest):
+    """Cached pyramid levels (read-only NumPy views) of a source, or None"""
+    mapped = map_raw(_entry_key('pyramid', digest)) if np is not None else None
+    if mapped is None:
+        return None
+    meta, buffers = mapped
+    return [np.frombuffer(buffer, dtype=np.dtype(level['dtype'])).reshape(level['shape'])
+            for level, buffer in zip(meta['levels'], buffers)]
+
+def store_pyramid(digest, levels):
+    """Cache a source's pyramid levels, return them mapped (or as given if the cache is off)"""
+    meta = {'levels': [{'shape': level.shape, 'dtype': level.dtype.str} for level in levels]}
+    try:
+        store_raw(_entry_key('pyramid', digest), meta,
+                  [(level.nbytes, [memoryview(np.ascontiguousarray(level)).cast('B')]) for level in levels])
+    except OSError:
+        return levels
+    return map_pyramid(digest) or levels
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Generate the store listing assets - the Google Play 512px hi-res icon and
+1024×500 feature graphic, and the 1024px App Store marketing icon - from
+the same decoded source (and pyramid) as the launcher icons, then check
+them against the store rules (dimensions, alpha, bit depth, file size)
+Usage: python3 assets/icon/store_assets.py [icon_path] [--linear-light] [--verify]
+"""
+
+try:
+    from PIL import Image, ImageDraw
+    import argparse
+    import os
+    import sys
+    import time
+except ImportError:
+    print("❌ PIL/Pillow not installed. Install with: pip3 install Pillow")
+    sys.exit(1)
+
+import render_cache
+from asset_pipeline import cached_encode, format_delta, read_png_header, write_bytes
+from process_final_icon import (
+    DEFAULT_OPTIONS, extract_background_color, flatten, open_icon_source, presize_icon_source,
+    release_icon_sources, render_icon_target, source_digest, source_pyramid,
+)
+from resample import numpy_available
+
+SOURCE_ICON_PATH = 'assets/icon/app_icon.png'
+STORE_DIR = 'assets/store'
+
+# Store listing assets and the rules each store enforces on upload:
+# exact size, whether the PNG must carry alpha (32-bit) or must be opaque
+# (24-bit), and the file size limit
+STORE_ASSETS = {
+    'play_icon': {
+        'path': f'{STORE_DIR}/play_icon_512.png',
+        'size': (512, 512),
+        'alpha': True,               # Play: 32-bit PNG (RGBA), even when opaque
+        'max_bytes': 1024 * 1024,    # Play: 1 MB
+    },
+    'feature_graphic': {
+        'path': f'{STORE_DIR}/play_feature_graphic.png',
+        'size': (1024, 500),
+        'alpha': False,              # Play: JPEG or 24-bit PNG, no alpha
+        'max_bytes': 15 * 1024 * 1024,
+    },
+    'app_store_icon': {
+        'path': f'{STORE_DIR}/app_store_icon_1024.png',
+        'size': (1024, 1024),
+        'alpha': False,              # App Store: opaque, no transparency
+        'max_bytes': 512 * 1024,     # same budget as the iOS 1024 icon
+    },
+}
+
+# Feature graphic: the icon centered at this share of the height, as a
+# rounded tile (corner radius share of its size) on the icon's background -
+# Play crops the edges on some surfaces, so the content stays central
+FEATURE_ICON_HEIGHT = 0.72
+FEATURE_ICON_RADIUS = 0.2237
+
+# Rounded corners are drawn at this multiple and reduced - anti-aliased edges
+SUPERSAMPLE = 4
+
+# Bump when rendering changes so cached renders are not reused
+RENDER_VERSION = 3
+
+# PNG color types: truecolor (24-bit) and truecolor with alpha (32-bit)
+PNG_RGB = 2
+PNG_RGBA = 6
+
+# Sources already prepared (pyramid or presized) in this run
+PREPARED_SOURCES = set()
+
+def rounded_tile(img, radius):
+    """img with anti-aliased rounded corners (RGBA)"""
+    size = (img.width * SUPERSAMPLE, img.height * SUPERSAMPLE)
+    mask = Image.new('L', size, 0)
+    ImageDraw.Draw(mask).rounded_rectangle((0, 0, size[0] - 1, size[1] - 1),
+                                           radius=round(radius * SUPERSAMPLE), fill=255)
+    tile = img.convert('RGBA')
+    tile.putalpha(mask.reduce(SUPERSAMPLE))
+    return tile
+
+def feature_icon_size():
+    """Pixel size of the icon tile on the feature graphic"""
+    return round(STORE_ASSETS['feature_graphic']['size'][1] * FEATURE_ICON_HEIGHT)
+
+def prepare_store_source(source_icon_path, options):
+    """Pyramid or batched resizes of the source, once per run and only on a cache miss"""
+    if source_icon_path in PREPARED_SOURCES:
+        return
+    PREPARED_SOURCES.add(source_icon_path)
+    if source_icon_path.endswith('.svg'):
+        return
+    if options['linear_light']:
+        source_pyramid(source_icon_path, open_icon_source(source_icon_path))
+    else:
+        presize_icon_source(source_icon_path, [512, 1024, feature_icon_size()])
+
+def render_store_asset(name, source_icon_path, options):
+    """Render one store asset from the decoded source"""
+    spec = STORE_ASSETS[name]
+    prepare_store_source(source_icon_path, options)
+    width, height = spec['size']
+    background = extract_background_color(open_icon_source(source_icon_path))
+    if name == 'feature_graphic':
+        icon_size = feature_icon_size()
+        icon = render_icon_target(source_icon_path, icon_size, 'auto', options['linear_light'])
+        tile = rounded_tile(icon, icon_size * FEATURE_ICON_RADIUS)
+        img = Image.new('RGB', (width, height), background)
+        img.paste(tile, ((width - icon_size) // 2, (height - icon_size) // 2), tile)
+    else:
+        img = render_icon_target(source_icon_path, width, 'auto', options['linear_light'])
+    return img.convert('RGBA') if spec['alpha'] else flatten(img, background)
+
+def write_store_asset(name, source_icon_path, options):
+    """Render, encode and write one store asset (served from the render cache when possible)"""
+    spec = STORE_ASSETS[name]
+    params = {
+        'generator': 'store_assets',
+        'version': RENDER_VERSION,
+        'source': source_digest(source_icon_path),
+        'asset': name,
+        'spec': {key: spec[key] for key in ('size', 'alpha')},
+        'layout': [FEATURE_ICON_HEIGHT, FEATURE_ICON_RADIUS, SUPERSAMPLE],
+        'linear_light': options['linear_light'],
+    }
+    data, hit = cached_encode(params, lambda: render_store_asset(name, source_icon_path, options))
+    write_bytes(spec['path'], data)
+    return spec['path'], len(data), hit
+
+def validate_store_asset(path, spec):
+    """Store rule violations of one file (empty list if it would be accepted)"""
+    if not os.path.exists(path):
+        return [f"{path}: missing"]
+    try:
+        header = read_png_header(path)
+    except ValueError as e:
+        return [str(e)]
+    errors = []
+    if (header['width'], header['height']) != spec['size']:
+        errors.append(f"{path}: {header['width']}×{header['height']}, "
+                      f"expected {spec['size'][0]}×{spec['size'][1]}")
+    if header['alpha'] and not spec['alpha']:
+        errors.append(f"{path}: has an alpha channel or transparency, the store requires an opaque image")
+    color_type = PNG_RGBA if spec['alpha'] else PNG_RGB
+    if header['bit_depth'] != 8 or header['color_type'] != color_type:
+        errors.append(f"{path}: PNG color type {header['color_type']} / {header['bit_depth']}-bit, "
+                      f"expected {'32-bit RGBA' if spec['alpha'] else '24-bit RGB'} truecolor")
+    size = os.path.getsize(path)
+    if size > spec['max_bytes']:
+        errors.append(f"{path}: {size} bytes, over the {spec['max_bytes']} byte limit "
+                      f"({format_delta(size - spec['max_bytes'])})")
+    return errors
+
+def validate_store_assets():
+    """Store rule violations of every store asset on disk"""
+    errors = []
+    for spec in STORE_ASSETS.values():
+        errors += validate_store_asset(spec['path'], spec)
+    return errors
+
+def generate_store_assets(source_icon_path, options=DEFAULT_OPTIONS):
+    """Render every store asset, return [(path, bytes, cache hit)]"""
+    print("🏪 Generating store listing assets...")
+    try:
+        return [write_store_asset(name, source_icon_path, options) for name in STORE_ASSETS]
+    finally:
+        release_icon_sources()
+
+def main():
+    """Main store assets function"""
+    parser = argparse.ArgumentParser(description="Generate and check the Play Store and App Store listing assets")
+    parser.add_argument('icon_path', nargs='?', default=SOURCE_ICON_PATH,
+                        help=f"source icon (default: {SOURCE_ICON_PATH})")
+    parser.add_argument('--linear-light', action='store_true', help="downscale in linear light (needs NumPy)")
+    parser.add_argument('--verify', action='store_true', help="only check the existing files against the store rules")
+    args = parser.parse_args()
+
+    if not args.verify:
+        if not os.path.exists(args.icon_path):
+            print(f"❌ Error: Icon file not found: {args.icon_path}")
+            sys.exit(1)
+        if args.linear_light and not numpy_available():
+            print("⚠️  --linear-light needs NumPy (pip3 install numpy), using sRGB resampling")
+        options = dict(DEFAULT_OPTIONS, linear_light=args.linear_light and numpy_available())
+        start = time.perf_counter()
+        results = generate_store_assets(args.icon_path, options)
+        render_cache.prune()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for path, size, hit in results:
+            print(f"  → {path} ({size / 1024:.1f} KB){' (cached)' if hit else ''}")
+        print(f"✅ {len(results)} store assets generated in {elapsed_ms:.0f} ms")
+
+    errors = validate_store_assets()
+    if errors:
+        print("\n❌ Store rules violated:")
+        for error in errors:
+            print(f"  • {error}")
+        sys.exit(1)
+    print("✅ Store assets meet the Play Store and App Store rules")
+    print(f"\n📋 Upload from {STORE_DIR}/: play_icon_512.png and play_feature_graphic.png (Play Console),")
+    print("   app_store_icon_1024.png (App Store Connect)")
+
+if __name__ == "__main__":
+    main()
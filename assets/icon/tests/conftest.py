@@ -0,0 +1,69 @@
+"""
+Shared fixtures for the asset pipeline tests
+Run from the repo root: python3 -m pytest assets/icon/tests
+"""
+
+import os
+import struct
+import sys
+
+import pytest
+from PIL import Image, ImageDraw
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, '..'))
+sys.path.insert(0, os.path.join(TESTS_DIR, '..', '..', '..', 'docs'))
+
+import color_profile
+import render_cache
+
+@pytest.fixture(autouse=True)
+def asset_cache(tmp_path, monkeypatch):
+    """A fresh, enabled render cache per test - never the user's ~/.cache"""
+    monkeypatch.delenv('COACHGURU_NO_CACHE', raising=False)
+    monkeypatch.setattr(render_cache, 'CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(color_profile, 'TRANSFORMS', {})
+    return tmp_path / 'cache'
+
+@pytest.fixture
+def rgba_source():
+    """Non-square RGBA source with hard edges, colored shapes and faint alpha ramps"""
+    img = Image.new('RGBA', (640, 480), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    draw.ellipse((80, 40, 560, 440), fill=(10, 29, 71, 255))
+    draw.rectangle((200, 160, 440, 320), fill=(255, 255, 255, 255))
+    draw.line((0, 0, 640, 480), fill=(230, 80, 20, 255), width=3)
+    # Faint halo: alpha 1..24 in the corners, where un-premultiplying amplifies rounding
+    for x in range(0, 120):
+        draw.line((x, 440, x, 480), fill=(200, 220, 255, 1 + x // 5))
+    return img
+
+def _s15_fixed(value):
+    return struct.pack('>i', round(value * 65536))
+
+def _xyz_tag(x, y, z):
+    return b'XYZ ' + bytes(4) + _s15_fixed(x) + _s15_fixed(y) + _s15_fixed(z)
+
+def rgb_profile(primaries, gamma=2.2, name=b'Test RGB'):
+    """Minimal ICC v2 matrix/TRC display profile with the given D50 primaries"""
+    desc = b'desc' + bytes(4) + struct.pack('>I', len(name) + 1) + name + b'\0' + bytes(8) + bytes(3) + bytes(67)
+    curve = b'curv' + bytes(4) + struct.pack('>IH', 1, round(gamma * 256)) + bytes(2)
+    tags = [(b'desc', desc), (b'cprt', b'text' + bytes(4) + b'none\0'), (b'wtpt', _xyz_tag(0.9642, 1.0, 0.8249))]
+    tags += [(signature, _xyz_tag(*primary)) for signature, primary in zip((b'rXYZ', b'gXYZ', b'bXYZ'), primaries)]
+    tags += [(signature, curve) for signature in (b'rTRC', b'gTRC', b'bTRC')]
+    offset = 128 + 4 + 12 * len(tags)
+    table, data = b'', b''
+    for signature, body in tags:
+        data += bytes(-(offset + len(data)) % 4)
+        table += signature + struct.pack('>II', offset + len(data), len(body))
+        data += body
+    body = struct.pack('>I', len(tags)) + table + data
+    header = (struct.pack('>I', 128 + len(body)) + bytes(4) + struct.pack('>I', 0x02100000) + b'mntrRGB XYZ '
+              + bytes(12) + b'acsp' + bytes(24) + bytes(4) + _xyz_tag(0.9642, 1.0, 0.8249)[8:] + bytes(48))
+    return header + body
+
+@pytest.fixture
+def display_p3_profile():
+    """ICC profile bytes of a Display P3-like space (wider gamut than sRGB)"""
+    return rgb_profile([(0.5151, 0.2412, -0.0011), (0.2920, 0.6922, 0.0419), (0.1571, 0.0666, 0.7841)],
+                       name=b'Test Display P3')
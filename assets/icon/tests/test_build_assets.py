@@ -0,0 +1,171 @@
+"""Tests for build_assets.py: rebuild decisions, dependency order and the worker budget"""
+
+import json
+import os
+import sys
+
+import pytest
+
+import build_assets
+from asset_pipeline import WORKERS_ENV
+from build_assets import build, script_inputs
+
+ICON_DIR = os.path.dirname(os.path.abspath(build_assets.__file__))
+RUN_LOG = 'runs.log'
+STATE_PATH = 'build/state.json'
+
+def step(name, reads=(), writes=(), manifest=None):
+    """Command that logs its run (with its worker share), reads its inputs
+    and writes every output (then a manifest of them) from their contents"""
+    code = f'''
+import os, sys
+with open({RUN_LOG!r}, 'a') as log:
+    log.write({name!r} + ' ' + os.environ[{WORKERS_ENV!r}] + chr(10))
+data = ''.join(open(path).read() for path in {list(reads)!r})
+for path in {list(writes)!r}:
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        f.write({name!r} + ':' + data)
+if {manifest!r}:
+    sys.path.insert(0, {ICON_DIR!r})
+    from asset_pipeline import write_manifest
+    write_manifest({list(writes)!r}, {manifest!r})
+'''
+    return [sys.executable, '-c', code]
+
+def node(name, inputs, outputs):
+    return {'command': step(name, inputs, outputs), 'inputs': list(inputs), 'outputs': list(outputs)}
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    """Scratch repo root with two sources: a → b chain plus an independent c"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'src/master.txt').write_text('master')
+    (tmp_path / 'src/other.txt').write_text('other')
+    return {
+        'a': node('a', ['src/master.txt'], ['out/a.txt']),
+        'b': node('b', ['out/a.txt'], ['out/b.txt']),
+        'c': node('c', ['src/other.txt'], ['out/c.txt']),
+    }
+
+def runs():
+    """Node names in the order they ran since the last call"""
+    if not os.path.exists(RUN_LOG):
+        return []
+    with open(RUN_LOG) as f:
+        names = [line.split()[0] for line in f]
+    os.remove(RUN_LOG)
+    return names
+
+def run_build(nodes, targets=('all',), jobs=None):
+    return build(targets, jobs, nodes=nodes, state_path=STATE_PATH)
+
+def test_dependencies_run_first(tree):
+    assert run_build(tree, jobs=1) == set()
+    order = runs()
+    assert sorted(order) == ['a', 'b', 'c']
+    assert order.index('a') < order.index('b')
+    with open('out/b.txt') as f:
+        assert f.read() == 'b:a:master'
+
+def test_fresh_nodes_are_skipped(tree):
+    run_build(tree)
+    runs()
+    assert run_build(tree) == set()
+    assert runs() == []
+
+def test_input_change_reruns_the_node_and_its_dependents(tree):
+    run_build(tree)
+    runs()
+    with open('src/master.txt', 'w') as f:
+        f.write('new master')
+    run_build(tree)
+    assert runs() == ['a', 'b']
+    with open('out/b.txt') as f:
+        assert f.read() == 'b:a:new master'
+
+def test_modified_output_reruns_the_node(tree):
+    run_build(tree)
+    runs()
+    os.remove('out/c.txt')
+    run_build(tree)
+    assert runs() == ['c']
+
+def test_command_change_reruns_the_node(tree):
+    run_build(tree)
+    runs()
+    tree['c']['command'] = step('c', ['src/other.txt'], ['out/c.txt', 'out/c2.txt'])
+    run_build(tree)
+    assert runs() == ['c']
+
+def test_failed_dependency_skips_dependents(tree):
+    tree['a']['command'] = [sys.executable, '-c', 'raise SystemExit(1)']
+    assert run_build(tree) == {'a', 'b'}
+    assert runs() == ['c']
+
+def test_explicit_nodes_only_run_when_named(tree):
+    tree['a']['explicit'] = True
+    os.makedirs('out')
+    with open('out/a.txt', 'w') as f:
+        f.write('checked in')
+    run_build(tree)
+    assert sorted(runs()) == ['b', 'c']
+    run_build(tree, targets=['a'])
+    assert runs() == ['a']
+
+def test_manifest_outputs_are_checked_against_their_digests(tree):
+    # Only the manifest is declared - the icons are known from it
+    listed = ['out/icons/large.txt', 'out/icons/small.txt']
+    tree['m'] = {
+        'command': step('m', ['src/master.txt'], listed, manifest='out/manifest.json'),
+        'inputs': ['src/master.txt'],
+        'outputs': ['out/manifest.json'],
+        'manifest': 'out/manifest.json',
+    }
+    run_build(tree, targets=['m'])
+    assert runs() == ['m']
+
+    with open(STATE_PATH) as f:
+        state = json.load(f)
+    assert set(state['m']['outputs']) == {'out/manifest.json', *listed}
+    run_build(tree, targets=['m'])
+    assert runs() == []
+
+    # An output only the manifest knows about, edited by hand
+    with open('out/icons/large.txt', 'w') as f:
+        f.write('edited')
+    run_build(tree, targets=['m'])
+    assert runs() == ['m']
+
+def test_nodes_share_the_worker_budget(tree):
+    run_build(tree, jobs=4)
+    with_workers = {}
+    with open(RUN_LOG) as f:
+        for line in f:
+            name, workers = line.split()
+            with_workers[name] = int(workers)
+    # a and c start together and split the budget; b runs after a alone
+    assert with_workers['a'] + with_workers['c'] <= 4
+    assert with_workers['a'] >= 1 and with_workers['c'] >= 1
+    assert with_workers['b'] >= 2
+
+def test_a_single_worker_budget_runs_one_node_at_a_time(tree):
+    run_build(tree, jobs=1)
+    with open(RUN_LOG) as f:
+        assert [line.split()[1] for line in f] == ['1', '1', '1']
+
+def test_script_inputs_follow_local_imports(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_assets, 'REPO_ROOT', str(tmp_path))
+    (tmp_path / 'tools').mkdir()
+    (tmp_path / 'lib').mkdir()
+    (tmp_path / 'tools/main.py').write_text('import os\nfrom helper import run\n')
+    (tmp_path / 'tools/helper.py').write_text('def run():\n    import shared\n')
+    (tmp_path / 'lib/shared.py').write_text('import json\n')
+    (tmp_path / 'lib/unused.py').write_text('')
+    assert script_inputs('tools/main.py', ['lib']) == ['lib/shared.py', 'tools/helper.py', 'tools/main.py']
+
+def test_pipeline_nodes_include_every_imported_module():
+    inputs = build_assets.NODES['launcher_icons']['inputs']
+    for module in ('brand.py', 'palette.py', 'icon_layers.py', 'render_cache.py', 'source_cache.py'):
+        assert f'assets/icon/{module}' in inputs
@@ -0,0 +1,74 @@
+"""Tests for color_profile.py: ICC-tagged sources normalized to sRGB"""
+
+import io
+
+import pytest
+from PIL import Image, ImageCms
+
+import color_profile
+from color_profile import TRANSFORMS, normalize_to_srgb, srgb_transform
+
+SRGB_PROFILE = ImageCms.ImageCmsProfile(ImageCms.createProfile('sRGB')).tobytes()
+
+def tagged(img, icc_profile):
+    """img re-decoded from a PNG carrying icc_profile, like a real upload"""
+    output = io.BytesIO()
+    img.save(output, 'PNG', icc_profile=icc_profile)
+    decoded = Image.open(io.BytesIO(output.getvalue()))
+    decoded.load()
+    return decoded
+
+def test_untagged_image_is_returned_as_is(rgba_source):
+    assert normalize_to_srgb(rgba_source) is rgba_source
+
+def test_srgb_tagged_image_is_returned_as_is(rgba_source):
+    img = tagged(rgba_source, SRGB_PROFILE)
+    assert normalize_to_srgb(img) is img
+
+def test_unreadable_profile_is_ignored(rgba_source):
+    img = tagged(rgba_source, b'not an ICC profile')
+    assert normalize_to_srgb(img) is img
+
+def test_display_p3_is_converted(rgba_source, display_p3_profile):
+    img = tagged(rgba_source.convert('RGB'), display_p3_profile)
+    converted = normalize_to_srgb(img)
+    assert converted is not img
+    assert converted.mode == 'RGB'
+    assert 'icc_profile' not in converted.info
+    # The icon navy is inside both gamuts - it moves, but stays a navy
+    navy = converted.getpixel((320, 100))
+    assert navy != (10, 29, 71)
+    assert navy[2] > navy[1] > navy[0]
+    # White is the same in every RGB display profile
+    assert max(abs(a - b) for a, b in zip(converted.getpixel((400, 200)), (255, 255, 255))) <= 1
+
+def test_display_p3_keeps_alpha(rgba_source, display_p3_profile):
+    img = tagged(rgba_source, display_p3_profile)
+    converted = normalize_to_srgb(img)
+    assert converted.mode == 'RGBA'
+    assert converted.getchannel('A').tobytes() == rgba_source.getchannel('A').tobytes()
+
+def test_palette_image_is_expanded_before_converting(rgba_source, display_p3_profile):
+    img = tagged(rgba_source.convert('RGB').convert('P'), display_p3_profile)
+    converted = normalize_to_srgb(img)
+    assert converted.mode == 'RGB'
+    assert converted.tobytes() != img.convert('RGB').tobytes()
+
+def test_transforms_are_built_once_per_profile_and_mode(display_p3_profile):
+    first = srgb_transform(display_p3_profile, 'RGB')
+    assert srgb_transform(display_p3_profile, 'RGB') is first
+    assert srgb_transform(display_p3_profile, 'RGBA') is not first
+
+def test_profile_verdict_is_cached_on_disk(display_p3_profile, monkeypatch):
+    srgb_transform(display_p3_profile, 'RGB')
+    TRANSFORMS.clear()
+
+    # A later run reads the verdict instead of probing the profile again
+    def no_probe(profile):
+        raise AssertionError("profile probed again")
+    monkeypatch.setattr(color_profile, '_is_identity', no_probe)
+    assert srgb_transform(display_p3_profile, 'RGB') is not None
+
+@pytest.mark.parametrize('mode', ['RGB', 'RGBA'])
+def test_srgb_profile_needs_no_transform(mode):
+    assert srgb_transform(SRGB_PROFILE, mode) is None
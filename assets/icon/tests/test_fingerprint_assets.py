@@ -0,0 +1,141 @@
+"""Tests for docs/fingerprint_assets.py: reference rewriting and idempotency"""
+
+import json
+import os
+import re
+
+import pytest
+from PIL import Image
+
+from fingerprint_assets import MANIFEST_NAME, PLACEHOLDER_SCRIPT_ID, SIZE_REPORT_NAME, STATIC_DIR, fingerprint_assets
+
+INDEX_HTML = '''<!DOCTYPE html>
+<html>
+<head>
+    <link rel="icon" type="image/png" href="assets/logo/favicon.png?v=2">
+</head>
+<body>
+    <img src="assets/logo/coachguru_logo.png?v=2" alt="CoachGuru Logo" />
+    <img src="images/feature.png" alt="Feature" width="10">
+    <script>
+        const screens = ['screenshots/home.png', 'screenshots/home_copy.png'];
+    </script>
+</body>
+</html>
+'''
+
+SITEMAP_XML = '''<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url>
+    <loc>https://gurugroup-de.github.io/coachguru-app/</loc>
+    <lastmod>2020-01-01</lastmod>
+    <image:image><image:loc>https://gurugroup-de.github.io/coachguru-app/assets/logo/coachguru_logo.png</image:loc></image:image>
+  </url>
+</urlset>
+'''
+
+def save_image(path, img, **params):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    img.save(path, **params)
+
+@pytest.fixture
+def docs_dir(tmp_path, rgba_source):
+    """Minimal docs site: logo, favicon, one image, and a screenshot saved twice"""
+    docs = tmp_path / 'docs'
+    save_image(str(docs / 'assets/logo/coachguru_logo.png'), rgba_source)
+    save_image(str(docs / 'assets/logo/favicon.png'), rgba_source.resize((32, 24)))
+    save_image(str(docs / 'images/feature.png'), rgba_source.convert('RGB').rotate(90, expand=True))
+    screen = rgba_source.convert('RGB').resize((320, 240))
+    # Same pixels, different encodings - served as one file
+    save_image(str(docs / 'screenshots/home.png'), screen, compress_level=1)
+    save_image(str(docs / 'screenshots/home_copy.png'), screen, compress_level=9)
+    (docs / 'index.html').write_text(INDEX_HTML, encoding='utf-8')
+    (docs / 'sitemap.xml').write_text(SITEMAP_XML, encoding='utf-8')
+    return str(docs)
+
+def snapshot(directory):
+    """{relative path: bytes} of every file under directory, except the size
+    report (it records the deltas against the previous run)"""
+    files = {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                files[os.path.relpath(path, directory)] = f.read()
+    del files[f'{STATIC_DIR}/{SIZE_REPORT_NAME}']
+    return files
+
+def read(docs_dir, name):
+    with open(os.path.join(docs_dir, name), encoding='utf-8') as f:
+        return f.read()
+
+def manifest(docs_dir):
+    return json.loads(read(docs_dir, f'{STATIC_DIR}/{MANIFEST_NAME}'))['assets']
+
+def test_rewrites_references_to_fingerprinted_files(docs_dir):
+    fingerprint_assets(docs_dir)
+    assets = manifest(docs_dir)
+    index = read(docs_dir, 'index.html')
+
+    for asset_path, served in assets.items():
+        assert re.fullmatch(rf'{STATIC_DIR}/[\w-]+\.[0-9a-f]{{10}}\.png', served)
+        assert os.path.isfile(os.path.join(docs_dir, served))
+    assert f'href="{assets["assets/logo/favicon.png"]}"' in index
+    assert f'src="{assets["assets/logo/coachguru_logo.png"]}"' in index
+    assert '?v=2' not in index
+    assert 'assets/logo/coachguru_logo.png' not in index
+    assert assets['assets/logo/coachguru_logo.png'] in read(docs_dir, 'sitemap.xml')
+    # GitHub Pages has no header configuration - nothing to write
+    assert not os.path.exists(os.path.join(docs_dir, '_headers'))
+
+def test_same_pixels_share_one_file(docs_dir):
+    fingerprint_assets(docs_dir)
+    assets = manifest(docs_dir)
+    assert assets['screenshots/home.png'] == assets['screenshots/home_copy.png']
+    # The smaller encoding is the one served
+    served_size = os.path.getsize(os.path.join(docs_dir, assets['screenshots/home.png']))
+    assert served_size == os.path.getsize(os.path.join(docs_dir, 'screenshots/home_copy.png'))
+
+def test_second_run_changes_nothing(docs_dir):
+    fingerprint_assets(docs_dir)
+    first = snapshot(docs_dir)
+
+    touched, _ = fingerprint_assets(docs_dir)
+    assert touched == []
+    assert snapshot(docs_dir) == first
+
+def test_second_run_without_render_cache_changes_nothing(docs_dir, monkeypatch):
+    fingerprint_assets(docs_dir)
+    first = snapshot(docs_dir)
+
+    monkeypatch.setenv('COACHGURU_NO_CACHE', '1')
+    touched, _ = fingerprint_assets(docs_dir)
+    assert touched == []
+    assert snapshot(docs_dir) == first
+
+def test_changed_image_replaces_the_old_fingerprint(docs_dir, rgba_source):
+    fingerprint_assets(docs_dir)
+    old_served = manifest(docs_dir)['assets/logo/coachguru_logo.png']
+
+    save_image(os.path.join(docs_dir, 'assets/logo/coachguru_logo.png'), rgba_source.rotate(180))
+    touched, _ = fingerprint_assets(docs_dir)
+    new_served = manifest(docs_dir)['assets/logo/coachguru_logo.png']
+
+    assert new_served != old_served
+    assert old_served in touched and not os.path.exists(os.path.join(docs_dir, old_served))
+    index = read(docs_dir, 'index.html')
+    assert old_served not in index
+    assert f'src="{new_served}"' in index
+    assert new_served in read(docs_dir, 'sitemap.xml')
+    # Idempotent again after the change
+    assert fingerprint_assets(docs_dir)[0] == []
+
+def test_adds_image_sizes_and_placeholders(docs_dir):
+    fingerprint_assets(docs_dir)
+    index = read(docs_dir, 'index.html')
+    feature = re.search(r'<img src="static/feature[^>]*>', index).group(0)
+    assert 'width="480"' in feature and 'height="640"' in feature
+    assert 'width="10"' not in feature
+    assert 'url(data:image/webp;base64,' in feature
+    block = re.search(rf'<script type="application/json" id="{PLACEHOLDER_SCRIPT_ID}">(.*?)</script>', index)
+    assert set(json.loads(block.group(1))) == {manifest(docs_dir)['screenshots/home.png']}
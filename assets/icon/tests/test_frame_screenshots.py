@@ -0,0 +1,140 @@
+"""Tests for docs/frame_screenshots.py: frame parts, compositing, captions and jobs"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+import frame_screenshots
+from frame_screenshots import (
+    CAPTION_HEIGHT, DEVICE_FRAMES, MARGIN, add_caption, build_frame, caption_font, composite, find_screenshots,
+    frame_jobs, frame_parts, frame_screenshot, load_captions, wrap_caption,
+)
+
+BACKGROUND = (10, 29, 71)
+SCREEN = (120, 200)
+
+@pytest.fixture(autouse=True)
+def frame_memo(monkeypatch):
+    """Frame parts memoized per test, so each test sees its own render cache"""
+    monkeypatch.setattr(frame_screenshots, 'FRAME_PARTS', {})
+
+@pytest.fixture
+def screenshot(tmp_path):
+    """A flat orange capture with a white bar, saved as PNG"""
+    img = Image.new('RGB', SCREEN, (230, 120, 30))
+    ImageDraw.Draw(img).rectangle((10, 90, 110, 110), fill=(255, 255, 255))
+    path = str(tmp_path / 'captures' / 'home.png')
+    os.makedirs(os.path.dirname(path))
+    img.save(path)
+    return path, img
+
+def test_build_frame_layout():
+    backdrop, (x, y), mask, overlay = build_frame('phone', SCREEN, BACKGROUND)
+    bezel = round(DEVICE_FRAMES['phone']['bezel'] * SCREEN[0])
+    margin = round(MARGIN * SCREEN[0])
+    assert (x, y) == (margin + bezel, margin + bezel)
+    assert backdrop.shape == (SCREEN[1] + 2 * y, SCREEN[0] + 2 * x, 3)
+    assert mask.shape == (SCREEN[1], SCREEN[0]) and overlay.shape == (SCREEN[1], SCREEN[0], 4)
+    # Rounded screen corners, full screen inside
+    assert mask[0, 0] == 0 and mask[SCREEN[1] // 2, SCREEN[0] // 2] == 255
+    # The canvas corner is bare background - beyond the shadow
+    assert tuple(backdrop[0, 0]) == BACKGROUND
+
+def test_camera_overlay_only_on_templates_with_one():
+    _, _, _, phone = build_frame('phone', SCREEN, BACKGROUND)
+    _, _, _, tablet = build_frame('tablet', SCREEN, BACKGROUND)
+    assert phone[..., 3].max() == 255
+    assert not tablet[..., 3].any()
+
+def test_composite_places_the_screenshot(screenshot):
+    _, img = screenshot
+    parts = build_frame('tablet', SCREEN, BACKGROUND)
+    backdrop, (x, y), _, _ = parts
+    framed = composite(img, parts)
+    assert framed.size == (backdrop.shape[1], backdrop.shape[0])
+    assert framed.getpixel((x + 60, y + 50)) == (230, 120, 30)
+    assert framed.getpixel((x + 60, y + 100)) == (255, 255, 255)
+    assert framed.getpixel((0, 0)) == BACKGROUND
+
+def test_frame_parts_are_mapped_from_the_cache(monkeypatch):
+    built = frame_parts('phone', SCREEN, BACKGROUND)
+    monkeypatch.setattr(frame_screenshots, 'FRAME_PARTS', {})
+
+    def no_build(*args):
+        raise AssertionError("frame built again")
+    monkeypatch.setattr(frame_screenshots, 'build_frame', no_build)
+    mapped = frame_parts('phone', SCREEN, BACKGROUND)
+    assert mapped[1] == built[1]
+    for array, view in zip((built[0], built[2], built[3]), (mapped[0], mapped[2], mapped[3])):
+        np.testing.assert_array_equal(view, array)
+
+def test_frame_screenshot_is_cached(tmp_path, screenshot):
+    path, _ = screenshot
+    output_path = str(tmp_path / 'framed' / 'home.png')
+    assert frame_screenshot(path, output_path, 'phone', None, BACKGROUND) == (output_path, False)
+    with open(output_path, 'rb') as f:
+        first = f.read()
+    os.remove(output_path)
+    assert frame_screenshot(path, output_path, 'phone', None, BACKGROUND) == (output_path, True)
+    with open(output_path, 'rb') as f:
+        assert f.read() == first
+
+def test_captions_add_a_band(tmp_path, screenshot):
+    path, _ = screenshot
+    plain = str(tmp_path / 'plain.png')
+    captioned = str(tmp_path / 'captioned.png')
+    frame_screenshot(path, plain, 'phone', None, BACKGROUND)
+    frame_screenshot(path, captioned, 'phone', 'Plan every session', BACKGROUND)
+    with Image.open(plain) as without, Image.open(captioned) as with_caption:
+        assert with_caption.width == without.width
+        assert with_caption.height == without.height + round(CAPTION_HEIGHT * SCREEN[0])
+        band = np.asarray(with_caption.convert('RGB'))[:round(CAPTION_HEIGHT * SCREEN[0])]
+        # Caption text drawn in the band (anti-aliased towards white)
+        assert (band.min(axis=-1) > 128).any()
+
+def test_empty_caption_keeps_the_band():
+    framed = Image.new('RGB', (200, 300), BACKGROUND)
+    canvas = add_caption(framed, '', SCREEN[0], BACKGROUND)
+    assert canvas.size == (200, 300 + round(CAPTION_HEIGHT * SCREEN[0]))
+    assert canvas.getcolors() == [(200 * canvas.height, BACKGROUND)]
+
+def test_wrap_caption():
+    draw = ImageDraw.Draw(Image.new('RGB', (1, 1)))
+    font = caption_font(12)
+    text = wrap_caption(draw, 'Track drills and plan every training session', font, 80)
+    lines = text.split('\n')
+    assert len(lines) > 1
+    assert ' '.join(lines) == 'Track drills and plan every training session'
+    assert all(draw.textlength(line, font=font) <= 80 for line in lines if ' ' in line)
+
+def test_find_screenshots_skips_empty_and_other_files(tmp_path, screenshot):
+    captures = os.path.dirname(screenshot[0])
+    open(os.path.join(captures, 'empty.png'), 'wb').close()
+    with open(os.path.join(captures, 'notes.txt'), 'w') as f:
+        f.write('not an image')
+    assert find_screenshots([captures, str(tmp_path / 'missing')]) == [(screenshot[0], SCREEN)]
+
+def test_load_captions(tmp_path):
+    assert load_captions(None) == {None: None}
+    assert load_captions(str(tmp_path / 'missing.json')) == {None: None}
+    path = tmp_path / 'captions.json'
+    path.write_text(json.dumps({'en': {'home': 'Home'}, 'de': {'home': 'Start'}}))
+    assert load_captions(str(path), ['de']) == {'de': {'home': 'Start'}}
+    with pytest.raises(ValueError):
+        load_captions(str(path), ['fr'])
+
+def test_frame_jobs():
+    screenshots = [('docs/screenshots/home.png', SCREEN), ('docs/screenshots/drills.png', SCREEN)]
+    jobs = frame_jobs(screenshots, ['phone'], {'en': {'home': 'Home'}}, BACKGROUND, 'out')
+    assert [(job[1], job[3]) for job in jobs] == [
+        ('out/phone/en/screenshots/home.png', 'Home'),
+        ('out/phone/en/screenshots/drills.png', ''),  # no caption - empty band
+    ]
+    jobs = frame_jobs(screenshots[:1], ['phone', 'tablet'], {None: None}, BACKGROUND, 'out')
+    assert [(job[1], job[2], job[3]) for job in jobs] == [
+        ('out/phone/screenshots/home.png', 'phone', None),
+        ('out/tablet/screenshots/home.png', 'tablet', None),
+    ]
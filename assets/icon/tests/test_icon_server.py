@@ -0,0 +1,127 @@
+"""Tests for icon_server.py: status codes, source confinement and the cache layers"""
+
+import http.client
+import io
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+
+import icon_server
+from icon_server import LRUCache, SourceDigests, SourceStore, make_handler
+
+@pytest.fixture
+def root(tmp_path, rgba_source):
+    """Served directory with one icon source; a secret image just outside it"""
+    served = tmp_path / 'root'
+    (served / 'assets').mkdir(parents=True)
+    rgba_source.save(served / 'assets' / 'icon.png')
+    (served / 'assets' / 'notes.png').write_text('not an image')
+    rgba_source.save(tmp_path / 'secret.png')
+    return served
+
+def start_server(root, memory_cache):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(str(root), memory_cache, SourceStore(), SourceDigests()))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+@pytest.fixture
+def get(root):
+    """GET a path from a running server, returns (status, headers, body)"""
+    servers = []
+
+    def request(path, memory_cache=None):
+        if memory_cache is None:
+            if not servers:
+                servers.append(start_server(root, LRUCache(16)))
+            server = servers[0]
+        else:
+            server = start_server(root, memory_cache)
+            servers.append(server)
+        connection = http.client.HTTPConnection(*server.server_address)
+        connection.request('GET', path)
+        response = connection.getresponse()
+        result = response.status, response.headers, response.read()
+        connection.close()
+        return result
+
+    yield request
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def test_renders_png(get):
+    status, headers, body = get('/render?source=assets/icon.png&size=96')
+    assert status == 200
+    assert headers['Content-Type'] == 'image/png'
+    assert Image.open(io.BytesIO(body)).size == (96, 96)
+
+def test_renders_webp_circle(get):
+    status, headers, body = get('/render?source=assets/icon.png&size=64&shape=circle&format=webp')
+    assert status == 200
+    assert headers['Content-Type'] == 'image/webp'
+    img = Image.open(io.BytesIO(body))
+    assert img.size == (64, 64) and img.getpixel((0, 0))[3] == 0
+
+def test_memory_then_disk_cache(get):
+    path = '/render?source=assets/icon.png&size=48&background=ffffff'
+    first = get(path)
+    second = get(path)
+    assert first[1]['X-Render-Cache'] == 'render'
+    assert second[1]['X-Render-Cache'] == 'memory'
+    assert second[2] == first[2]
+    # A fresh process (empty memory LRU) is served from the shared render cache
+    third = get(path, memory_cache=LRUCache(16))
+    assert third[1]['X-Render-Cache'] == 'disk'
+    assert third[2] == first[2]
+
+def test_circle_ignores_background(get):
+    get('/render?source=assets/icon.png&size=48&shape=circle&background=ffffff')
+    status, headers, _ = get('/render?source=assets/icon.png&size=48&shape=circle&background=000000')
+    assert status == 200
+    assert headers['X-Render-Cache'] == 'memory'
+
+def test_memory_lru_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+
+@pytest.mark.parametrize('path', [
+    '/render?source=../secret.png',
+    '/render?source=assets/../../secret.png',
+    '/render?source=/etc/passwd',
+    '/render?source=assets/missing.png',
+])
+def test_sources_outside_root_are_rejected(get, path):
+    status, _, body = get(path)
+    assert status == 400
+    assert b'unknown source' in body
+
+@pytest.mark.parametrize('query', [
+    'size=0', 'size=4096', 'size=big', 'shape=star', 'format=gif', 'background=fff',
+])
+def test_invalid_parameters(get, query):
+    status, _, _ = get(f'/render?source=assets/icon.png&{query}')
+    assert status == 400
+
+def test_undecodable_source(get):
+    status, _, body = get('/render?source=assets/notes.png&size=32')
+    assert status == 415
+    assert b'cannot decode source assets/notes.png' in body
+
+def test_unknown_path(get):
+    assert get('/icons/app.png')[0] == 404
+
+def test_source_store_decodes_once_and_drops_locks(root, monkeypatch):
+    decodes = []
+    monkeypatch.setattr(icon_server, 'load_source', lambda path: decodes.append(path) or Image.open(path))
+    store = SourceStore()
+    path = str(root / 'assets' / 'icon.png')
+    assert store.get(path, 'digest') is store.get(path, 'digest')
+    assert decodes == [path]
+    assert len(store.locks) == 0
@@ -0,0 +1,111 @@
+"""Tests for the progress journal: load_journal, journal_result and --resume"""
+
+import json
+import os
+
+import pytest
+
+import asset_pipeline
+import process_final_icon
+from asset_pipeline import file_digest, journal_result, load_journal, write_json_atomic
+from process_final_icon import DEFAULT_OPTIONS, IOS_ICON_DIR, IOS_SIZES, JOURNAL_PATH
+
+RUN = 'run-key'
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(data)
+
+@pytest.fixture
+def outputs(tmp_path, monkeypatch):
+    """Two finished outputs in a scratch directory"""
+    monkeypatch.chdir(tmp_path)
+    write('out/a.png', 'a')
+    write('out/b.png', 'b')
+    return ['out/a.png', 'out/b.png']
+
+def test_no_journal(tmp_path):
+    assert load_journal(str(tmp_path / 'journal.json'), RUN) == {}
+
+def test_corrupt_journal(tmp_path):
+    path = tmp_path / 'journal.json'
+    path.write_text('{"run": "run-key", "comp')
+    assert load_journal(str(path), RUN) == {}
+
+def test_journal_round_trip(outputs):
+    completed = {}
+    for path in outputs:
+        journal_result('journal.json', RUN, completed, path, {'paths': [path], 'size': 1})
+    loaded = load_journal('journal.json', RUN)
+    assert set(loaded) == set(outputs)
+    assert loaded['out/a.png']['digests'] == {'out/a.png': file_digest('out/a.png')}
+    assert loaded['out/a.png']['size'] == 1
+
+def test_other_run_is_not_resumed(outputs):
+    journal_result('journal.json', RUN, {}, outputs[0], {'paths': outputs[:1]})
+    assert load_journal('journal.json', 'other-run') == {}
+
+def test_changed_or_missing_outputs_are_redone(outputs):
+    completed = {}
+    for path in outputs:
+        journal_result('journal.json', RUN, completed, path, {'paths': [path]})
+    write('out/a.png', 'edited after the run')
+    assert list(load_journal('journal.json', RUN)) == ['out/b.png']
+    os.remove('out/b.png')
+    assert load_journal('journal.json', RUN) == {}
+
+def test_interrupted_write_keeps_the_previous_journal(outputs, monkeypatch):
+    completed = {}
+    journal_result('journal.json', RUN, completed, outputs[0], {'paths': outputs[:1]})
+
+    def interrupted(src, dst):
+        raise KeyboardInterrupt
+    with monkeypatch.context() as patched, pytest.raises(KeyboardInterrupt):
+        patched.setattr(asset_pipeline.os, 'replace', interrupted)
+        journal_result('journal.json', RUN, completed, outputs[1], {'paths': outputs[1:]})
+
+    # The rename never happened - the journal still parses and has the first entry
+    with open('journal.json') as f:
+        assert list(json.load(f)['completed']) == [outputs[0]]
+    assert list(load_journal('journal.json', RUN)) == [outputs[0]]
+
+def test_write_json_atomic_leaves_no_temporary_file(tmp_path):
+    path = tmp_path / 'nested' / 'data.json'
+    write_json_atomic({'b': 1, 'a': [2]}, str(path))
+    assert json.loads(path.read_text()) == {'a': [2], 'b': 1}
+    assert os.listdir(path.parent) == ['data.json']
+
+def test_resume_skips_completed_icons(tmp_path, monkeypatch, rgba_source):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(process_final_icon, 'JOURNAL', {'run': None, 'completed': {}})
+    rgba_source.save('source.png')
+    options = dict(DEFAULT_OPTIONS, appearances=False)
+
+    # A run interrupted after the iOS set: the journal lists every iOS icon
+    process_final_icon.start_journal('source.png', options)
+    process_final_icon.generate_ios_icons('source.png', options)
+    damaged = f'{IOS_ICON_DIR}/Icon-App-20x20@1x.png'
+    intact = f'{IOS_ICON_DIR}/Icon-App-40x40@2x.png'
+    expected = file_digest(damaged)
+    with open(damaged, 'ab') as f:
+        f.write(b'truncated run')
+    before = os.path.getmtime(intact)
+
+    ran = []
+    run_parallel = process_final_icon.run_parallel
+    def recording_run_parallel(func, jobs, **kwargs):
+        ran.extend(job[3][0] for job in jobs)
+        return run_parallel(func, jobs, **kwargs)
+    monkeypatch.setattr(process_final_icon, 'run_parallel', recording_run_parallel)
+
+    assert process_final_icon.start_journal('source.png', options, resume=True) == len(IOS_SIZES) - 1
+    results = process_final_icon.generate_ios_icons('source.png', options)
+    # Only the damaged icon is redone; the others come from the journal
+    assert ran == [damaged]
+    assert [result['paths'][0] for result in results] == [f'{IOS_ICON_DIR}/{name}' for name in IOS_SIZES]
+    assert file_digest(damaged) == expected
+    assert os.path.getmtime(intact) == before
+
+    process_final_icon.finish_journal()
+    assert not os.path.exists(JOURNAL_PATH)
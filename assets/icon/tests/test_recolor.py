@@ -0,0 +1,106 @@
+"""Tests for recolor.py: LUT recoloring of rendered outputs"""
+
+import io
+import os
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from asset_pipeline import encode_ico, encode_png, read_ico_frames
+from brand import NAVY_BLUE
+from recolor import optimize_output, recolor_image, recolor_output
+
+GREEN = (27, 94, 32)
+WHITE = (255, 255, 255)
+
+def blend(coverage, color, background=WHITE):
+    """coverage (0..1 array) of color over background"""
+    coverage = np.asarray(coverage, dtype=np.float64)[..., None]
+    return coverage * np.asarray(color) + (1 - coverage) * np.asarray(background)
+
+@pytest.fixture
+def navy_on_white():
+    """Anti-aliased navy disc on white (4× supersampled), with its coverage"""
+    big = Image.new('L', (256, 256), 0)
+    ImageDraw.Draw(big).ellipse((24, 24, 232, 232), fill=255)
+    coverage = np.asarray(big.resize((64, 64), Image.Resampling.BOX), dtype=np.float64) / 255
+    pixels = np.rint(blend(coverage, NAVY_BLUE)).astype(np.uint8)
+    return Image.fromarray(pixels), coverage
+
+def test_edges_keep_their_coverage(navy_on_white):
+    img, coverage = navy_on_white
+    recolored = np.asarray(recolor_image(img, NAVY_BLUE, GREEN), dtype=np.float64)
+    edge = (coverage > 0) & (coverage < 1)
+    assert edge.sum() > 50
+    # Every pixel is the same blend of green over white as it was of navy
+    assert np.abs(recolored - blend(coverage, GREEN)).max() <= 1.5
+    assert tuple(recolored[32, 32].astype(int)) == GREEN
+    assert tuple(recolored[0, 0].astype(int)) == WHITE
+
+def test_alpha_is_untouched(navy_on_white):
+    img, _ = navy_on_white
+    rgba = img.convert('RGBA')
+    alpha = np.rint(np.linspace(0, 255, 64 * 64)).astype(np.uint8).reshape(64, 64)
+    rgba.putalpha(Image.fromarray(alpha))
+    recolored = recolor_image(rgba, NAVY_BLUE, GREEN)
+    assert recolored.mode == 'RGBA'
+    np.testing.assert_array_equal(np.asarray(recolored)[..., 3], alpha)
+    assert recolored.getpixel((32, 32))[:3] == GREEN
+
+def test_image_without_the_brand_color():
+    img = Image.new('RGB', (32, 32), (200, 40, 40))
+    ImageDraw.Draw(img).rectangle((8, 8, 24, 24), fill=WHITE)
+    assert recolor_image(img, NAVY_BLUE, GREEN) is None
+
+def test_output_without_the_brand_color_is_copied_byte_for_byte(tmp_path):
+    img = Image.new('RGB', (32, 32), (200, 40, 40))
+    input_path = str(tmp_path / 'red.png')
+    img.save(input_path, compress_level=9)
+    output_path = str(tmp_path / 'variant' / 'red.png')
+
+    assert recolor_output(input_path, output_path, NAVY_BLUE, GREEN) == (output_path, False)
+    with open(input_path, 'rb') as original, open(output_path, 'rb') as written:
+        assert written.read() == original.read()
+    # The same answer when served from the render cache
+    assert recolor_output(input_path, output_path, NAVY_BLUE, GREEN) == (output_path, False)
+
+def test_recolored_output_keeps_its_format(tmp_path, navy_on_white):
+    img, _ = navy_on_white
+    for extension, params in (('png', {}), ('webp', {'lossless': True})):
+        input_path = str(tmp_path / f'icon.{extension}')
+        img.save(input_path, **params)
+        output_path = str(tmp_path / 'variant' / f'icon.{extension}')
+        assert recolor_output(input_path, output_path, NAVY_BLUE, GREEN) == (output_path, True)
+        with Image.open(output_path) as written:
+            assert written.format == extension.upper()
+            assert written.getpixel((32, 32))[:3] == GREEN
+
+def test_ico_frames_are_recolored(tmp_path, navy_on_white):
+    img, _ = navy_on_white
+    input_path = str(tmp_path / 'app_icon.ico')
+    with open(input_path, 'wb') as f:
+        f.write(encode_ico([(16, encode_png(img.resize((16, 16)))), (64, encode_png(img))]))
+    output_path = str(tmp_path / 'variant' / 'app_icon.ico')
+
+    assert recolor_output(input_path, output_path, NAVY_BLUE, GREEN) == (output_path, True)
+    with open(output_path, 'rb') as f:
+        frames = read_ico_frames(f.read())
+    assert [size for size, _ in frames] == [16, 64]
+    for size, frame in frames:
+        assert Image.open(io.BytesIO(frame)).getpixel((size // 2, size // 2))[:3] == GREEN
+
+def test_optimize_pass_is_lossless_and_smaller(tmp_path, navy_on_white):
+    img, _ = navy_on_white
+    input_path = str(tmp_path / 'icon.png')
+    img.save(input_path)
+    output_path = str(tmp_path / 'variant' / 'icon.png')
+    recolor_output(input_path, output_path, NAVY_BLUE, GREEN)
+    with Image.open(output_path) as fast:
+        fast_pixels = fast.tobytes()
+    fast_size = os.path.getsize(output_path)
+
+    optimize_output(output_path)
+    with Image.open(output_path) as optimized:
+        assert optimized.tobytes() == fast_pixels
+    assert os.path.getsize(output_path) <= fast_size
@@ -0,0 +1,67 @@
+"""Tests for resample.py: batched resize against Pillow"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from resample import resize_batch, resize_premultiplied, thumbnail_size
+
+SIZES = [(48, 36), (64, 48), (160, 120), (427, 320)]
+
+def pillow_premultiplied(img, size):
+    """Pillow's own premultiplied LANCZOS resize, without a reducing_gap pre-pass"""
+    return img.convert('RGBa').resize(size, Image.Resampling.LANCZOS).convert('RGBA')
+
+def pixels(img):
+    return np.asarray(img, dtype=np.int32)
+
+@pytest.mark.parametrize('mode', ['L', 'RGB'])
+def test_resize_batch_matches_pillow(rgba_source, mode):
+    source = rgba_source.convert(mode)
+    resized = resize_batch(source, SIZES)
+    for size in SIZES:
+        expected = pixels(source.resize(size, Image.Resampling.LANCZOS))
+        assert resized[size].mode == mode
+        assert np.abs(pixels(resized[size]) - expected).max() <= 2, size
+
+def test_resize_batch_rgba_matches_pillow(rgba_source):
+    resized = resize_batch(rgba_source, SIZES)
+    for size in SIZES:
+        expected = pixels(pillow_premultiplied(rgba_source, size))
+        actual = pixels(resized[size])
+        assert np.abs(actual[..., 3] - expected[..., 3]).max() <= 1, size
+        # Composited color - faint pixels amplify ±1 premultiplied rounding by
+        # 255 / alpha, but what is drawn stays within rounding
+        composited = np.abs(actual[..., :3] * actual[..., 3:] - expected[..., :3] * expected[..., 3:]) / 255
+        assert composited.max() <= 2, size
+        opaque = expected[..., 3] >= 128
+        assert np.abs(actual[opaque][:, :3] - expected[opaque][:, :3]).max() <= 2, size
+
+def test_resize_batch_rgba_transparent_pixels_have_no_color(rgba_source):
+    resized = resize_batch(rgba_source, SIZES)
+    for size in SIZES:
+        actual = pixels(resized[size])
+        transparent = actual[..., 3] == 0
+        assert transparent.any()
+        assert not actual[transparent][:, :3].any(), size
+
+def test_resize_batch_returns_each_distinct_size_once(rgba_source):
+    resized = resize_batch(rgba_source, [(64, 48), (64, 48), (32, 24)])
+    assert sorted(resized) == [(32, 24), (64, 48)]
+    assert all(img.size == size for size, img in resized.items())
+
+def test_resize_batch_rejects_unsupported_modes(rgba_source):
+    with pytest.raises(ValueError):
+        resize_batch(rgba_source.convert('P'), [(32, 24)])
+
+def test_resize_premultiplied_keeps_transparent_color_out_of_edges():
+    # Opaque white square on fully transparent *red* - red must not bleed in
+    img = Image.new('RGBA', (256, 256), (255, 0, 0, 0))
+    img.paste((255, 255, 255, 255), (64, 64, 192, 192))
+    resized = pixels(resize_premultiplied(img, (32, 32)))
+    visible = resized[..., 3] > 0
+    assert (resized[visible][:, 0] - resized[visible][:, 1]).max() <= 2
+
+def test_thumbnail_size_fits_and_never_upscales(rgba_source):
+    assert thumbnail_size(rgba_source, 64) == (64, 48)
+    assert thumbnail_size(rgba_source, 1024) == rgba_source.size
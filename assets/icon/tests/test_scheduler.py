@@ -0,0 +1,86 @@
+"""Tests for the memory-budgeted scheduler: parse_memory, plan_workers and run_parallel"""
+
+import time
+
+import pytest
+
+from asset_pipeline import WORKER_MEMORY, current_rss, format_memory, parse_memory, plan_workers, run_parallel
+
+MB = 1024 * 1024
+
+def timed_job(index, seconds):
+    """Sleep, returning the index with the wall-clock interval it ran in"""
+    start = time.monotonic()
+    time.sleep(seconds)
+    return index, start, time.monotonic()
+
+@pytest.mark.parametrize('value, expected', [
+    ('2G', 2 * 1024 * MB),
+    ('1536M', 1536 * MB),
+    ('512MB', 512 * MB),
+    ('1.5GiB', 1536 * MB),
+    ('64k', 64 * 1024),
+    ('1048576', MB),
+    (1048576, MB),
+])
+def test_parse_memory(value, expected):
+    assert parse_memory(value) == expected
+
+@pytest.mark.parametrize('value', ['', 'lots', '2X', '-1G'])
+def test_parse_memory_rejects_invalid_sizes(value):
+    with pytest.raises(ValueError):
+        parse_memory(value)
+
+def test_format_memory():
+    assert format_memory(1536 * 1024) == '1.5 MB'
+    assert format_memory(0) == '0.0 MB'
+
+def test_plan_workers_fits_typical_jobs():
+    base = 100 * MB
+    budget = base + 3 * (WORKER_MEMORY + 10 * MB)
+    assert plan_workers([10 * MB] * 8, budget, base, 8) == 3
+    # The median job decides - one outlier does not shrink the pool
+    assert plan_workers([10 * MB] * 7 + [4096 * MB], budget, base, 8) == 3
+
+def test_plan_workers_limits():
+    base = 100 * MB
+    plenty = 64 * 1024 * MB
+    assert plan_workers([MB] * 8, plenty, base, 4) == 4
+    assert plan_workers([MB] * 2, plenty, base, 8) == 2
+    # Never fewer than one, even when nothing fits
+    assert plan_workers([MB] * 8, base, base, 8) == 1
+
+def test_run_parallel_keeps_job_order():
+    jobs = [(index, 0.05 * (3 - index)) for index in range(3)]
+    finished = []
+    results = run_parallel(timed_job, jobs, workers=3, on_result=lambda index, result: finished.append(index))
+    assert [result[0] for result in results] == [0, 1, 2]
+    assert sorted(finished) == [0, 1, 2]
+
+def test_large_jobs_run_alone():
+    small = 10 * MB
+    # Room for two workers with a small job each, with slack for RSS drift
+    budget = current_rss() + 2 * (WORKER_MEMORY + small) + 30 * MB
+    job_memory = [small, small, 4096 * MB, small, small]
+    stats = {}
+    results = run_parallel(timed_job, [(index, 0.2) for index in range(5)], workers=4,
+                           job_memory=job_memory, max_memory=budget, stats=stats)
+
+    assert [result[0] for result in results] == [0, 1, 2, 3, 4]
+    _, large_start, large_end = results[2]
+    for index, start, end in results:
+        if index != 2:
+            assert end <= large_start or start >= large_end, index
+    # The small jobs still ran two at a time
+    assert results[0][1] < results[1][2] and results[1][1] < results[0][2]
+    assert stats['workers'] == 2
+    assert stats['estimated_peak'] >= 4096 * MB
+    assert stats['measured_peak'] > 0
+
+def test_serial_run_records_stats():
+    stats = {}
+    results = run_parallel(timed_job, [(0, 0), (1, 0)], workers=1,
+                           job_memory=[MB, 2 * MB], max_memory=64 * 1024 * MB, stats=stats)
+    assert [result[0] for result in results] == [0, 1]
+    assert stats['workers'] == 1
+    assert stats['estimated_peak'] >= 2 * MB
@@ -0,0 +1,47 @@
+"""Tests for shared_source.py: shared-memory transport of decoded sources"""
+
+import numpy as np
+import pytest
+
+import shared_source
+from shared_source import (
+    attach_array, attach_image, release_shared, share_array, share_image, shareable_image,
+)
+
+@pytest.fixture(autouse=True)
+def shared_blocks():
+    """Unlink every block a test created"""
+    yield
+    release_shared()
+    shared_source.ATTACHED_BLOCKS.clear()
+
+@pytest.mark.parametrize('mode, shared_mode', [('RGBA', 'RGBA'), ('RGB', 'RGBX'), ('L', 'L'), ('LA', 'RGBA')])
+def test_share_image_round_trip(rgba_source, mode, shared_mode):
+    source = rgba_source.convert(mode)
+    descriptor = share_image(source)
+    assert descriptor['mode'] == shared_mode
+    assert tuple(descriptor['size']) == source.size
+
+    attached = attach_image(descriptor)
+    assert attached.mode == shared_mode
+    assert attached.tobytes() == shareable_image(source).tobytes()
+    assert attached.convert(mode).tobytes() == source.tobytes()
+
+def test_share_image_spans_several_strips(rgba_source):
+    tall = rgba_source.resize((64, shared_source.STRIP_ROWS * 2 + 7))
+    assert attach_image(share_image(tall)).tobytes() == tall.tobytes()
+
+def test_share_array_round_trip():
+    array = np.arange(3 * 5 * 4, dtype=np.float32).reshape(3, 5, 4)
+    attached = attach_array(share_array(array))
+    np.testing.assert_array_equal(attached, array)
+    assert attached.dtype == array.dtype
+    assert not attached.flags.writeable
+
+def test_release_shared_unlinks_created_blocks(rgba_source):
+    descriptor = share_image(rgba_source)
+    assert descriptor['name'] in shared_source.CREATED_BLOCKS
+    release_shared()
+    assert not shared_source.CREATED_BLOCKS
+    with pytest.raises(FileNotFoundError):
+        shared_source.shared_memory.SharedMemory(name=descriptor['name'])
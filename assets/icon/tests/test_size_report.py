@@ -0,0 +1,73 @@
+"""Tests for the output size budgets: size_report, format_delta and manifest_sizes"""
+
+import fnmatch
+
+from asset_pipeline import format_delta, manifest_sizes, size_report
+from process_final_icon import SIZE_BUDGETS, WINDOWS_ICO_PATH
+from verify_icons import expected_outputs
+
+BUDGETS = {
+    'launcher': {
+        'patterns': ['res/mipmap-*/ic_launcher.png'],
+        'max_bytes': 1000,
+        'max_asset_bytes': 400,
+        'assets': {'res/mipmap-xxxhdpi/ic_launcher.png': 600},
+    },
+    'web': {
+        'patterns': ['web/*.png'],
+    },
+}
+
+def test_within_budget():
+    sizes = {'res/mipmap-mdpi/ic_launcher.png': 300, 'res/mipmap-xxxhdpi/ic_launcher.png': 550, 'web/favicon.png': 90}
+    report = size_report(sizes, sizes, BUDGETS)
+    assert report['over_budget'] == []
+    assert report['groups']['launcher'] == {
+        'files': 2, 'bytes': 850, 'previous': 850, 'delta': 0, 'budget': 1000, 'over': False,
+    }
+    # The per-file override replaces the group's max_asset_bytes
+    assert report['assets']['res/mipmap-xxxhdpi/ic_launcher.png']['budget'] == 600
+    assert report['assets']['res/mipmap-mdpi/ic_launcher.png']['budget'] == 400
+    # A group without caps only reports
+    assert report['groups']['web']['budget'] is None and not report['groups']['web']['over']
+
+def test_asset_and_group_overruns():
+    sizes = {'res/mipmap-mdpi/ic_launcher.png': 401, 'res/mipmap-xxxhdpi/ic_launcher.png': 600}
+    report = size_report(sizes, {}, BUDGETS)
+    # 1001 bytes in total, and the mdpi file is one byte over its cap
+    assert report['over_budget'] == ['launcher', 'res/mipmap-mdpi/ic_launcher.png']
+    assert not report['assets']['res/mipmap-xxxhdpi/ic_launcher.png']['over']
+
+def test_deltas_against_the_previous_run():
+    previous = {'res/mipmap-mdpi/ic_launcher.png': 350, 'res/mipmap-hdpi/ic_launcher.png': 200}
+    sizes = {'res/mipmap-mdpi/ic_launcher.png': 300, 'web/favicon.png': 90}
+    report = size_report(sizes, previous, BUDGETS)
+    assert report['assets']['res/mipmap-mdpi/ic_launcher.png']['delta'] == -50
+    assert report['assets']['web/favicon.png']['delta'] is None
+    # The group total compares against every file the group had before
+    assert report['groups']['launcher']['previous'] == 550
+    assert report['groups']['launcher']['delta'] == -250
+    assert report['groups']['web']['previous'] is None
+
+def test_unmatched_outputs_are_not_reported():
+    report = size_report({'ios/Icon.png': 10**6}, {}, BUDGETS)
+    assert report['assets'] == {}
+    assert report['groups']['launcher']['files'] == 0
+    assert report['over_budget'] == []
+
+def test_format_delta():
+    assert format_delta(None) == 'new'
+    assert format_delta(0) == '+0 B'
+    assert format_delta(-300) == '-300 B'
+    assert format_delta(1536) == '+1.5 KB'
+
+def test_manifest_sizes():
+    manifest = {'outputs': {'a.png': {'bytes': 12, 'sha256': 'x'}, 'b.ico': {'bytes': 34, 'sha256': 'y'}}}
+    assert manifest_sizes(manifest) == {'a.png': 12, 'b.ico': 34}
+    assert manifest_sizes(None) == {}
+
+def test_every_generated_icon_has_one_budget_group():
+    for path in [*expected_outputs(appearances=True), WINDOWS_ICO_PATH]:
+        groups = [group for group, budget in SIZE_BUDGETS.items()
+                  if any(fnmatch.fnmatch(path, pattern) for pattern in budget['patterns'])]
+        assert len(groups) == 1, (path, groups)
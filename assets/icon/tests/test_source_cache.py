@@ -0,0 +1,116 @@
+"""Tests for source_cache.py: raw mmap entries and decoded-source mapping"""
+
+import os
+
+import numpy as np
+from PIL import Image
+
+import render_cache
+import source_cache
+from source_cache import ALIGNMENT, map_decoded, map_pyramid, map_raw, open_decoded, store_pyramid, store_raw
+
+def test_store_raw_map_raw_round_trip():
+    buffers = [b'first buffer', bytes(range(256)) * 3, b'', b'x' * (ALIGNMENT + 1)]
+    # The second buffer arrives in pieces, like image strips
+    parts = [(len(buffers[0]), [buffers[0]]),
+             (len(buffers[1]), [buffers[1][:100], buffers[1][100:]]),
+             (0, []),
+             (len(buffers[3]), [buffers[3]])]
+    store_raw('raw-key', {'mode': 'RGBA', 'size': [4, 2]}, parts)
+
+    meta, mapped = map_raw('raw-key')
+    assert meta == {'mode': 'RGBA', 'size': [4, 2], 'lengths': [len(buffer) for buffer in buffers]}
+    assert [bytes(view) for view in mapped] == buffers
+    assert all(view.readonly for view in mapped)
+
+def test_map_raw_buffers_start_on_alignment_boundaries():
+    store_raw('aligned', {}, [(3, [b'abc']), (5, [b'defgh']), (1, [b'i'])])
+    with open(render_cache.object_path('aligned', render_cache.DECODED), 'rb') as f:
+        data = f.read()
+    assert data.index(b'abc') % ALIGNMENT == 0
+    assert data.index(b'defgh') % ALIGNMENT == 0
+    assert data.index(b'i', data.index(b'defgh')) % ALIGNMENT == 0
+
+def test_map_raw_misses():
+    assert map_raw('missing') is None
+
+    render_cache.store('not-raw', b'PNG data, not a raw entry', render_cache.DECODED)
+    assert map_raw('not-raw') is None
+
+    store_raw('truncated', {}, [(1000, [bytes(1000)])])
+    path = render_cache.object_path('truncated', render_cache.DECODED)
+    with open(path, 'rb+') as f:
+        f.truncate(os.path.getsize(path) - 10)
+    assert map_raw('truncated') is None
+
+def test_map_raw_disabled_cache(monkeypatch):
+    store_raw('raw-key', {}, [(1, [b'x'])])
+    monkeypatch.setenv('COACHGURU_NO_CACHE', '1')
+    assert map_raw('raw-key') is None
+
+def test_map_decoded_round_trip(tmp_path, rgba_source):
+    for mode in ('RGBA', 'RGB', 'L'):
+        path = str(tmp_path / f'source_{mode}.png')
+        rgba_source.convert(mode).save(path)
+        mapped = map_decoded(path)
+        assert mapped.size == rgba_source.size
+        # RGB comes back as RGBX, the layout Pillow keeps in memory
+        assert mapped.mode == {'RGB': 'RGBX'}.get(mode, mode)
+        assert mapped.convert(mode).tobytes() == rgba_source.convert(mode).tobytes()
+
+def test_map_decoded_second_call_does_not_decode(tmp_path, rgba_source, monkeypatch):
+    path = str(tmp_path / 'source.png')
+    rgba_source.save(path)
+    first = map_decoded(path)
+
+    def no_decode(*args, **kwargs):
+        raise AssertionError("source decoded again")
+    monkeypatch.setattr(source_cache.Image, 'open', no_decode)
+    assert map_decoded(path).tobytes() == first.tobytes()
+
+def test_open_decoded_without_cache(tmp_path, rgba_source, monkeypatch):
+    path = str(tmp_path / 'source.png')
+    rgba_source.save(path)
+    monkeypatch.setenv('COACHGURU_NO_CACHE', '1')
+    assert map_decoded(path) is None
+    assert open_decoded(path).tobytes() == rgba_source.tobytes()
+
+def test_open_decoded_converts_to_srgb(tmp_path, display_p3_profile):
+    path = str(tmp_path / 'p3.png')
+    Image.new('RGB', (8, 8), (40, 160, 60)).save(path, icc_profile=display_p3_profile)
+    decoded = open_decoded(path)
+    # Stored (and mapped) already converted - not the raw P3 values
+    assert decoded.convert('RGB').getpixel((0, 0)) != (40, 160, 60)
+    assert 'icc_profile' not in decoded.info
+
+def test_store_pyramid_round_trip():
+    levels = [np.arange(4 * 6 * 4, dtype=np.float32).reshape(4, 6, 4), np.ones((2, 3, 4), dtype=np.float32)]
+    mapped = store_pyramid('digest', levels)
+    assert len(mapped) == 2
+    for level, view in zip(levels, mapped):
+        assert view.dtype == level.dtype
+        np.testing.assert_array_equal(view, level)
+        assert not view.flags.writeable
+    assert map_pyramid('digest') is not None
+    assert map_pyramid('other digest') is None
+
+def test_decoded_entries_have_their_own_cap(tmp_path, rgba_source):
+    # Small renders, recently used, next to an older large decoded source
+    path = str(tmp_path / 'source.png')
+    rgba_source.save(path)
+    map_decoded(path)
+    decoded_bytes = render_cache.stats()['decoded_bytes']
+    for index in range(4):
+        render_cache.store(f'render-{index}', bytes(1000))
+
+    # The decoded source alone is over the render cap, but does not evict the renders
+    assert decoded_bytes > 4000
+    assert render_cache.prune(max_bytes=4000, decoded_max_bytes=decoded_bytes) == (0, 4000 + decoded_bytes)
+    assert all(render_cache.contains(f'render-{index}') for index in range(4))
+
+    # Each namespace is evicted against its own cap only
+    assert render_cache.prune(max_bytes=2000, decoded_max_bytes=decoded_bytes) == (2, 2000 + decoded_bytes)
+    assert render_cache.stats()['decoded_entries'] == 1
+    removed, total = render_cache.prune(max_bytes=2000, decoded_max_bytes=0)
+    assert (removed, total) == (1, 2000)
+    assert render_cache.stats()['decoded_entries'] == 0
@@ -0,0 +1,78 @@
+"""Tests for store_assets.py: store rule validation, --verify and generation"""
+
+import os
+import sys
+
+import pytest
+from PIL import Image
+
+import store_assets
+from asset_pipeline import read_png_header
+from store_assets import PNG_RGB, PNG_RGBA, STORE_ASSETS, generate_store_assets, validate_store_assets
+
+def write_asset(name, mode=None, size=None):
+    """Store asset at its path, in its spec's mode unless overridden"""
+    spec = STORE_ASSETS[name]
+    mode = mode or ('RGBA' if spec['alpha'] else 'RGB')
+    path = spec['path']
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.new(mode, size or spec['size'], (10, 29, 71, 255)[:len(mode)]).save(path)
+    return path
+
+@pytest.fixture
+def store_tree(tmp_path, monkeypatch):
+    """Every store asset, as the stores want it, in a scratch repo root"""
+    monkeypatch.chdir(tmp_path)
+    for name in STORE_ASSETS:
+        write_asset(name)
+    return tmp_path
+
+def verify(monkeypatch):
+    """Exit code of store_assets.py --verify"""
+    monkeypatch.setattr(sys, 'argv', ['store_assets.py', '--verify'])
+    try:
+        store_assets.main()
+    except SystemExit as e:
+        return e.code
+    return 0
+
+def test_valid_assets_pass(store_tree, monkeypatch):
+    assert validate_store_assets() == []
+    assert verify(monkeypatch) == 0
+
+def test_play_icon_must_be_32_bit(store_tree, monkeypatch):
+    # An opaque RGB Play icon is rejected - Play wants a 32-bit PNG
+    path = write_asset('play_icon', mode='RGB')
+    assert validate_store_assets() == [
+        f"{path}: PNG color type {PNG_RGB} / 8-bit, expected 32-bit RGBA truecolor"]
+    assert verify(monkeypatch) == 1
+
+def test_opaque_assets_reject_alpha(store_tree):
+    path = write_asset('app_store_icon', mode='RGBA')
+    errors = validate_store_assets()
+    assert f"{path}: has an alpha channel or transparency, the store requires an opaque image" in errors
+    assert f"{path}: PNG color type {PNG_RGBA} / 8-bit, expected 24-bit RGB truecolor" in errors
+
+def test_wrong_size_and_missing(store_tree, monkeypatch):
+    path = write_asset('feature_graphic', size=(1024, 512))
+    monkeypatch.setitem(STORE_ASSETS, 'play_icon', dict(STORE_ASSETS['play_icon'], path='assets/store/renamed.png'))
+    errors = validate_store_assets()
+    assert errors == ["assets/store/renamed.png: missing", f"{path}: 1024×512, expected 1024×500"]
+
+def test_file_size_limit(store_tree, monkeypatch):
+    monkeypatch.setitem(STORE_ASSETS, 'play_icon', dict(STORE_ASSETS['play_icon'], max_bytes=100))
+    errors = validate_store_assets()
+    assert len(errors) == 1
+    assert errors[0].startswith(f"{STORE_ASSETS['play_icon']['path']}: ")
+    assert "over the 100 byte limit" in errors[0]
+
+def test_generated_assets_meet_the_store_rules(tmp_path, monkeypatch, rgba_source):
+    monkeypatch.chdir(tmp_path)
+    rgba_source.save('source.png')
+    results = generate_store_assets('source.png')
+    assert [path for path, _, hit in results] == [spec['path'] for spec in STORE_ASSETS.values()]
+    assert not any(hit for _, _, hit in results)
+    assert validate_store_assets() == []
+    assert read_png_header(STORE_ASSETS['play_icon']['path'])['color_type'] == PNG_RGBA
+    # A second run is served from the render cache
+    assert all(hit for _, _, hit in generate_store_assets('source.png'))
@@ -0,0 +1,105 @@
+"""Tests for verify_icons.py: header checks against the size tables, manifest and Contents.json"""
+
+import json
+import os
+
+import pytest
+from PIL import Image
+
+from asset_pipeline import encode_ico, encode_png, write_bytes, write_manifest
+from icon_layers import IOS_APPEARANCES
+from process_final_icon import IOS_ICON_DIR, MANIFEST_PATH, WINDOWS_ICO_PATH, WINDOWS_ICO_SIZES, create_ios_contents_json
+from verify_icons import expected_outputs, verify_icons
+
+IOS_MARKETING_PATH = f'{IOS_ICON_DIR}/Icon-App-1024x1024@1x.png'
+IOS_SMALL_PATH = f'{IOS_ICON_DIR}/Icon-App-20x20@1x.png'
+
+def icon(size, alpha):
+    """Navy square, RGBA when the output may (or must) carry alpha"""
+    return Image.new('RGBA' if alpha is not False else 'RGB', (size, size), (10, 29, 71))
+
+def write_tree(appearances=False):
+    """A complete, consistent icon set (with manifest) in the current directory"""
+    outputs = expected_outputs(appearances)
+    for path, rule in outputs.items():
+        write_bytes(path, encode_png(icon(rule['size'], rule['alpha'])))
+    frames = [(size, encode_png(icon(size, True))) for size in WINDOWS_ICO_SIZES]
+    write_bytes(WINDOWS_ICO_PATH, encode_ico(frames))
+    create_ios_contents_json(IOS_APPEARANCES if appearances else ())
+    write_manifest(list(outputs) + [WINDOWS_ICO_PATH], MANIFEST_PATH)
+
+@pytest.fixture
+def icon_tree(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_tree()
+    return tmp_path
+
+@pytest.fixture
+def appearance_tree(tmp_path, monkeypatch):
+    """The icon set with the dark / tinted layers and monochrome mipmaps"""
+    monkeypatch.chdir(tmp_path)
+    write_tree(appearances=True)
+    return tmp_path
+
+def test_consistent_tree_passes(icon_tree):
+    assert verify_icons() == ([], [])
+
+def test_wrong_size(icon_tree):
+    icon(40, True).save(IOS_SMALL_PATH)
+    errors, _ = verify_icons()
+    assert f"{IOS_SMALL_PATH}: 40×40, expected 20×20" in errors
+    assert any(error.startswith('Icon-App-20x20@1x.png: 40×40, Contents.json says 20×20') for error in errors)
+
+def test_wrong_alpha(icon_tree):
+    # The App Store rejects a marketing icon with an alpha channel
+    icon(1024, True).save(IOS_MARKETING_PATH)
+    errors, _ = verify_icons()
+    assert f"{IOS_MARKETING_PATH}: alpha=True, expected alpha=False" in errors
+
+def test_digest_mismatch(icon_tree):
+    # Same size and color type - only the manifest digest can tell
+    icon(20, None).rotate(90).save(IOS_SMALL_PATH, compress_level=1)
+    errors, _ = verify_icons()
+    assert errors == [f"{IOS_SMALL_PATH}: content differs from manifest digest"]
+
+def test_ico_frames(icon_tree):
+    write_bytes(WINDOWS_ICO_PATH, encode_ico([(16, encode_png(icon(16, True)))]))
+    errors, _ = verify_icons()
+    assert any(error.startswith(f"{WINDOWS_ICO_PATH}: frames 16×16, expected") for error in errors)
+    assert f"{WINDOWS_ICO_PATH}: content differs from manifest digest" in errors
+
+def test_missing_contents_json_entry(icon_tree):
+    contents_path = f'{IOS_ICON_DIR}/Contents.json'
+    with open(contents_path) as f:
+        contents = json.load(f)
+    contents['images'] = [image for image in contents['images'] if image['filename'] != 'Icon-App-20x20@1x.png']
+    with open(contents_path, 'w') as f:
+        json.dump(contents, f)
+    errors, warnings = verify_icons()
+    assert errors == [f"{contents_path}: no entry for Icon-App-20x20@1x.png"]
+    assert warnings == [f"{IOS_SMALL_PATH}: not referenced by Contents.json"]
+
+def test_missing_output_and_manifest(icon_tree):
+    os.remove(IOS_SMALL_PATH)
+    os.remove(MANIFEST_PATH)
+    errors, warnings = verify_icons()
+    assert f"{IOS_SMALL_PATH}: missing" in errors
+    assert warnings == [f"{MANIFEST_PATH}: no manifest, skipping digest checks"]
+
+def test_consistent_appearance_tree_passes(appearance_tree):
+    assert verify_icons() == ([], [])
+
+def test_appearances_need_an_any_appearance_entry(appearance_tree):
+    contents_path = f'{IOS_ICON_DIR}/Contents.json'
+    with open(contents_path) as f:
+        contents = json.load(f)
+    # Only the ios-marketing entry left for the 1024 - Xcode ignores the dark / tinted ones
+    contents['images'] = [image for image in contents['images'] if image['idiom'] != 'universal' or 'appearances' in image]
+    with open(contents_path, 'w') as f:
+        json.dump(contents, f)
+    errors, _ = verify_icons()
+    assert errors == [
+        f"{contents_path}: Icon-App-{layer.capitalize()}-1024x1024@1x.png has no any-appearance universal "
+        f"1024x1024 entry to pair with"
+        for layer in IOS_APPEARANCES
+    ]
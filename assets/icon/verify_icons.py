@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Verify generated Android, iOS, macOS, Windows and web icons without decoding them
+Reads only PNG (or WebP / ICO) headers, checks them against the size tables,
+the manifest and Contents.json - fast enough for a pre-commit hook
+"""
+
+import json
+import os
+import sys
+import time
+
+from asset_pipeline import file_digest, load_manifest, read_ico_sizes, read_image_header, read_png_header
+from icon_layers import IOS_APPEARANCES
+from process_final_icon import (
+    ANDROID_RES_DIR, ANDROID_SIZES, FOREGROUND_SIZES, IOS_APPEARANCE_SIZES, IOS_ICON_DIR, IOS_SIZES, MACOS_ICON_DIR,
+    MACOS_SIZES, MANIFEST_PATH, WEB_DIR, WEB_ICONS, WEB_MASKABLE_ICONS, WINDOWS_ICO_PATH, WINDOWS_ICO_SIZES,
+    ios_layer_filename,
+)
+
+def android_output(path_without_ext):
+    """Mipmaps may be PNG or WebP (--android-format) - use whichever exists"""
+    if not os.path.exists(f'{path_without_ext}.png') and os.path.exists(f'{path_without_ext}.webp'):
+        return f'{path_without_ext}.webp'
+    return f'{path_without_ext}.png'
+
+def appearances_generated(manifest):
+    """Appearance layers are optional (--no-appearances) - expected if the last run wrote them"""
+    return any('/ic_launcher_monochrome.' in path for path in (manifest or {}).get('outputs', {}))
+
+def ios_filenames(appearances=False):
+    """iOS icon filenames of the default set (plus the 1024 dark / tinted) → pixel size"""
+    filenames = dict(IOS_SIZES)
+    for layer in IOS_APPEARANCES if appearances else ():
+        filenames.update((ios_layer_filename(filename, layer), size) for filename, size in IOS_APPEARANCE_SIZES.items())
+    return filenames
+
+def expected_outputs(appearances=False):
+    """Every output the density tables promise, with its pixel size and alpha rule"""
+    expected = {}
+    for density, size in ANDROID_SIZES.items():
+        for name in ('ic_launcher', 'ic_launcher_round'):
+            expected[android_output(f'{ANDROID_RES_DIR}/mipmap-{density}/{name}')] = {'size': size, 'alpha': None}
+    for density, size in FOREGROUND_SIZES.items():
+        # Adaptive foregrounds are composited over the background layer
+        foreground = android_output(f'{ANDROID_RES_DIR}/mipmap-{density}/ic_launcher_foreground')
+        expected[foreground] = {'size': size, 'alpha': True}
+        if appearances:
+            monochrome = android_output(f'{ANDROID_RES_DIR}/mipmap-{density}/ic_launcher_monochrome')
+            expected[monochrome] = {'size': size, 'alpha': True}
+    for filename, size in ios_filenames(appearances).items():
+        # App Store rejects a marketing icon with an alpha channel; the
+        # dark / tinted layers are transparent
+        alpha = True if filename not in IOS_SIZES else False if size == 1024 else None
+        expected[f'{IOS_ICON_DIR}/{filename}'] = {'size': size, 'alpha': alpha}
+    for filename, size in MACOS_SIZES.items():
+        expected[f'{MACOS_ICON_DIR}/{filename}'] = {'size': size, 'alpha': None}
+    for filename, size in {**WEB_ICONS, **WEB_MASKABLE_ICONS}.items():
+        expected[f'{WEB_DIR}/{filename}'] = {'size': size, 'alpha': None}
+    return expected
+
+def verify_outputs(expected, manifest, errors):
+    """Check every expected output against its header and manifest entry"""
+    recorded = (manifest or {}).get('outputs', {})
+    for path, rule in expected.items():
+        if not os.path.exists(path):
+            errors.append(f"{path}: missing")
+            continue
+        try:
+            header = read_image_header(path)
+        except ValueError as e:
+            errors.append(str(e))
+            continue
+
+        size = rule['size']
+        if (header['width'], header['height']) != (size, size):
+            errors.append(f"{path}: {header['width']}×{header['height']}, expected {size}×{size}")
+        # libwebp drops an all-opaque alpha channel, so WebP only reports alpha in use
+        alpha_checked = rule['alpha'] is not None and not (path.endswith('.webp') and rule['alpha'])
+        if alpha_checked and header['alpha'] != rule['alpha']:
+            errors.append(f"{path}: alpha={header['alpha']}, expected alpha={rule['alpha']}")
+
+        if manifest is None:
+            continue
+        entry = recorded.get(path)
+        if entry is None:
+            errors.append(f"{path}: not recorded in manifest")
+            continue
+        if header['color_type'] != entry['color_type'] or header['alpha'] != entry['alpha']:
+            errors.append(f"{path}: color type {header['color_type']} differs from manifest ({entry['color_type']})")
+        if os.path.getsize(path) != entry['bytes'] or file_digest(path) != entry['sha256']:
+            errors.append(f"{path}: content differs from manifest digest")
+
+def verify_windows_icon(manifest, errors):
+    """Check the ICO frame sizes and its manifest digest"""
+    if not os.path.exists(WINDOWS_ICO_PATH):
+        errors.append(f"{WINDOWS_ICO_PATH}: missing")
+        return
+    try:
+        sizes = read_ico_sizes(WINDOWS_ICO_PATH)
+    except ValueError as e:
+        errors.append(str(e))
+        return
+    expected = [(size, size) for size in WINDOWS_ICO_SIZES]
+    if sizes != expected:
+        found = ', '.join(f'{width}×{height}' for width, height in sizes)
+        errors.append(f"{WINDOWS_ICO_PATH}: frames {found}, expected {', '.join(map(str, WINDOWS_ICO_SIZES))}")
+    entry = (manifest or {}).get('outputs', {}).get(WINDOWS_ICO_PATH)
+    if manifest is not None and (entry is None or file_digest(WINDOWS_ICO_PATH) != entry['sha256']):
+        errors.append(f"{WINDOWS_ICO_PATH}: content differs from manifest digest")
+
+def verify_contents_json(errors, warnings, appearances=False):
+    """Cross-check Contents.json filenames and sizes against the iOS files"""
+    contents_path = f'{IOS_ICON_DIR}/Contents.json'
+    if not os.path.exists(contents_path):
+        errors.append(f"{contents_path}: missing")
+        return
+
+    with open(contents_path) as f:
+        images = json.load(f).get('images', [])
+
+    filenames = ios_filenames(appearances)
+    referenced = set()
+    for image in images:
+        filename = image.get('filename')
+        if not filename:
+            continue
+        referenced.add(filename)
+        path = f'{IOS_ICON_DIR}/{filename}'
+        if filename not in filenames:
+            errors.append(f"{contents_path}: {filename} is not in the iOS size table")
+        if not os.path.exists(path):
+            errors.append(f"{contents_path}: references missing file {filename}")
+            continue
+        points = float(image['size'].split('x')[0])
+        scale = float(image.get('scale', '1x').rstrip('x'))  # single-size entries have no scale
+        pixels = round(points * scale)
+        header = read_png_header(path)
+        if (header['width'], header['height']) != (pixels, pixels):
+            errors.append(f"{filename}: {header['width']}×{header['height']}, Contents.json says {pixels}×{pixels}")
+
+    for filename in filenames:
+        if filename not in referenced:
+            errors.append(f"{contents_path}: no entry for {filename}")
+    # Dark / tinted entries only apply next to an any-appearance entry of their size
+    universal = {image.get('size') for image in images
+                 if image.get('idiom') == 'universal' and not image.get('appearances')}
+    for image in images:
+        if image.get('appearances') and image.get('size') not in universal:
+            errors.append(f"{contents_path}: {image.get('filename')} has no any-appearance universal "
+                          f"{image.get('size')} entry to pair with")
+    for item in sorted(os.listdir(IOS_ICON_DIR)):
+        if item.endswith('.png') and item not in referenced:
+            warnings.append(f"{IOS_ICON_DIR}/{item}: not referenced by Contents.json")
+
+def verify_icons(manifest_path=MANIFEST_PATH):
+    """Run all checks, return (errors, warnings)"""
+    errors = []
+    warnings = []
+    manifest = load_manifest(manifest_path)
+    if manifest is None:
+        warnings.append(f"{manifest_path}: no manifest, skipping digest checks")
+    appearances = appearances_generated(manifest)
+    verify_outputs(expected_outputs(appearances), manifest, errors)
+    verify_windows_icon(manifest, errors)
+    verify_contents_json(errors, warnings, appearances)
+    return errors, warnings
+
+def main():
+    """Main verification function"""
+    manifest_path = sys.argv[1] if len(sys.argv) > 1 else MANIFEST_PATH
+
+    start = time.perf_counter()
+    errors, warnings = verify_icons(manifest_path)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    for warning in warnings:
+        print(f"⚠️  {warning}")
+    for error in errors:
+        print(f"❌ {error}")
+
+    if errors:
+        print(f"\n❌ Icon verification failed: {len(errors)} problem(s) ({elapsed_ms:.1f} ms)")
+        sys.exit(1)
+    checked = expected_outputs(appearances_generated(load_manifest(manifest_path)))
+    print(f"✅ Icon sets verified ({len(checked)} files, {elapsed_ms:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
@@ -12,15 +12,13 @@ except ImportError:
     print("❌ PIL/Pillow not installed. Install with: pip3 install Pillow")
     sys.exit(1)
 
-def create_circular_logo(source_path, output_path, size=512):
-    """Create a circular version of the logo"""
-    print(f"🎨 Creating circular logo from: {source_path}")
-    
-    # Open source image
-    source_img = Image.open(source_path)
-    print(f"   Source size: {source_img.size[0]}×{source_img.size[1]}")
-    print(f"   Source mode: {source_img.mode}")
-    
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'icon'))
+
+from color_profile import normalize_to_srgb
+from resample import resize_premultiplied
+
+def render_circular_logo(source_img, size=512):
+    """Render the circular logo at the given size and return the image"""
     # Convert to RGBA if needed
     if source_img.mode != 'RGBA':
         source_img = source_img.convert('RGBA')
@@ -32,8 +30,7 @@ def create_circular_logo(source_path, output_path, size=512):
     new_width = int(source_img.width * scale_factor)
     new_height = int(source_img.height * scale_factor)
     
-    resized = source_img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-    print(f"   Resized to: {new_width}×{new_height}")
+    resized = resize_premultiplied(source_img, (new_width, new_height))
     
     # Create circular mask
     mask = Image.new('L', (size, size), 0)
@@ -53,6 +50,19 @@ def create_circular_logo(source_path, output_path, size=512):
     # Apply circular mask
     output.putalpha(mask)
     
+    return output
+
+def create_circular_logo(source_path, output_path, size=512):
+    """Create a circular version of the logo"""
+    print(f"🎨 Creating circular logo from: {source_path}")
+    
+    # Open source image (converted to sRGB if it carries an ICC profile)
+    source_img = normalize_to_srgb(Image.open(source_path))
+    print(f"   Source size: {source_img.size[0]}×{source_img.size[1]}")
+    print(f"   Source mode: {source_img.mode}")
+    
+    output = render_circular_logo(source_img, size)
+    
     # Save
     output.save(output_path, 'PNG', optimize=True)
     print(f"✅ Circular logo saved: {output_path}")
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Fingerprint and dedupe docs site images
+Copies every referenced image to static/<name>.<content hash>.<ext> (one
+file per distinct image), rewrites the references in index.html and
+sitemap.xml, and only writes files whose content changed - a changed image
+always gets a new URL, so no visitor sees a stale copy after a deploy.
+GitHub Pages sets its own Cache-Control (max-age=600) on every file and
+has no way to configure headers, so static/ is not cached any longer than
+the rest of the site. Sizes are checked against SIZE_BUDGETS, and images
+on the page get width / height and an inline blurred placeholder
+Usage: python3 docs/fingerprint_assets.py [docs_dir]
+"""
+
+try:
+    from PIL import Image
+    import base64
+    import datetime
+    import hashlib
+    import io
+    import json
+    import os
+    import re
+    import sys
+except ImportError:
+    print("❌ PIL/Pillow not installed. Install with: pip3 install Pillow")
+    sys.exit(1)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'assets', 'icon'))
+
+import render_cache
+from asset_pipeline import cached_encode, encode_webp, print_size_report, size_report
+from color_profile import normalize_to_srgb
+from resample import resize_premultiplied, thumbnail_size
+
+# Images the site references, relative to the docs directory
+ASSET_DIRS = ['images', 'screenshots', 'assets/logo', 'branding']
+ASSET_EXTENSIONS = ('.png', '.gif', '.jpg', '.jpeg', '.webp', '.ico')
+
+# Byte budgets per served image (see asset_pipeline.size_report) - the
+# stage exits non-zero when one is exceeded
+SIZE_BUDGETS = {
+    'favicons': {
+        'patterns': ['assets/logo/favicon.*'],
+        'assets': {'assets/logo/favicon.png': 64 * 1024, 'assets/logo/favicon.ico': 16 * 1024},
+    },
+    'logo': {
+        'patterns': ['assets/logo/coachguru_logo.png', 'branding/*'],
+        'max_asset_bytes': 100 * 1024,
+    },
+    'screenshots': {
+        'patterns': ['screenshots/*'],
+        'max_bytes': 1536 * 1024,
+        'max_asset_bytes': 200 * 1024,
+    },
+    'images': {
+        'patterns': ['images/*'],
+        'max_bytes': 1024 * 1024,
+        'max_asset_bytes': 200 * 1024,
+    },
+}
+
+# Pages whose references are rewritten
+PAGES = ['index.html', 'sitemap.xml']
+
+STATIC_DIR = 'static'
+MANIFEST_NAME = 'manifest.json'
+SIZE_REPORT_NAME = 'size_report.json'
+HASH_LENGTH = 10
+
+SITE_URL = 'https://gurugroup-de.github.io/coachguru-app/'
+
+# Low-quality image placeholders: <img> tags and images loaded by the page
+# scripts get their intrinsic width / height (no layout shift) and a tiny
+# WebP preview inlined as a data URI, which the browser upscales - blurred -
+# until the real image arrives. Cached by content hash in the render cache
+PLACEHOLDER_PAGES = ['index.html']
+PLACEHOLDER_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_QUALITY = 40
+PLACEHOLDER_SCRIPT_ID = 'image-placeholders'
+
+# Bump when placeholder rendering changes so cached placeholders are not reused
+PLACEHOLDER_VERSION = 2
+
+def find_assets(docs_dir):
+    """Image paths relative to docs_dir, sorted"""
+    assets = []
+    for asset_dir in ASSET_DIRS:
+        full_dir = os.path.join(docs_dir, asset_dir)
+        if not os.path.isdir(full_dir):
+            continue
+        for name in sorted(os.listdir(full_dir)):
+            if name.lower().endswith(ASSET_EXTENSIONS):
+                assets.append(f'{asset_dir}/{name}')
+    return assets
+
+def content_key(path, data):
+    """Identity of an image: its decoded pixels if readable, else its bytes
+
+    Re-encoded copies of the same screen (different PNG settings, same
+    pixels) share a key and are served as one file.
+    """
+    try:
+        with Image.open(path) as img:
+            if not getattr(img, 'is_animated', False):
+                img.load()
+                digest = hashlib.sha256(f'{img.mode}{img.size}'.encode())
+                digest.update(img.tobytes())
+                return 'pixels:' + digest.hexdigest()
+    except (OSError, ValueError):
+        pass
+    return 'bytes:' + hashlib.sha256(data).hexdigest()
+
+def fingerprint_name(asset_path, data):
+    """static/<stem>.<hash>.<ext> for the bytes that will be served"""
+    stem, ext = os.path.splitext(os.path.basename(asset_path))
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    return f'{STATIC_DIR}/{stem}.{digest}{ext.lower()}'
+
+def plan_assets(docs_dir, assets):
+    """Map every asset to its fingerprinted path, one file per distinct image"""
+    groups = {}
+    skipped = []
+    for asset_path in assets:
+        with open(os.path.join(docs_dir, asset_path), 'rb') as f:
+            data = f.read()
+        if not data:
+            skipped.append(asset_path)  # e.g. a placeholder never filled in
+            continue
+        groups.setdefault(content_key(os.path.join(docs_dir, asset_path), data), []).append((asset_path, data))
+
+    mapping = {}
+    files = {}
+    for members in groups.values():
+        # Serve the smallest encoding, named after the first path that has it
+        canonical_path, canonical_data = min(members, key=lambda member: (len(member[1]), member[0]))
+        served = fingerprint_name(canonical_path, canonical_data)
+        files[served] = canonical_data
+        for asset_path, _ in members:
+            mapping[asset_path] = served
+    return mapping, files, skipped
+
+def write_if_changed(path, data):
+    """Write bytes only if the file content differs, return True if written"""
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+def load_previous_manifest(docs_dir):
+    """Manifest written by the previous run (old fingerprints and sizes)"""
+    try:
+        with open(os.path.join(docs_dir, STATIC_DIR, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def rewrite_references(text, replacements):
+    """Replace each referenced path (with an optional ?v=N cache buster)"""
+    for old_path, new_path in sorted(replacements.items(), key=lambda item: -len(item[0])):
+        pattern = r'(?<=["\'/(])' + re.escape(old_path) + r'(\?v=\w+)?(?=["\')<\s])'
+        text = re.sub(pattern, new_path, text)
+    return text
+
+def bump_sitemap_lastmod(text):
+    """Set <lastmod> of the page URLs (not downloads) to today"""
+    today = datetime.date.today().isoformat()
+    def bump(match):
+        loc = match.group(1)
+        page = loc.startswith(SITE_URL) and '.' not in loc[len(SITE_URL):].split('#')[0]
+        if not page:
+            return match.group(0)
+        return re.sub(r'<lastmod>[^<]*</lastmod>', f'<lastmod>{today}</lastmod>', match.group(0))
+    return re.sub(r'<url>\s*<loc>([^<]+)</loc>.*?</url>', bump, text, flags=re.DOTALL)
+
+def render_placeholder(data):
+    """{'width', 'height', 'lqip': data URI} of an encoded image, None if undecodable"""
+    try:
+        img = Image.open(io.BytesIO(data))
+        width, height = img.size
+        img.draft('RGB', thumbnail_size(img, PLACEHOLDER_SIZE))  # JPEG: decode at reduced scale
+        img.load()
+    except (OSError, ValueError):
+        return None
+    img = normalize_to_srgb(img)
+    # Strip-wise NumPy box reduction in premultiplied alpha, then one small filter pass
+    thumb = resize_premultiplied(img.convert('RGBA'), thumbnail_size(img, PLACEHOLDER_SIZE))
+    if img.mode not in ('RGBA', 'LA', 'PA') and 'transparency' not in img.info:
+        thumb = thumb.convert('RGB')
+    lqip = base64.b64encode(encode_webp(thumb, PLACEHOLDER_QUALITY)).decode('ascii')
+    return {'width': width, 'height': height, 'lqip': f'data:image/webp;base64,{lqip}'}
+
+def image_placeholder(data):
+    """Placeholder of an image, served from the render cache by content hash"""
+    params = {
+        'generator': 'fingerprint_assets.placeholder',
+        'version': PLACEHOLDER_VERSION,
+        'source': hashlib.sha256(data).hexdigest(),
+        'size': PLACEHOLDER_SIZE,
+        'quality': PLACEHOLDER_QUALITY,
+    }
+    encoded, _ = cached_encode(params, lambda: render_placeholder(data),
+                               encode=lambda placeholder: json.dumps(placeholder).encode('utf-8'))
+    return json.loads(encoded)
+
+def page_scripts(text):
+    """Bodies of the inline page scripts (not JSON / JSON-LD data blocks)"""
+    return re.findall(r'<script>(.*?)</script>', text, flags=re.DOTALL)
+
+def set_attribute(tag, name, value):
+    """Set an attribute of an HTML start tag, replacing an existing value"""
+    attribute = f'{name}="{value}"'
+    pattern = rf'\s{name}="[^"]*"'
+    if re.search(pattern, tag):
+        return re.sub(pattern, lambda _: ' ' + attribute, tag, count=1)
+    return re.sub(r'\s*/?>$', lambda end: f' {attribute}{end.group(0)}', tag, count=1)
+
+def add_placeholders(text, files):
+    """Add width / height and inline placeholders for the served images the page shows
+
+    <img> tags get the attributes directly (the preview as a background,
+    cleared once the image loads); images the page scripts load are listed
+    in a JSON block the scripts read. Runs on rewritten references, so
+    re-running it on its own output changes nothing.
+    """
+    placeholders = {}
+    def placeholder(path):
+        path = path.split('?')[0]
+        if path not in placeholders and path in files and path.lower().endswith(PLACEHOLDER_EXTENSIONS):
+            placeholders[path] = image_placeholder(files[path])
+        return placeholders.get(path)
+
+    def add_to_img(match):
+        tag = match.group(0)
+        src = re.search(r'\ssrc="([^"]*)"', tag)
+        found = placeholder(src.group(1)) if src else None
+        if found is None:
+            return tag
+        tag = set_attribute(tag, 'width', found['width'])
+        tag = set_attribute(tag, 'height', found['height'])
+        tag = set_attribute(tag, 'style', f"background:center/cover no-repeat url({found['lqip']})")
+        return set_attribute(tag, 'onload', "this.style.removeProperty('background')")
+    text = re.sub(r'<img\b[^>]*>', add_to_img, text)
+
+    scripted = {}
+    for script in page_scripts(text):
+        for path in re.findall(r'[\'"]([^\'"\s]+)[\'"]', script):
+            found = placeholder(path)
+            if found is not None:
+                scripted[path.split('?')[0]] = found
+    block_pattern = rf'[ \t]*<script type="application/json" id="{PLACEHOLDER_SCRIPT_ID}">.*?</script>\n'
+    text = re.sub(block_pattern, '', text, flags=re.DOTALL)
+    if scripted:
+        block = json.dumps(scripted, sort_keys=True, separators=(',', ':'))
+        text = re.sub(r'([ \t]*)<script>', lambda start: (
+            f'{start.group(1)}<script type="application/json" id="{PLACEHOLDER_SCRIPT_ID}">{block}</script>\n'
+            f'{start.group(0)}'), text, count=1)
+    return text
+
+def fingerprint_assets(docs_dir='docs'):
+    """Run the docs asset stage, return (files written or removed, size report)"""
+    print(f"🔖 Fingerprinting docs images in: {docs_dir}")
+
+    assets = find_assets(docs_dir)
+    mapping, files, skipped = plan_assets(docs_dir, assets)
+    previous_manifest = load_previous_manifest(docs_dir)
+    previous = previous_manifest.get('assets', {})
+    touched = []
+
+    for asset_path in skipped:
+        print(f"  ⚠️  {asset_path}: empty file, references left unchanged")
+
+    # Content-addressed: an existing fingerprinted file is never rewritten
+    for served, data in sorted(files.items()):
+        if write_if_changed(os.path.join(docs_dir, served), data):
+            touched.append(served)
+            print(f"  → {served}")
+    duplicates = len(mapping) - len(files)
+    if duplicates:
+        print(f"  → {duplicates} duplicate image(s) share a file")
+
+    # References by original name or by a previous fingerprint
+    replacements = dict(mapping)
+    for asset_path, old_served in previous.items():
+        if asset_path in mapping and old_served != mapping[asset_path]:
+            replacements[old_served] = mapping[asset_path]
+
+    index_changed = False
+    for page in PAGES:
+        page_path = os.path.join(docs_dir, page)
+        if not os.path.exists(page_path):
+            continue
+        with open(page_path, encoding='utf-8') as f:
+            text = f.read()
+        updated = rewrite_references(text, replacements)
+        if page in PLACEHOLDER_PAGES:
+            updated = add_placeholders(updated, files)
+        if page == 'sitemap.xml' and index_changed:
+            updated = bump_sitemap_lastmod(updated)
+        if write_if_changed(page_path, updated.encode('utf-8')):
+            touched.append(page)
+            index_changed = index_changed or page == 'index.html'
+            print(f"  → rewrote {page}")
+
+    # Drop fingerprinted files nothing maps to any more
+    static_dir = os.path.join(docs_dir, STATIC_DIR)
+    for name in sorted(os.listdir(static_dir)) if os.path.isdir(static_dir) else []:
+        served = f'{STATIC_DIR}/{name}'
+        if name not in (MANIFEST_NAME, SIZE_REPORT_NAME) and served not in files:
+            os.remove(os.path.join(docs_dir, served))
+            touched.append(served)
+            print(f"  → removed stale {served}")
+
+    sizes = {asset_path: len(files[served]) for asset_path, served in mapping.items()}
+    manifest = json.dumps({'version': 1, 'assets': mapping, 'sizes': sizes}, indent=2, sort_keys=True) + '\n'
+    if write_if_changed(os.path.join(static_dir, MANIFEST_NAME), manifest.encode('utf-8')):
+        touched.append(f'{STATIC_DIR}/{MANIFEST_NAME}')
+
+    # Size deltas against the previous run, checked against the budgets
+    report = size_report(sizes, previous_manifest.get('sizes', {}), SIZE_BUDGETS)
+    print_size_report(report)
+    report_json = json.dumps(report, indent=2, sort_keys=True) + '\n'
+    write_if_changed(os.path.join(static_dir, SIZE_REPORT_NAME), report_json.encode('utf-8'))
+
+    print(f"\n✅ {len(mapping)} image(s) → {len(files)} fingerprinted file(s), {len(touched)} file(s) changed")
+    return touched, report
+
+if __name__ == "__main__":
+    docs_dir = sys.argv[1] if len(sys.argv) > 1 else 'docs'
+
+    if not os.path.exists(os.path.join(docs_dir, 'index.html')):
+        print(f"❌ Error: {docs_dir}/index.html not found")
+        sys.exit(1)
+
+    _, report = fingerprint_assets(docs_dir)
+    render_cache.prune()
+    if report['over_budget']:
+        print(f"❌ Over size budget: {', '.join(report['over_budget'])}")
+        sys.exit(1)
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Frame docs / store screenshots in device templates, with optional captions
+Each template is rendered once per screen size into a backdrop (background,
+drop shadow, device body), a screen mask and a top overlay (camera), cached
+as mappable raw entries - every screenshot is then one vectorized blend of
+its screen rectangle. The whole set runs across a process pool through the
+render cache, once per caption locale
+Usage: python3 docs/frame_screenshots.py [input_dir ...] [--template phone] [--captions captions.json] [--locale de]
+"""
+
+try:
+    from PIL import Image, ImageDraw, ImageFilter, ImageFont
+    import numpy as np
+    import argparse
+    import json
+    import os
+    import sys
+    import time
+except ImportError:
+    print("❌ Pillow and NumPy are required. Install with: pip3 install Pillow numpy")
+    sys.exit(1)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'assets', 'icon'))
+
+import render_cache
+from asset_pipeline import cached_encode, file_digest, run_parallel, write_bytes
+from brand import NAVY_BLUE, hex_color, parse_hex_color
+from source_cache import map_raw, open_decoded, store_raw
+
+# Raw captures framed by default, and where the framed sets go
+INPUT_DIRS = ['docs/screenshots', 'docs/images']
+INPUT_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+OUTPUT_DIR = 'docs/framed'
+
+# Optional captions: {locale: {screenshot name without extension: caption}} -
+# every locale gets its own framed set under OUTPUT_DIR/<template>/<locale>/
+CAPTIONS_PATH = 'docs/screenshots/captions.json'
+
+# Bump when framing changes so cached frames and renders are not reused
+RENDER_VERSION = 2
+
+# Device templates, sizes in fractions of the screen width
+DEVICE_FRAMES = {
+    'phone': {
+        'bezel': 0.045,             # body border around the screen
+        'body_radius': 0.15,        # corner radius of the body
+        'screen_radius': 0.105,     # corner radius of the screen
+        'body_color': (24, 24, 27),
+        'rim_color': (82, 82, 91),  # thin highlight along the body edge
+        'rim_width': 0.006,
+        'camera': 0.03,             # punch-hole diameter at the top of the screen (0 = none)
+    },
+    'tablet': {
+        'bezel': 0.06,
+        'body_radius': 0.07,
+        'screen_radius': 0.025,
+        'body_color': (24, 24, 27),
+        'rim_color': (82, 82, 91),
+        'rim_width': 0.004,
+        'camera': 0.0,
+    },
+}
+
+# Canvas layout around the device, in fractions of the screen width
+MARGIN = 0.12           # room for the shadow on every side
+SHADOW_BLUR = 0.04      # Gaussian blur radius of the drop shadow
+SHADOW_OFFSET = 0.025   # shadow drop, downwards
+SHADOW_OPACITY = 0.45
+CAPTION_HEIGHT = 0.26   # band above the device when a locale has captions
+CAPTION_SIZE = 0.075    # caption font size
+CAPTION_COLOR = (255, 255, 255)
+CAMERA_COLOR = (10, 10, 12)
+
+# Frame masks are drawn at this multiple and reduced - anti-aliased edges
+SUPERSAMPLE = 4
+
+# Frame parts per (template, screen size, background), mapped or built once per process
+FRAME_PARTS = {}
+
+def frame_params(template, screen_size, background):
+    """Render cache key parameters of one template's frame parts"""
+    return {
+        'generator': 'device_frame',
+        'version': RENDER_VERSION,
+        'template': DEVICE_FRAMES[template],
+        'screen': list(screen_size),
+        'background': hex_color(background),
+        'layout': [MARGIN, SHADOW_BLUR, SHADOW_OFFSET, SHADOW_OPACITY, SUPERSAMPLE],
+    }
+
+def _rounded_mask(canvas, box, radius):
+    """Anti-aliased L mask of a rounded rectangle (box end exclusive, in pixels)"""
+    big = Image.new('L', (canvas[0] * SUPERSAMPLE, canvas[1] * SUPERSAMPLE), 0)
+    x0, y0, x1, y1 = (round(value * SUPERSAMPLE) for value in box)
+    ImageDraw.Draw(big).rounded_rectangle((x0, y0, x1 - 1, y1 - 1), radius=round(radius * SUPERSAMPLE), fill=255)
+    return big.reduce(SUPERSAMPLE)
+
+def _blend(base, color, alpha):
+    """base (float HxWx3) with color laid over it at alpha (float HxW, 0..1)"""
+    alpha = alpha[..., None]
+    return base * (1.0 - alpha) + np.asarray(color, dtype=np.float32) * alpha
+
+def build_frame(template, screen_size, background):
+    """Frame parts for one screen size: backdrop RGB uint8 (background, shadow,
+    body), screen origin, screen mask uint8 and top overlay RGBA uint8"""
+    spec = DEVICE_FRAMES[template]
+    width, height = screen_size
+    bezel = round(spec['bezel'] * width)
+    margin = round(MARGIN * width)
+    rim = max(1, round(spec['rim_width'] * width))
+    canvas = (width + 2 * (bezel + margin), height + 2 * (bezel + margin))
+    body_box = (margin, margin, canvas[0] - margin, canvas[1] - margin)
+    inner_box = (body_box[0] + rim, body_box[1] + rim, body_box[2] - rim, body_box[3] - rim)
+    screen_box = (margin + bezel, margin + bezel, margin + bezel + width, margin + bezel + height)
+
+    # Shadow: the body outline dropped and blurred (Pillow's C blur, once per template)
+    offset = round(SHADOW_OFFSET * width)
+    shadow_box = (body_box[0], body_box[1] + offset, body_box[2], body_box[3] + offset)
+    shadow = _rounded_mask(canvas, shadow_box, spec['body_radius'] * width)
+    shadow = shadow.filter(ImageFilter.GaussianBlur(SHADOW_BLUR * width))
+    body = _rounded_mask(canvas, body_box, spec['body_radius'] * width)
+    inner = _rounded_mask(canvas, inner_box, spec['body_radius'] * width - rim)
+
+    backdrop = np.empty((canvas[1], canvas[0], 3), dtype=np.float32)
+    backdrop[...] = background
+    backdrop = _blend(backdrop, (0, 0, 0), np.asarray(shadow, dtype=np.float32) * (SHADOW_OPACITY / 255))
+    backdrop = _blend(backdrop, spec['rim_color'], np.asarray(body, dtype=np.float32) / 255)
+    backdrop = _blend(backdrop, spec['body_color'], np.asarray(inner, dtype=np.float32) / 255)
+    backdrop = np.clip(np.rint(backdrop), 0, 255).astype(np.uint8)
+
+    screen_mask = _rounded_mask(canvas, screen_box, spec['screen_radius'] * width).crop(screen_box)
+    overlay = Image.new('RGBA', (width * SUPERSAMPLE, height * SUPERSAMPLE), (*CAMERA_COLOR, 0))
+    if spec['camera']:
+        diameter = spec['camera'] * width * SUPERSAMPLE
+        top = bezel * SUPERSAMPLE
+        left = (width * SUPERSAMPLE - diameter) / 2
+        ImageDraw.Draw(overlay).ellipse((left, top, left + diameter, top + diameter), fill=(*CAMERA_COLOR, 255))
+    overlay = overlay.reduce(SUPERSAMPLE)
+    return backdrop, screen_box[:2], np.asarray(screen_mask), np.asarray(overlay)
+
+def frame_parts(template, screen_size, background):
+    """build_frame() result, mapped from the cache (built and stored on a miss)"""
+    memo_key = (template, tuple(screen_size), tuple(background))
+    if memo_key not in FRAME_PARTS:
+        key = render_cache.cache_key(frame_params(template, screen_size, background))
+        mapped = map_raw(key)
+        if mapped is None:
+            backdrop, origin, mask, overlay = build_frame(template, screen_size, background)
+            arrays = [backdrop, mask, overlay]
+            meta = {'origin': list(origin), 'shapes': [list(array.shape) for array in arrays]}
+            try:
+                store_raw(key, meta, [(array.nbytes, [memoryview(np.ascontiguousarray(array)).cast('B')])
+                                      for array in arrays])
+            except OSError:
+                pass  # read-only cache directory - use the arrays just built
+            mapped = map_raw(key)
+            if mapped is None:
+                FRAME_PARTS[memo_key] = (backdrop, tuple(origin), mask, overlay)
+                return FRAME_PARTS[memo_key]
+        meta, buffers = mapped
+        backdrop, mask, overlay = (np.frombuffer(buffer, dtype=np.uint8).reshape(shape)
+                                   for buffer, shape in zip(buffers, meta['shapes']))
+        FRAME_PARTS[memo_key] = (backdrop, tuple(meta['origin']), mask, overlay)
+    return FRAME_PARTS[memo_key]
+
+def composite(shot, parts):
+    """Screenshot blended into its frame - one integer pass over the screen rectangle"""
+    backdrop, (x, y), mask, overlay = parts
+    height, width = mask.shape
+    screen = np.asarray(shot if shot.mode == 'RGB' else shot.convert('RGB'), dtype=np.uint16)
+    framed = backdrop.copy()
+    region = framed[y:y + height, x:x + width].astype(np.uint16)
+    alpha = mask[..., None].astype(np.uint16)
+    region = (region * (255 - alpha) + screen * alpha + 127) // 255
+    alpha = overlay[..., 3:].astype(np.uint16)
+    region = (region * (255 - alpha) + overlay[..., :3] * alpha + 127) // 255
+    framed[y:y + height, x:x + width] = region
+    return Image.fromarray(framed)
+
+def caption_font(size, font_path=None):
+    """TrueType font at size - font_path, else Pillow's bundled default"""
+    if font_path:
+        return ImageFont.truetype(font_path, size)
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        return ImageFont.load_default()  # Pillow < 10.1: fixed-size bitmap font
+
+def wrap_caption(draw, caption, font, max_width):
+    """Caption split into lines no wider than max_width (word wrap)"""
+    lines = []
+    for paragraph in caption.splitlines() or ['']:
+        line = ''
+        for word in paragraph.split():
+            candidate = f'{line} {word}'.strip()
+            if line and draw.textlength(candidate, font=font) > max_width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+    return '\n'.join(lines)
+
+def add_caption(framed, caption, screen_width, background, font_path=None):
+    """Framed device below a caption band (empty captions keep the band - the set lines up)"""
+    band = round(CAPTION_HEIGHT * screen_width)
+    canvas = Image.new('RGB', (framed.width, framed.height + band), background)
+    canvas.paste(framed, (0, band))
+    if caption:
+        draw = ImageDraw.Draw(canvas)
+        font = caption_font(round(CAPTION_SIZE * screen_width), font_path)
+        margin = round(MARGIN * screen_width)
+        text = wrap_caption(draw, caption, font, framed.width - 2 * margin)
+        # Centered between the top edge and the device's shadow margin
+        draw.multiline_text((framed.width / 2, (band + margin) / 2), text, font=font,
+                            fill=CAPTION_COLOR, anchor='mm', align='center')
+    return canvas
+
+def frame_screenshot(input_path, output_path, template, caption, background, font_path=None):
+    """Frame one screenshot and write it (runs in a worker), return (output_path, cache hit)
+
+    caption None frames without a caption band.
+    """
+    params = {
+        'generator': 'frame_screenshots',
+        'version': RENDER_VERSION,
+        'source': file_digest(input_path),
+        'frame': frame_params(template, (0, 0), background),
+        'caption': caption,
+        'font': file_digest(font_path) if font_path else None,
+        'caption_layout': [CAPTION_HEIGHT, CAPTION_SIZE, hex_color(CAPTION_COLOR)],
+    }
+    def render():
+        shot = open_decoded(input_path, params['source'])
+        framed = composite(shot, frame_parts(template, shot.size, background))
+        if caption is not None:
+            framed = add_caption(framed, caption, shot.width, background, font_path)
+        return framed
+    data, hit = cached_encode(params, render)
+    write_bytes(output_path, data)
+    return output_path, hit
+
+def find_screenshots(input_dirs):
+    """Still images in input_dirs as (path, size); empty and animated files are skipped"""
+    found = []
+    for input_dir in input_dirs:
+        for name in sorted(os.listdir(input_dir)) if os.path.isdir(input_dir) else []:
+            path = os.path.join(input_dir, name)
+            if not name.lower().endswith(INPUT_EXTENSIONS):
+                continue
+            if os.path.getsize(path) == 0:
+                print(f"  ⚠️  {path}: empty file, skipped")
+                continue
+            # Image.open only reads the header - pixels are decoded in the workers
+            with Image.open(path) as img:
+                found.append((path, img.size))
+    return found
+
+def load_captions(captions_path, locales=None):
+    """{locale: {name: caption}} from the captions file, or {None: None} without one"""
+    if not captions_path or not os.path.exists(captions_path):
+        return {None: None}
+    with open(captions_path, encoding='utf-8') as f:
+        captions = json.load(f)
+    if locales:
+        missing = [locale for locale in locales if locale not in captions]
+        if missing:
+            raise ValueError(f"no captions for locale(s): {', '.join(missing)}")
+        captions = {locale: captions[locale] for locale in locales}
+    return captions
+
+def frame_jobs(screenshots, templates, captions, background, output_dir, font_path=None):
+    """One job per (screenshot, template, locale)"""
+    jobs = []
+    for template in templates:
+        for locale, texts in captions.items():
+            set_dir = os.path.join(output_dir, template, locale) if locale else os.path.join(output_dir, template)
+            for path, _ in screenshots:
+                stem = os.path.splitext(os.path.basename(path))[0]
+                output_path = os.path.join(set_dir, os.path.basename(os.path.dirname(path)), f'{stem}.png')
+                caption = None if texts is None else texts.get(stem, '')
+                jobs.append((path, output_path, template, caption, background, font_path))
+    return jobs
+
+def main():
+    """Main framing function"""
+    parser = argparse.ArgumentParser(description="Frame screenshots in device templates, with optional captions")
+    parser.add_argument('input_dirs', nargs='*', default=INPUT_DIRS,
+                        help=f"directories of raw captures (default: {' '.join(INPUT_DIRS)})")
+    parser.add_argument('--template', action='append', choices=sorted(DEVICE_FRAMES),
+                        help="device template, repeatable (default: phone)")
+    parser.add_argument('--captions', default=CAPTIONS_PATH,
+                        help=f"captions JSON, {{locale: {{name: caption}}}} (default: {CAPTIONS_PATH} if present)")
+    parser.add_argument('--locale', action='append', help="only these caption locales (repeatable)")
+    parser.add_argument('--background', default=hex_color(NAVY_BLUE),
+                        help=f"canvas color (default: {hex_color(NAVY_BLUE)})")
+    parser.add_argument('--font', help="TrueType font for captions (default: Pillow's bundled font)")
+    parser.add_argument('--output', default=OUTPUT_DIR, help=f"output directory (default: {OUTPUT_DIR})")
+    args = parser.parse_args()
+
+    try:
+        background = parse_hex_color(args.background)
+        captions = load_captions(args.captions, args.locale)
+    except (ValueError, json.JSONDecodeError) as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+    templates = args.template or ['phone']
+
+    print(f"📸 Framing screenshots from: {', '.join(args.input_dirs)}")
+    screenshots = find_screenshots(args.input_dirs)
+    if not screenshots:
+        print("❌ Error: No screenshots found")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    # Frame parts are built (or mapped) here once, so workers only map them
+    for template in templates:
+        for size in sorted({size for _, size in screenshots}):
+            frame_parts(template, size, background)
+    jobs = frame_jobs(screenshots, templates, captions, background, args.output, args.font)
+    results = run_parallel(frame_screenshot, jobs)
+    render_cache.prune()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    for output_path, hit in results:
+        print(f"  → {output_path}{' (cached)' if hit else ''}")
+    locales = [locale for locale in captions if locale]
+    print(f"✅ {len(results)} framed screenshot(s) in {elapsed_ms:.0f} ms "
+          f"({len(templates)} template(s){', locales: ' + ', '.join(locales) if locales else ''})")
+
+if __name__ == "__main__":
+    main()
@@ -12,12 +12,16 @@ except ImportError:
     print("❌ PIL/Pillow not installed. Install with: pip3 install Pillow")
     sys.exit(1)
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'assets', 'icon'))
+
+from source_cache import open_decoded
+
 def generate_favicons(source_path, output_dir):
     """Generate favicon files"""
     print(f"🎨 Generating favicons from: {source_path}")
     
-    # Open source image
-    source_img = Image.open(source_path)
+    # Open source image (mapped from the decoded-source cache after the first run)
+    source_img = open_decoded(source_path)
     print(f"   Source size: {source_img.size[0]}×{source_img.size[1]}")
     
     # Convert to RGBA if needed